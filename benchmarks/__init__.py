@@ -0,0 +1,6 @@
+"""Hardware-free benchmarks of the real-time paths (cameras, target assets, calibration math).
+
+Usage:
+    python -m benchmarks run -o results.json
+    python -m benchmarks compare baseline.json results.json --threshold 0.15
+"""
@@ -0,0 +1,110 @@
+import argparse
+import sys
+
+from . import bench_assets, bench_calibration, bench_cameras  # noqa: F401  (enregistrent les benchmarks)
+from .harness import (
+    DEFAULT_FPS,
+    DEFAULT_MIN_TIME_S,
+    DEFAULT_THRESHOLD,
+    TICK_BUDGET_SHARE,
+    check_budget,
+    compare_results,
+    format_time,
+    load_results,
+    run_benchmarks,
+    save_results,
+    select,
+)
+
+STATUS_ICONS = {"ok": "  ", "regression": "🔴", "improvement": "🟢", "new": "🆕", "missing": "❔", "skipped": "⏭️"}
+
+
+def print_result(name: str, result: dict) -> None:
+    if "skipped" in result:
+        print(f"⏭️  {name} : ignoré ({result['skipped']})")
+        return
+    tick = " ⏱️" if result["tick"] else ""
+    rate = f", {result['items_per_s']:.0f} éléments/s" if result["items"] > 1 else ""
+    print(f"   {name} : {format_time(result['p50_us'])} médiane, {format_time(result['p99_us'])} p99{rate}{tick}")
+
+
+def print_budget(budget: dict) -> None:
+    icon = "✅" if budget["ok"] else "❌"
+    print(f"\n{icon} Budget par tick à {budget['fps']:g} FPS : {budget['tick_p99_ms']:.3f} ms (p99 cumulé des "
+          f"benchmarks ⏱️) pour {budget['budget_ms']:.2f} ms autorisées "
+          f"({budget['budget_ms'] / budget['period_ms']:.0%} de la période de {budget['period_ms']:.1f} ms)")
+
+
+def print_comparison(report, threshold: float) -> None:
+    for key, (before, after) in report.environment_changes.items():
+        print(f"⚠️  {key} différent : {before} → {after} (comparaison peu fiable)")
+    missing = [row.name for row in report.rows if row.status == "missing"]
+    for row in report.rows:
+        if row.status == "missing":
+            continue
+        change = f"{row.change:+.1%}" if row.change is not None else ""
+        print(f"{STATUS_ICONS[row.status]} {row.name} : {format_time(row.baseline_us)} → "
+              f"{format_time(row.current_us)} {change}")
+    if missing:
+        print(f"❔ {len(missing)} benchmark(s) de la référence non mesuré(s)")
+    regressions = report.regressions
+    if regressions:
+        print(f"\n❌ {len(regressions)} régression(s) de plus de {threshold:.0%}")
+    else:
+        print(f"\n✅ Aucune régression de plus de {threshold:.0%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks sans matériel des chemins temps réel.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run = subparsers.add_parser("run", help="lance les benchmarks et enregistre les résultats en JSON")
+    run.add_argument("-k", "--filter", help="ne lance que les benchmarks dont le nom contient ce texte")
+    run.add_argument("-o", "--output", default="benchmarks/results.json", help="fichier de résultats")
+    run.add_argument("--min-time", type=float, default=DEFAULT_MIN_TIME_S, help="durée de mesure par benchmark (s)")
+    run.add_argument("--fps", type=float, default=DEFAULT_FPS, help="fréquence de la boucle de contrôle")
+    run.add_argument("--budget-share", type=float, default=TICK_BUDGET_SHARE,
+                     help="part de la période allouée aux benchmarks ⏱️")
+    run.add_argument("--baseline", help="compare aussitôt à ce fichier de résultats")
+    run.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="ralentissement toléré (0.15 = 15 %%)")
+    run.add_argument("--list", action="store_true", help="liste les benchmarks sans les lancer")
+
+    compare = subparsers.add_parser("compare", help="compare deux fichiers de résultats")
+    compare.add_argument("baseline", help="résultats de référence")
+    compare.add_argument("current", help="nouveaux résultats")
+    compare.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                         help="ralentissement toléré (0.15 = 15 %%)")
+
+    args = parser.parse_args()
+
+    if args.command == "compare":
+        report = compare_results(load_results(args.baseline), load_results(args.current), args.threshold)
+        print_comparison(report, args.threshold)
+        sys.exit(1 if report.regressions else 0)
+
+    benchmarks = select(args.filter)
+    if args.list:
+        for bench in benchmarks:
+            print(f"{bench.full_name}{' ⏱️' if bench.tick else ''}")
+        return
+    if not benchmarks:
+        sys.exit(f"❌ Aucun benchmark ne correspond à : {args.filter}")
+
+    print(f"🏁 {len(benchmarks)} benchmark(s), {args.min_time:g} s chacun")
+    results = run_benchmarks(benchmarks, args.min_time, progress=print_result)
+    budget = check_budget(results, args.fps, args.budget_share)
+    print_budget(budget)
+    save_results(args.output, results, budget)
+    print(f"💾 Résultats : {args.output}")
+
+    failed = not budget["ok"]
+    if args.baseline:
+        print()
+        report = compare_results(load_results(args.baseline), load_results(args.output), args.threshold)
+        print_comparison(report, args.threshold)
+        failed = failed or bool(report.regressions)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
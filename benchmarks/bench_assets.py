@@ -0,0 +1,32 @@
+from itertools import cycle
+
+import gen_mp4
+
+from .harness import Skip, benchmark
+
+WIDTH = 640
+HEIGHT = 480
+FPS = 30
+# Shorter than gen_mp4.DURATION_S so that a run gets several samples; results are per frame anyway
+DURATION_S = 1
+
+
+@benchmark("assets.create_static_video", params=sorted(gen_mp4.ENCODERS), items=FPS * DURATION_S)
+def create_static_video(context, encoder):
+    if gen_mp4.encoder_missing(encoder):
+        raise Skip(f"{encoder} encoder not available")
+    output = context.tmp_dir / f"video_{encoder}.mp4"
+    paths = cycle(context.target_paths("png", count=4))
+
+    def call():
+        if not gen_mp4.create_static_video(str(next(paths)), str(output), WIDTH, HEIGHT, FPS, DURATION_S, encoder):
+            raise RuntimeError(f"create_static_video failed with the {encoder} encoder")
+
+    return call
+
+
+@benchmark("assets.load_target")
+def load_target(context):
+    """Decode, alpha flattening and letterboxing of a PNG target, before encoding."""
+    paths = cycle(context.target_paths("png"))
+    return lambda: gen_mp4.load_target(str(next(paths)), WIDTH, HEIGHT)
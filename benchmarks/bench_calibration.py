@@ -0,0 +1,50 @@
+import numpy as np
+
+from .harness import benchmark
+
+POLYLINE_POINTS = 1000
+
+
+def _calibration():
+    from calibration_map import CalibrationMap
+
+    return CalibrationMap.from_file()
+
+
+@benchmark("calibration.parse_coordinates")
+def parse_coordinates(context):
+    from calibration_map import COORDINATES_FILE, parse_coordinates
+
+    return lambda: parse_coordinates(COORDINATES_FILE)
+
+
+@benchmark("calibration.fit")
+def fit(context):
+    """Fit of the correspondence on coordonnees_a5.txt and evaluation of its grid."""
+    return _calibration
+
+
+@benchmark("calibration.to_joints", params=["rad", "deg", "motor_units"], tick=lambda unit: unit == "rad")
+def to_joints_point(context, unit):
+    """One pen position per control tick, as when streaming a drawing."""
+    calibration = _calibration()
+    point = np.array([[105.0, 74.25]])
+    return lambda: calibration.to_joints(point, unit=unit)
+
+
+@benchmark("calibration.to_joints.polyline", items=POLYLINE_POINTS)
+def to_joints_polyline(context):
+    from calibration_map import A5_HEIGHT_MM, A5_WIDTH_MM
+
+    calibration = _calibration()
+    points = np.random.default_rng(0).uniform((0, 0), (A5_WIDTH_MM, A5_HEIGHT_MM), size=(POLYLINE_POINTS, 2))
+    return lambda: calibration.to_joints(points, unit="deg")
+
+
+@benchmark("calibration.unit_conversion", params=["deg", "motor_units"])
+def unit_conversion(context, unit):
+    """Conversion of a pose between the API radians and the dataset or motor units, both ways."""
+    from mock_server import from_rad, to_rad
+
+    pose = np.array([0.0, 1.2, 0.0, -1.0, -1.57, -1.1])
+    return lambda: to_rad(from_rad(pose, unit), unit)
@@ -0,0 +1,112 @@
+import shutil
+from itertools import cycle
+
+from lerobot.cameras.configs import ColorMode
+
+from .harness import benchmark
+
+COLOR_MODES = [mode.value for mode in ColorMode]
+# Mode read by the record and inference loops on every tick
+TICK_COLOR_MODE = ColorMode.RGB.value
+WIDTH = 640
+HEIGHT = 480
+ATLAS_TARGETS = 16
+
+
+def _static_camera(context, **config):
+    from cameras import StaticCamera, StaticCameraConfig
+
+    camera = StaticCamera(StaticCameraConfig(width=WIDTH, height=HEIGHT, **config))
+    camera.connect()
+    context.stack.callback(camera.disconnect)
+    return camera
+
+
+def _static_image_camera(context, atlas=None, **config):
+    from static_image_camera import StaticImageCamera
+    from static_image_camera_config import StaticImageCameraConfig
+
+    camera = StaticImageCamera(StaticImageCameraConfig(width=WIDTH, height=HEIGHT, fps=30, **config), atlas=atlas)
+    camera.connect()
+    context.stack.callback(camera.disconnect)
+    return camera
+
+
+def _atlas(context):
+    """Atlas of a few repo targets, built once per run in the scratch directory."""
+    from cameras.target_atlas import TargetAtlas, build_atlas
+
+    output = context.tmp_dir / "atlas"
+    if not output.exists():
+        root = context.tmp_dir / "atlas_sources"
+        for path in context.target_paths(count=ATLAS_TARGETS):
+            (root / path.parent.name).mkdir(parents=True, exist_ok=True)
+            shutil.copy(path, root / path.parent.name / path.name)
+        build_atlas(root, output, WIDTH, HEIGHT)
+    return TargetAtlas(output)
+
+
+@benchmark("cameras.static_camera.read", params=COLOR_MODES, tick=lambda mode: mode == TICK_COLOR_MODE)
+def static_camera_read(context, mode):
+    camera = _static_camera(context, image_path=str(context.target_paths(count=1)[0]))
+    color_mode = ColorMode(mode)
+    return lambda: camera.read(color_mode)
+
+
+@benchmark("cameras.static_camera.async_read")
+def static_camera_async_read(context):
+    camera = _static_camera(context, image_path=str(context.target_paths(count=1)[0]))
+    return camera.async_read
+
+
+@benchmark("cameras.static_image_camera.read", params=COLOR_MODES, tick=lambda mode: mode == TICK_COLOR_MODE)
+def static_image_camera_read(context, mode):
+    camera = _static_image_camera(context, path=context.target_paths(count=1)[0])
+    color_mode = ColorMode(mode)
+    return lambda: camera.read(color_mode)
+
+
+@benchmark("targets.load.decode")
+def target_decode(context):
+    """First load of a target: decode, resize and color conversions (a target cache miss)."""
+    from target_cache import TargetCache
+
+    paths = cycle(context.target_paths())
+    return lambda: TargetCache().get_frames(next(paths), WIDTH, HEIGHT)
+
+
+@benchmark("targets.load.cached")
+def target_cached(context):
+    from target_cache import TargetCache
+
+    cache = TargetCache()
+    paths = context.target_paths()
+    for path in paths:
+        cache.get_frames(path, WIDTH, HEIGHT)
+    paths = cycle(paths)
+    return lambda: cache.get_frames(next(paths), WIDTH, HEIGHT)
+
+
+@benchmark("targets.switch.select_image")
+def switch_select_image(context):
+    """StaticImageCamera switching between targets already in the process-wide cache."""
+    from target_cache import get_target_cache
+
+    paths = context.target_paths()
+    for path in paths:
+        get_target_cache().get_frames(path, WIDTH, HEIGHT)
+    camera = _static_image_camera(context, path=paths[0])
+    paths = cycle(paths)
+    return lambda: camera.select_image(next(paths))
+
+
+@benchmark("targets.switch.atlas", params=["static_camera", "static_image_camera"])
+def switch_atlas(context, camera_type):
+    atlas = _atlas(context)
+    if camera_type == "static_camera":
+        camera = _static_camera(context, atlas_path=str(atlas.path))
+    else:
+        camera = _static_image_camera(context, atlas=atlas, path=context.target_paths(count=1)[0], atlas_target=0)
+    targets = cycle(range(len(atlas)))
+    return lambda: camera.select_target(next(targets))
+
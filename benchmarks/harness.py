@@ -0,0 +1,284 @@
+import contextlib
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable
+
+import numpy as np
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+# Modules of the repo are scripts imported by bare name from their own directory
+for directory in ("training", "callibration_a5", ""):
+    path = str(REPO_ROOT / directory)
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+DEFAULT_MIN_TIME_S = 1.0
+# Calls are timed in batches of at least this duration, so that sub-microsecond
+# calls are not dominated by the timer itself
+MIN_BATCH_S = 50e-6
+DEFAULT_THRESHOLD = 0.15
+# Changes smaller than this are timer and scheduler noise, whatever their ratio
+MIN_DELTA_US = 1.0
+DEFAULT_FPS = 30
+# Share of the control period that the benchmarked per-tick work may take:
+# the rest goes to the motors bus, the real cameras and the dataset writer
+TICK_BUDGET_SHARE = 0.25
+
+
+class Skip(Exception):
+    """Raised by a benchmark setup when a requirement (a tool, a file) is missing."""
+
+
+@dataclass
+class Benchmark:
+    """A benchmark: setup(context, param) returns the zero-argument call to time."""
+    name: str
+    setup: Callable
+    param: str | None = None
+    # Part of the work done on every control tick at FPS (see check_budget)
+    tick: bool = False
+    # Items processed per call (frames, points): results also report items per second
+    items: int = 1
+
+    @property
+    def full_name(self) -> str:
+        return self.name if self.param is None else f"{self.name}[{self.param}]"
+
+
+REGISTRY: list[Benchmark] = []
+
+
+def benchmark(name: str, params: list[str] | None = None, tick: bool | Callable[[str | None], bool] = False,
+              items: int = 1) -> Callable:
+    """Register a benchmark setup, once per parameter.
+
+    Args:
+        name: Benchmark name, e.g. "cameras.static_camera.read".
+        params: Values passed to the setup as `param`, one benchmark each.
+        tick: Whether the call runs on every control tick, or a function of the parameter.
+        items: Items processed per call.
+    """
+    def register(setup: Callable) -> Callable:
+        for param in params or [None]:
+            is_tick = tick(param) if callable(tick) else tick
+            REGISTRY.append(Benchmark(name, setup, param, is_tick, items))
+        return setup
+    return register
+
+
+class Context:
+    """Resources shared by the benchmark setups of one run: a scratch directory and cleanups."""
+
+    def __init__(self):
+        self.stack = contextlib.ExitStack()
+        self.tmp_dir = Path(self.stack.enter_context(tempfile.TemporaryDirectory(prefix="caligraphomate-bench-")))
+        self.repo_root = REPO_ROOT
+
+    def target_paths(self, extension: str = "jpg", count: int = 16) -> list[Path]:
+        """First `count` target images of the repo, taken across shapes."""
+        paths = sorted((self.repo_root / extension).glob(f"*/*.{extension}"))
+        if not paths:
+            raise Skip(f"no {extension} target under {self.repo_root / extension}")
+        step = max(1, len(paths) // count)
+        return paths[::step][:count]
+
+    def close(self) -> None:
+        self.stack.close()
+
+
+def measure(call: Callable, min_time_s: float = DEFAULT_MIN_TIME_S) -> dict:
+    """Time a call repeatedly for at least min_time_s.
+
+    Calls are grouped in batches lasting at least MIN_BATCH_S; percentiles are
+    computed over the per-call time of each batch.
+
+    Returns:
+        Timing statistics in microseconds per call.
+    """
+    call()  # warmup: caches, lazy imports, first allocations
+    start = time.perf_counter()
+    call()
+    single = time.perf_counter() - start
+    batch = max(1, int(MIN_BATCH_S / max(single, 1e-9)))
+
+    samples = []
+    deadline = time.perf_counter() + min_time_s
+    while True:
+        start = time.perf_counter_ns()
+        for _ in range(batch):
+            call()
+        samples.append((time.perf_counter_ns() - start) / batch / 1000)
+        if time.perf_counter() >= deadline and len(samples) >= 5:
+            break
+    samples = np.asarray(samples)
+    return {
+        "calls": len(samples) * batch,
+        "batch": batch,
+        "mean_us": float(samples.mean()),
+        "min_us": float(samples.min()),
+        "p50_us": float(np.percentile(samples, 50)),
+        "p90_us": float(np.percentile(samples, 90)),
+        "p99_us": float(np.percentile(samples, 99)),
+        "max_us": float(samples.max()),
+    }
+
+
+def select(pattern: str | None = None) -> list[Benchmark]:
+    """Registered benchmarks whose full name contains pattern."""
+    return [b for b in REGISTRY if pattern is None or pattern in b.full_name]
+
+
+def run_benchmarks(benchmarks: list[Benchmark], min_time_s: float = DEFAULT_MIN_TIME_S,
+                   progress: Callable[[str, dict], None] | None = None) -> dict[str, dict]:
+    """Run benchmarks and return their results by full name.
+
+    A benchmark that raises Skip is reported with its reason; the output of the
+    code under test (e.g. "Loaded static image") is discarded.
+    """
+    results = {}
+    context = Context()
+    try:
+        for bench in benchmarks:
+            with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+                try:
+                    call = bench.setup(context, bench.param) if bench.param is not None else bench.setup(context)
+                    result = measure(call, min_time_s)
+                except Skip as e:
+                    result = {"skipped": str(e)}
+            if "skipped" not in result:
+                result["tick"] = bench.tick
+                result["items"] = bench.items
+                result["items_per_s"] = bench.items / (result["p50_us"] / 1e6)
+            results[bench.full_name] = result
+            if progress is not None:
+                progress(bench.full_name, result)
+    finally:
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            context.close()
+    return results
+
+
+def check_budget(results: dict[str, dict], fps: float = DEFAULT_FPS, share: float = TICK_BUDGET_SHARE) -> dict:
+    """Compare the per-tick work (sum of the p99 of the tick benchmarks) with the control period."""
+    period_ms = 1000 / fps
+    tick = {name: r["p99_us"] / 1000 for name, r in results.items() if r.get("tick")}
+    tick_ms = sum(tick.values())
+    return {
+        "fps": fps,
+        "period_ms": period_ms,
+        "budget_ms": period_ms * share,
+        "tick_p99_ms": tick_ms,
+        "benchmarks": sorted(tick),
+        "ok": tick_ms <= period_ms * share,
+    }
+
+
+def environment() -> dict:
+    """Machine and software the results were measured on."""
+    import cv2
+
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT,
+                                capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "cpus": os.cpu_count(),
+        "system": platform.platform(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "opencv": cv2.__version__,
+        "commit": commit,
+        "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+def save_results(path: str | Path, results: dict[str, dict], budget: dict) -> None:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp_path, "w") as f:
+        json.dump({"environment": environment(), "budget": budget, "results": results}, f, indent=1)
+    os.replace(tmp_path, path)
+
+
+def load_results(path: str | Path) -> dict:
+    with open(path) as f:
+        return json.load(f)
+
+
+@dataclass
+class Comparison:
+    name: str
+    baseline_us: float | None
+    current_us: float | None
+    # current / baseline - 1, on the median time per call
+    change: float | None = None
+    status: str = "ok"  # ok, regression, improvement, new, missing, skipped
+
+
+@dataclass
+class ComparisonReport:
+    rows: list[Comparison] = field(default_factory=list)
+    environment_changes: dict[str, tuple] = field(default_factory=dict)
+
+    @property
+    def regressions(self) -> list[Comparison]:
+        return [row for row in self.rows if row.status == "regression"]
+
+
+def compare_results(baseline: dict, current: dict, threshold: float = DEFAULT_THRESHOLD,
+                    min_delta_us: float = MIN_DELTA_US) -> ComparisonReport:
+    """Compare two result files on the median time per call.
+
+    A benchmark is a regression when it is more than `threshold` (a fraction)
+    and more than `min_delta_us` slower than in the baseline, and an
+    improvement when it is that much faster.
+    """
+    report = ComparisonReport()
+    for key in ("machine", "processor", "cpus", "python", "numpy", "opencv"):
+        before, after = baseline["environment"].get(key), current["environment"].get(key)
+        if before != after:
+            report.environment_changes[key] = (before, after)
+
+    old, new = baseline["results"], current["results"]
+    for name in sorted(set(old) | set(new)):
+        before, after = old.get(name), new.get(name)
+        if before is None or after is None:
+            present = after if before is None else before
+            status = "new" if before is None else "missing"
+            us = present.get("p50_us")
+            report.rows.append(Comparison(name, None if before is None else us, None if after is None else us,
+                                          status=status))
+            continue
+        if "skipped" in before or "skipped" in after:
+            report.rows.append(Comparison(name, before.get("p50_us"), after.get("p50_us"), status="skipped"))
+            continue
+        change = after["p50_us"] / before["p50_us"] - 1
+        significant = abs(after["p50_us"] - before["p50_us"]) > min_delta_us
+        status = "ok"
+        if significant and change > threshold:
+            status = "regression"
+        elif significant and change < -threshold:
+            status = "improvement"
+        report.rows.append(Comparison(name, before["p50_us"], after["p50_us"], change, status))
+    return report
+
+
+def format_time(us: float | None) -> str:
+    if us is None:
+        return "-"
+    if us < 1000:
+        return f"{us:.2f} µs"
+    if us < 1e6:
+        return f"{us / 1000:.2f} ms"
+    return f"{us / 1e6:.2f} s"
@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""Chaîne de production des cibles : SVG → PNG → JPG / MP4.
+
+Chaque étape est un nœud d'un graphe de dépendances (png dépend de svg, jpg et
+mp4 dépendent de png). La clé d'une sortie est l'empreinte du SVG source, des
+paramètres de l'étape et de la clé de l'étape amont : si rien n'a changé, la
+sortie est à jour et n'est pas reconstruite. Les clés sont conservées dans
+CACHE_DIR, un fichier par étape.
+
+Un PNG ou JPG déjà présent sur le disque mais absent du cache (premier
+lancement, cache supprimé) est adopté tel quel : les jpg/ et png/ versionnés ne
+sont pas rendus à nouveau par cairosvg, dont les pixels diffèrent. Il sera
+reconstruit dès que son SVG ou les paramètres de l'étape changeront, ou avec
+--force. Une vidéo n'est adoptée que si sa taille, sa durée, son format de pixels
+et son codec, relus avec PyAV, sont ceux de l'étape mp4 ; sinon elle est
+reconstruite (les vidéos de gen_mp4_ffmpeg.sh, par exemple, font 15 s en yuv444p).
+
+Chaque fichier traverse toutes les étapes en mémoire, dans un processus du
+pool ; seules les étapes demandées avec --emit sont écrites sur le disque.
+
+Exemples :
+    python build_assets.py                        # jpg + mp4 de toutes les formes
+    python build_assets.py --shapes circle line   # seulement ces formes
+    python build_assets.py --emit png jpg mp4     # écrit aussi les PNG intermédiaires
+    python build_assets.py --dry-run              # affiche ce qui serait reconstruit
+    python build_assets.py --force                # reconstruit tout, y compris les sorties adoptées
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+import cv2
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+
+import gen_mp4
+
+# === CONFIGURATION ===
+SVG_ROOT = "svg"
+CACHE_DIR = ".build_cache"
+SVG_DPI = 96  # A4 à 96 dpi = 1123x794, comme les PNG existants
+JPG_QUALITY = 95
+DEFAULT_EMIT = ("jpg", "mp4")
+
+
+@dataclass(frozen=True)
+class Stage:
+    """Une étape du graphe : produit `ext` dans `root` à partir de l'étape `source`."""
+    name: str
+    source: str
+    root: str
+    ext: str
+    params: dict
+
+
+def make_stages(encoder: str) -> dict[str, Stage]:
+    """Construit le graphe des étapes, dans l'ordre topologique."""
+    return {
+        "png": Stage("png", "svg", "png", ".png", {"renderer": "cairosvg", "dpi": SVG_DPI}),
+        "jpg": Stage("jpg", "png", "jpg", ".jpg", {"quality": JPG_QUALITY, "background": "white"}),
+        "mp4": Stage("mp4", "png", gen_mp4.OUTPUT_ROOT, ".mp4",
+                     gen_mp4.encode_params(gen_mp4.WIDTH, gen_mp4.HEIGHT, gen_mp4.FPS, gen_mp4.DURATION_S, encoder)),
+    }
+
+
+def stage_keys(stages: dict[str, Stage], source_hash: str) -> dict[str, str]:
+    """Clé de contenu de chaque étape pour un fichier source donné."""
+    keys = {"svg": source_hash}
+    for name, stage in stages.items():
+        payload = json.dumps([name, stage.params, keys[stage.source]], sort_keys=True)
+        keys[name] = hashlib.sha256(payload.encode()).hexdigest()
+    return keys
+
+
+def output_path(stage: Stage, rel: str) -> str:
+    return os.path.join(stage.root, rel + stage.ext)
+
+
+def list_sources(svg_root: str, shapes: list[str] | None) -> list[tuple[str, str]]:
+    """Liste les couples (chemin du SVG, chemin relatif sans extension) svg/<forme>/*.svg."""
+    sources = []
+    for shape_dir in sorted(os.listdir(svg_root)):
+        shape_path = os.path.join(svg_root, shape_dir)
+        if not os.path.isdir(shape_path) or (shapes and shape_dir not in shapes):
+            continue
+        for svg_file in sorted(os.listdir(shape_path)):
+            if svg_file.lower().endswith(".svg"):
+                sources.append((os.path.join(shape_path, svg_file),
+                                os.path.join(shape_dir, os.path.splitext(svg_file)[0])))
+    return sources
+
+
+def load_cache(stage: str) -> dict:
+    try:
+        with open(os.path.join(CACHE_DIR, f"{stage}.json")) as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def save_cache(stage: str, cache: dict) -> None:
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    gen_mp4.save_manifest(os.path.join(CACHE_DIR, f"{stage}.json"), cache)
+
+
+def write_atomic(path: str, data: bytes) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def render_svg(svg_bytes: bytes) -> bytes:
+    """Rasterise un SVG en PNG (avec transparence)."""
+    try:
+        import cairosvg
+    except ImportError:
+        raise RuntimeError("cairosvg est nécessaire pour l'étape png (pip install cairosvg)") from None
+    return cairosvg.svg2png(bytestring=svg_bytes, dpi=SVG_DPI)
+
+
+def build_file(svg_path: str, rel: str, stages: dict[str, Stage], stale: list[str],
+               png_on_disk: str | None) -> tuple[str, dict[str, str | None], float]:
+    """Fait traverser un fichier par les étapes périmées (exécuté dans un processus du pool).
+
+    Le PNG est relu sur le disque s'il y est à jour, sinon il est rendu en mémoire.
+
+    Returns:
+        (chemin relatif, {étape: None si réussie, message d'erreur sinon}, durée)
+    """
+    start = time.perf_counter()
+    results = {}
+    try:
+        if png_on_disk is not None:
+            with open(png_on_disk, "rb") as f:
+                png_bytes = f.read()
+        else:
+            with open(svg_path, "rb") as f:
+                png_bytes = render_svg(f.read())
+        if "png" in stale:
+            write_atomic(output_path(stages["png"], rel), png_bytes)
+            results["png"] = None
+
+        img = cv2.imdecode(np.frombuffer(png_bytes, np.uint8), cv2.IMREAD_UNCHANGED)
+        if img is None:
+            raise ValueError("PNG illisible")
+        flat = gen_mp4.flatten_alpha(img)
+    except Exception as e:
+        return rel, {name: str(e) for name in stale}, time.perf_counter() - start
+
+    if "jpg" in stale:
+        ok, data = cv2.imencode(".jpg", flat, [cv2.IMWRITE_JPEG_QUALITY, JPG_QUALITY])
+        if ok:
+            write_atomic(output_path(stages["jpg"], rel), data.tobytes())
+        results["jpg"] = None if ok else "encodage JPEG impossible"
+
+    if "mp4" in stale:
+        stage = stages["mp4"]
+        path = output_path(stage, rel)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = path[:-len(stage.ext)] + ".tmp" + stage.ext
+        frame = gen_mp4.letterbox(flat, stage.params["width"], stage.params["height"])
+        encode = gen_mp4.ENCODERS[stage.params["encoder"]]
+        if encode(frame, tmp_path, stage.params["fps"], stage.params["duration_s"]):
+            os.replace(tmp_path, path)
+            results["mp4"] = None
+        else:
+            results["mp4"] = "encodage vidéo impossible"
+
+    return rel, results, time.perf_counter() - start
+
+
+# Étapes dont une sortie existante est adoptée sans vérification : elles ne dépendent que du SVG
+ADOPTED_STAGES = ("png", "jpg")
+
+
+def seed_caches(caches: dict[str, dict], stages: dict[str, Stage], rel: str, keys: dict[str, str]) -> int:
+    """Adopte les sorties présentes sur le disque qui n'ont pas encore de clé dans le cache.
+
+    Les PNG et JPG sont adoptés tels quels ; une vidéo seulement si ses paramètres
+    réels, relus avec PyAV, sont ceux de l'étape mp4.
+
+    Returns:
+        le nombre d'étapes adoptées pour ce fichier
+    """
+    seeded = 0
+    for name, stage in stages.items():
+        path = output_path(stage, rel)
+        if rel in caches[name] or not os.path.exists(path):
+            continue
+        if name in ADOPTED_STAGES or (name == "mp4" and gen_mp4.video_matches(path, stage.params)):
+            caches[name][rel] = keys[name]
+            seeded += 1
+    return seeded
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Construit png/, jpg/ et videos/ à partir de svg/, en incrémental.")
+    parser.add_argument("--shapes", nargs="+", help="formes à construire (défaut : toutes)")
+    parser.add_argument("--emit", nargs="+", choices=["png", "jpg", "mp4"], default=list(DEFAULT_EMIT),
+                        help="étapes écrites sur le disque (défaut : %(default)s)")
+    parser.add_argument("--encoder", choices=sorted(gen_mp4.ENCODERS), default=gen_mp4.ENCODER,
+                        help="encodeur vidéo (défaut : %(default)s)")
+    parser.add_argument("--jobs", "-j", type=int, default=os.cpu_count(), help="nombre de processus")
+    parser.add_argument("--force", action="store_true",
+                        help="reconstruit tout, même à jour ou adopté depuis le disque")
+    parser.add_argument("--dry-run", action="store_true", help="affiche seulement ce qui serait reconstruit")
+    args = parser.parse_args()
+
+    if "mp4" in args.emit and gen_mp4.encoder_missing(args.encoder):
+        sys.exit(gen_mp4.encoder_missing(args.encoder))
+
+    start = time.perf_counter()
+    stages = make_stages(args.encoder)
+    caches = {name: load_cache(name) for name in stages}
+
+    # Détermine, pour chaque fichier, les étapes demandées dont la sortie est périmée
+    todo = []
+    keys_by_rel = {}
+    up_to_date = 0
+    seeded = 0
+    for svg_path, rel in list_sources(SVG_ROOT, args.shapes):
+        keys = stage_keys(stages, gen_mp4.file_sha256(svg_path))
+        if not args.force:
+            seeded += seed_caches(caches, stages, rel, keys)
+        stale = [name for name in args.emit
+                 if args.force or caches[name].get(rel) != keys[name]
+                 or not os.path.exists(output_path(stages[name], rel))]
+        if not stale:
+            up_to_date += 1
+            continue
+        png_path = output_path(stages["png"], rel)
+        png_fresh = (not args.force and "png" not in stale and caches["png"].get(rel) == keys["png"]
+                     and os.path.exists(png_path))
+        keys_by_rel[rel] = keys
+        todo.append((svg_path, rel, stale, png_path if png_fresh else None))
+
+    per_stage = {name: sum(name in item[2] for item in todo) for name in args.emit}
+    print(f"🧱 {len(todo)} fichier(s) à construire, {up_to_date} à jour — "
+          + ", ".join(f"{name}: {count}" for name, count in per_stage.items()))
+    if seeded:
+        print(f"   {seeded} sortie(s) existante(s) adoptée(s) sans reconstruction (--force pour les refaire)")
+    if args.dry_run:
+        for _, rel, stale, _ in todo:
+            print(f"   {rel} : {' '.join(stale)}")
+        return
+
+    built = {name: 0 for name in args.emit}
+    failed = 0
+    pool = None
+    try:
+        if args.jobs <= 1:
+            results = (build_file(*item[:2], stages, *item[2:]) for item in todo)
+        else:
+            pool = ProcessPoolExecutor(max_workers=args.jobs, initializer=gen_mp4.init_worker)
+            futures = [pool.submit(build_file, *item[:2], stages, *item[2:]) for item in todo]
+            results = (future.result() for future in as_completed(futures))
+
+        for done, (rel, outcome, _) in enumerate(results, start=1):
+            for name, error in outcome.items():
+                if error is None:
+                    caches[name][rel] = keys_by_rel[rel][name]
+                    built[name] += 1
+                else:
+                    caches[name].pop(rel, None)
+                    failed += 1
+                    print(f"❌ {rel} ({name}) : {error}")
+            if done % 100 == 0 or done == len(todo):
+                print(f"   {done}/{len(todo)}")
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+        for name in stages:
+            save_cache(name, caches[name])
+
+    elapsed = time.perf_counter() - start
+    print(f"\n📊 " + ", ".join(f"{count} {name}" for name, count in built.items())
+          + f", {failed} échec(s), {up_to_date} fichier(s) à jour en {elapsed:.1f} s")
+    if todo:
+        print(f"   {len(todo) / elapsed:.1f} fichiers/s")
+
+
+if __name__ == "__main__":
+    main()
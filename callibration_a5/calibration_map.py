@@ -0,0 +1,218 @@
+"""Correspondance feuille A5 (mm) → angles des articulations du SO-100.
+
+Les poses mesurées (CENTER et les quatre coins de coordonnees_a5.txt, plus
+d'éventuels points supplémentaires) servent à ajuster, articulation par
+articulation, un polynôme en (x, y) par moindres carrés : bilinéaire sur les
+coins plus un terme en « bulle » nul sur les bords, qui fait passer la surface
+par CENTER (5 à 8 points), biquadratique à partir de 9 points. Ce polynôme est
+évalué une seule fois sur une grille dense couvrant la feuille ; convertir un
+tracé revient ensuite à une interpolation bilinéaire dans cette grille, en un
+seul appel NumPy pour toute la polyligne.
+
+Repère de la feuille : origine au coin haut gauche, x vers la droite, y vers le
+bas, en millimètres (A5 paysage : 210 x 148,5).
+
+L'API du robot attend des radians, le dataset des degrés : `to_joints` renvoie
+"rad", "deg" ou "motor_units" (ces dernières sont ajustées sur leur propre bloc
+de mesures).
+
+Exemple :
+    calibration = CalibrationMap.from_file("coordonnees_a5.txt")
+    angles = calibration.to_joints(polyline_mm, unit="rad")  # (N, 6)
+"""
+import json
+import re
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+# === CONFIGURATION ===
+COORDINATES_FILE = Path(__file__).with_name("coordonnees_a5.txt")
+EXTRA_POINTS_FILE = Path(__file__).with_name("mesures_a5.json")  # optionnel
+A5_WIDTH_MM = 210.0
+A5_HEIGHT_MM = 148.5
+# Position de la zone A5 sur la feuille A4 des SVG (translate(43,30) de createSvg.ipynb)
+A5_ORIGIN_ON_A4_MM = (43.0, 30.0)
+GRID_STEP_MM = 0.5
+
+# Ordre des angles dans les requêtes /joints/write
+JOINT_NAMES = ["shoulder_pan", "shoulder_lift", "elbow_flex", "wrist_flex", "wrist_roll", "gripper"]
+
+# Position des poses nommées de coordonnees_a5.txt sur la feuille
+NAMED_POSITIONS_MM = {
+    "CENTER": (A5_WIDTH_MM / 2, A5_HEIGHT_MM / 2),
+    "TOP_LEFT": (0.0, 0.0),
+    "TOP_RIGHT": (A5_WIDTH_MM, 0.0),
+    "BOTTOM_LEFT": (0.0, A5_HEIGHT_MM),
+    "BOTTOM_RIGHT": (A5_WIDTH_MM, A5_HEIGHT_MM),
+}
+
+UNITS = ("rad", "deg", "motor_units")
+
+_POSE = re.compile(r"^([A-Z_]+)\s*\n-{3,}\s*\n\s*(\{.*?\})", re.MULTILINE | re.DOTALL)
+
+
+def parse_coordinates(path: str | Path = COORDINATES_FILE) -> dict[str, dict[str, np.ndarray]]:
+    """Lit les poses de coordonnees_a5.txt.
+
+    Returns:
+        {unité: {nom de la pose: angles}}, par exemple {"rad": {"CENTER": array([0., 1.2, ...])}}
+    """
+    text = Path(path).read_text()
+    poses: dict[str, dict[str, np.ndarray]] = {}
+    for name, body in _POSE.findall(text):
+        pose = json.loads(body)
+        poses.setdefault(pose["unit"], {})[name] = np.asarray(pose["angles"], dtype=np.float64)
+    return poses
+
+
+def load_extra_points(path: str | Path = EXTRA_POINTS_FILE) -> list[tuple[tuple[float, float], list[float], str]]:
+    """Lit des mesures supplémentaires : [{"position_mm": [x, y], "angles": [...], "unit": "rad"}, ...]."""
+    path = Path(path)
+    if not path.exists():
+        return []
+    with open(path) as f:
+        return [(tuple(p["position_mm"]), p["angles"], p["unit"]) for p in json.load(f)]
+
+
+def _features(x: np.ndarray, y: np.ndarray, n_points: int) -> np.ndarray:
+    """Termes du polynôme ajusté sur n_points mesures, avec x et y ramenés à [0, 1]."""
+    u, v = x / A5_WIDTH_MM, y / A5_HEIGHT_MM
+    if n_points >= 9:
+        return np.stack([u ** i * v ** j for i in range(3) for j in range(3)], axis=-1)
+    terms = [np.ones_like(u), u, v, u * v]
+    if n_points >= 5:
+        terms.append(u * (1 - u) * v * (1 - v))
+    return np.stack(terms, axis=-1)
+
+
+class _Grid:
+    """Valeurs d'un ajustement sur une grille régulière, interpolées bilinéairement."""
+
+    def __init__(self, values: np.ndarray, step: float):
+        self.values = values  # (ny, nx, J)
+        self.step = step
+
+    def lookup(self, points: np.ndarray) -> np.ndarray:
+        ny, nx, n_joints = self.values.shape
+        fx = np.clip(points[:, 0] / self.step, 0, nx - 1)
+        fy = np.clip(points[:, 1] / self.step, 0, ny - 1)
+        x0 = np.minimum(fx.astype(np.intp), nx - 2)
+        y0 = np.minimum(fy.astype(np.intp), ny - 2)
+        wx = (fx - x0)[:, None]
+        wy = (fy - y0)[:, None]
+        # Lecture des quatre voisins par indices à plat, plus rapide que l'indexation 2D
+        flat = self.values.reshape(-1, n_joints)
+        i = y0 * nx + x0
+        top = flat.take(i, axis=0)
+        top += (flat.take(i + 1, axis=0) - top) * wx
+        bottom = flat.take(i + nx, axis=0)
+        bottom += (flat.take(i + nx + 1, axis=0) - bottom) * wx
+        top += (bottom - top) * wy
+        return top
+
+
+class CalibrationMap:
+    """Convertit des positions sur la feuille A5 (mm) en angles des articulations.
+
+    Args:
+        measures: {unité: (positions (N, 2) en mm, angles (N, J))}, unité "rad" ou "motor_units".
+        step: Pas de la grille d'interpolation, en mm.
+    """
+
+    def __init__(self, measures: dict[str, tuple[np.ndarray, np.ndarray]], step: float = GRID_STEP_MM):
+        if not measures:
+            raise ValueError("Aucune mesure de calibration.")
+        self.step = step
+        self.measures = measures
+        self.coefficients: dict[str, np.ndarray] = {}
+        self._grids: dict[str, _Grid] = {}
+
+        nx = int(np.ceil(A5_WIDTH_MM / step)) + 1
+        ny = int(np.ceil(A5_HEIGHT_MM / step)) + 1
+        gx, gy = np.meshgrid(np.arange(nx) * step, np.arange(ny) * step)
+        for unit, (positions, angles) in measures.items():
+            if len(positions) < 4:
+                raise ValueError(f"Au moins 4 mesures sont nécessaires en {unit}, {len(positions)} fournie(s).")
+            n_points = len(positions)
+            a = _features(positions[:, 0], positions[:, 1], n_points)
+            self.coefficients[unit] = np.linalg.lstsq(a, angles, rcond=None)[0]
+            self._grids[unit] = _Grid(_features(gx, gy, n_points) @ self.coefficients[unit], step)
+
+    @classmethod
+    def from_file(
+        cls,
+        path: str | Path = COORDINATES_FILE,
+        extra_points: list[tuple[tuple[float, float], list[float], str]] | None = None,
+        step: float = GRID_STEP_MM,
+    ) -> "CalibrationMap":
+        """Ajuste la correspondance sur coordonnees_a5.txt et les mesures supplémentaires."""
+        positions: dict[str, list] = {}
+        angles: dict[str, list] = {}
+        for unit, poses in parse_coordinates(path).items():
+            for name, pose in poses.items():
+                if name in NAMED_POSITIONS_MM:
+                    positions.setdefault(unit, []).append(NAMED_POSITIONS_MM[name])
+                    angles.setdefault(unit, []).append(pose)
+        for position, pose, unit in extra_points or []:
+            if unit == "deg":
+                unit, pose = "rad", np.radians(pose)
+            positions.setdefault(unit, []).append(position)
+            angles.setdefault(unit, []).append(pose)
+
+        measures = {unit: (np.asarray(positions[unit], dtype=np.float64), np.asarray(angles[unit], dtype=np.float64))
+                    for unit in positions}
+        return cls(measures, step)
+
+    def to_joints(
+        self, points_mm: np.ndarray, unit: str = "rad", origin_mm: tuple[float, float] = (0.0, 0.0)
+    ) -> np.ndarray:
+        """Convertit des positions (N, 2) en angles (N, J), en une seule interpolation vectorisée.
+
+        Args:
+            points_mm: Positions en mm dans le repère de la feuille A5.
+            unit: "rad" (API), "deg" (dataset) ou "motor_units".
+            origin_mm: Position de la zone A5 dans le repère des points, par exemple
+                A5_ORIGIN_ON_A4_MM pour des tracés issus des SVG A4.
+
+        Les positions hors de la feuille sont ramenées sur son bord.
+        """
+        if unit not in UNITS:
+            raise ValueError(f"Unité inconnue : {unit} (attendu : {', '.join(UNITS)})")
+        source = "rad" if unit == "deg" else unit
+        if source not in self._grids:
+            raise ValueError(f"Aucune mesure en {source} pour cette calibration.")
+
+        points = np.asarray(points_mm, dtype=np.float64).reshape(-1, 2)
+        if origin_mm != (0.0, 0.0):
+            points = points - np.asarray(origin_mm, dtype=np.float64)
+        angles = self._grids[source].lookup(points)
+        return np.degrees(angles) if unit == "deg" else angles
+
+    def residuals(self, unit: str = "rad") -> np.ndarray:
+        """Écart (N, J) entre la grille et les angles mesurés, aux points de mesure."""
+        positions, angles = self.measures[unit]
+        return self.to_joints(positions, unit) - angles
+
+
+def main():
+    path = Path(sys.argv[1]) if len(sys.argv) > 1 else COORDINATES_FILE
+    calibration = CalibrationMap.from_file(path, load_extra_points())
+
+    for unit in calibration.measures:
+        error = np.abs(calibration.residuals(unit)).max(axis=0)
+        print(f"📐 {unit} : {len(calibration.measures[unit][0])} mesures, "
+              f"{len(calibration.coefficients[unit])} termes")
+        print("   écart max : " + ", ".join(f"{name} {e:.3g}" for name, e in zip(JOINT_NAMES, error)))
+
+    points = np.random.default_rng(0).uniform((0, 0), (A5_WIDTH_MM, A5_HEIGHT_MM), size=(1_000_000, 2))
+    start = time.perf_counter()
+    calibration.to_joints(points, unit="deg")
+    elapsed = time.perf_counter() - start
+    print(f"⚡ {len(points)} points convertis en {elapsed * 1000:.0f} ms ({elapsed / len(points) * 1e9:.0f} ns/point)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,125 +1,47 @@
-import requests
+import argparse
 import time
 
-# base_url = "http://heuzef.com:8020"
-base_url = "http://127.0.0.1"
-
-headers = {
-    "accept": "application/json",
-    "Content-Type": "application/json"
-}
-
-# Init
-endpoint_init = "/move/init"
-url_init = f"{base_url}{endpoint_init}"
-
-# Joints write
-endpoint_write = "/joints/write?robot_id=0"
-url_write = f"{base_url}{endpoint_write}"
-
-try:
-    # Init
-    response_init = requests.post(url_init)
-    print(f"INIT")
-    print(f"Réponse: {response_init.text}")
-
-    time.sleep(2)
-
-    # Center
-    data_center = {
-    "angles": [
-        0.00,
-        1.20,
-        0.00,
-        -1.00,
-        -1.57,
-        -1.10
-    ],
-    "unit": "rad"
-    }
-
-    response_write = requests.post(url_write, headers=headers, json=data_center)
-    print(f"CENTER")
-    print(f"Réponse: {response_init.text}")
-
-    time.sleep(2)
-
-    # Top right
-    data_top_right = {
-    "angles": [
-        -0.36,
-        1.80,
-        -1.15,
-        -0.46,
-        -1.57,
-        -1.10
-    ],
-    "unit": "rad"
-    }
-
-    response_write = requests.post(url_write, headers=headers, json=data_top_right)
-    print(f"TOP RIGHT")
-    print(f"Réponse: {response_init.text}")
-
-    time.sleep(2)
-
-    # Top left
-    data_top_left = {
-    "angles": [
-        0.36,
-        1.80,
-        -1.15,
-        -0.46,
-        -1.57,
-        -1.10
-    ],
-    "unit": "rad"
-    }
-
-    response_write = requests.post(url_write, headers=headers, json=data_top_left)
-    print(f"TOP_LEFT")
-    print(f"Réponse: {response_init.text}")
-
-    time.sleep(2)
-
-    # Bottom right
-    data_bottom_right = {
-    "angles": [
-        -0.46,
-        1.00,
-        0.50,
-        -1.00,
-        -1.57,
-        -1.10
-    ],
-    "unit": "rad"
-    }
+import requests
 
-    response_write = requests.post(url_write, headers=headers, json=data_bottom_right)
-    print(f"BOTTOM RIGHT")
-    print(f"Réponse: {response_init.text}")
+from calibration_map import parse_coordinates
+from joint_client import JointClient
 
-    time.sleep(2)
+# base_url = "http://heuzef.com:8020"
+base_url = "http://127.0.0.1"
 
-    # Bottom left
-    data_bottom_left = {
-    "angles": [
-        0.46,
-        1.00,
-        0.50,
-        -1.00,
-        -1.57,
-        -1.10
-    ],
-    "unit": "rad"
-    }
+# Poses de coordonnees_a5.txt, dans l'ordre de passage
+POSES = ["CENTER", "TOP_RIGHT", "TOP_LEFT", "BOTTOM_RIGHT", "BOTTOM_LEFT"]
+UNIT = "rad"
 
-    response_write = requests.post(url_write, headers=headers, json=data_bottom_left)
-    print(f"BOTTOM LEFT")
-    print(f"Réponse: {response_init.text}")
+parser = argparse.ArgumentParser(description="Place le robot successivement sur les poses de calibration A5.")
+parser.add_argument("--url", default=base_url, help="adresse de l'API (défaut : %(default)s)")
+parser.add_argument("--mock", action="store_true", help="utilise un serveur simulé local (mock_server.py)")
+args = parser.parse_args()
 
-    time.sleep(2)
+if args.mock:
+    from mock_server import start_mock_server
+    server, _ = start_mock_server()
+    args.url = f"http://127.0.0.1:{server.server_port}"
 
+poses = parse_coordinates()[UNIT]
+start = time.perf_counter()
 
-except requests.exceptions.RequestException as e:
+try:
+    with JointClient(args.url) as client:
+        # Init
+        response_init = client.init()
+        print(f"INIT")
+        print(f"Réponse: {response_init}")
+        # /move/init rejoint sa propre pose, pas forcément CENTER : on attend la fin du mouvement
+        if not client.wait_until_settled(UNIT):
+            print("⚠️ Le robot bouge encore après l'init, on continue")
+
+        for name in POSES:
+            response_write = client.move_to(poses[name], UNIT)
+            print(f"{name.replace('_', ' ')}")
+            print(f"Réponse: {response_write}")
+
+    print(f"⏱️ Calibration terminée en {time.perf_counter() - start:.1f} s")
+
+except (requests.exceptions.RequestException, TimeoutError) as e:
     print(f"Erreur lors des requêtes: {e}")
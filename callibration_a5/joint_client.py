@@ -0,0 +1,324 @@
+"""Client de l'API phosphobot (/move/init, /joints/write, /joints/read).
+
+Une seule session HTTP keep-alive est réutilisée pour toutes les requêtes, au
+lieu d'ouvrir une connexion par appel. Après une commande, le client interroge
+/joints/read jusqu'à ce que la pose soit atteinte, au lieu d'attendre une durée
+fixe. `stream` envoie une trajectoire complète avec un nombre borné de requêtes
+en vol.
+
+`AsyncJointClient` offre la même interface pour asyncio. Pour tester sans robot,
+lancer mock_server.py et pointer le client sur http://127.0.0.1:8020.
+
+Exemple :
+    with JointClient("http://127.0.0.1:8020") as client:
+        client.init()
+        client.move_to([0.0, 1.2, 0.0, -1.0, -1.57, -1.1])
+"""
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import requests
+from requests.adapters import HTTPAdapter
+
+# === CONFIGURATION ===
+BASE_URL = "http://127.0.0.1"
+ROBOT_ID = 0
+REQUEST_TIMEOUT_S = 5.0
+TOLERANCE_RAD = 0.02  # écart max par articulation pour considérer la pose atteinte
+TOLERANCE_MOTOR_UNITS = 15
+GRIPPER_JOINT = 5  # la pince, fermée sur le feutre, n'atteint jamais sa consigne
+GRIPPER_TOLERANCE = None  # écart toléré pour la pince, dans l'unité des consignes (None : non vérifiée)
+SETTLE_S = 0.2  # durée sans mouvement pour considérer une pose inconnue atteinte (après /move/init)
+POLL_INTERVAL_S = 0.05
+MOVE_TIMEOUT_S = 5.0
+FALLBACK_SETTLE_S = 2.0  # attente fixe si le serveur n'expose pas /joints/read
+MAX_IN_FLIGHT = 4
+
+HEADERS = {"accept": "application/json", "Content-Type": "application/json"}
+
+
+def joint_tolerances(n_joints: int, unit: str = "rad", tolerance: float | None = None) -> np.ndarray:
+    """Écart toléré pour chaque articulation, GRIPPER_TOLERANCE pour la pince."""
+    if tolerance is None:
+        tolerance = TOLERANCE_MOTOR_UNITS if unit == "motor_units" else TOLERANCE_RAD
+    tolerances = np.full(n_joints, float(tolerance))
+    if GRIPPER_JOINT is not None and GRIPPER_JOINT < n_joints:
+        tolerances[GRIPPER_JOINT] = np.inf if GRIPPER_TOLERANCE is None else GRIPPER_TOLERANCE
+    return tolerances
+
+
+class JointPoll:
+    """Décision, lecture après lecture, d'une attente sur /joints/read.
+
+    Partagée par JointClient et AsyncJointClient, qui ne diffèrent que par la
+    façon de lire et de patienter entre deux lectures.
+
+    Args:
+        target: Pose attendue, ou None pour attendre que les articulations ne
+            bougent plus depuis SETTLE_S.
+        timeout: Durée maximale de l'attente, en secondes.
+    """
+
+    def __init__(self, target, unit: str = "rad", tolerance: float | None = None, timeout: float = MOVE_TIMEOUT_S):
+        self.target = None if target is None else np.asarray(target, dtype=np.float64)
+        self.unit = unit
+        self.tolerance = tolerance
+        self.deadline = time.monotonic() + timeout
+        self.previous = None
+        self.still_since = None
+
+    def update(self, current: np.ndarray) -> bool | None:
+        """Prend en compte une lecture : True si l'attente est finie, False après timeout, None pour relire."""
+        now = time.monotonic()
+        tolerances = joint_tolerances(len(current), self.unit, self.tolerance)
+        if self.target is not None:
+            if np.all(np.abs(current - self.target) <= tolerances):
+                return True
+        elif self.previous is not None and np.all(np.abs(current - self.previous) <= tolerances):
+            self.still_since = now if self.still_since is None else self.still_since
+            if now - self.still_since >= SETTLE_S:
+                return True
+        else:
+            self.still_since = None
+        self.previous = current
+        return False if now >= self.deadline else None
+
+
+class JointClient:
+    """Client synchrone, à session HTTP partagée.
+
+    Args:
+        base_url: Adresse du serveur phosphobot.
+        robot_id: Robot commandé.
+        timeout: Délai maximal d'une requête, en secondes.
+        pool_size: Nombre de connexions gardées ouvertes (au moins max_in_flight).
+    """
+
+    def __init__(self, base_url: str = BASE_URL, robot_id: int = ROBOT_ID, timeout: float = REQUEST_TIMEOUT_S,
+                 pool_size: int = MAX_IN_FLIGHT):
+        self.base_url = base_url.rstrip("/")
+        self.robot_id = robot_id
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.headers.update(HEADERS)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        # None tant qu'on ne sait pas si le serveur expose /joints/read
+        self.can_read: bool | None = None
+
+    def __enter__(self) -> "JointClient":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.session.close()
+
+    def _post(self, endpoint: str, payload: dict | None = None, robot: bool = True) -> dict:
+        params = {"robot_id": self.robot_id} if robot else None
+        response = self.session.post(f"{self.base_url}{endpoint}", params=params, json=payload, timeout=self.timeout)
+        response.raise_for_status()
+        return response.json() if response.content else {}
+
+    def init(self) -> dict:
+        """Place le robot en position initiale."""
+        return self._post("/move/init", robot=False)
+
+    def write(self, angles, unit: str = "rad") -> dict:
+        """Envoie une consigne d'angles, sans attendre le mouvement."""
+        return self._post("/joints/write", {"angles": [float(a) for a in angles], "unit": unit})
+
+    def read(self, unit: str = "rad") -> np.ndarray:
+        """Lit les angles actuels des articulations."""
+        return np.asarray(self._post("/joints/read", {"unit": unit})["angles"], dtype=np.float64)
+
+    def reached(self, target, unit: str = "rad", tolerance: float | None = None) -> bool:
+        """Indique si les angles actuels sont à moins de tolerance de target (pince exceptée, voir GRIPPER_TOLERANCE)."""
+        current = self.read(unit)
+        tolerances = joint_tolerances(len(current), unit, tolerance)
+        return bool(np.all(np.abs(current - np.asarray(target, dtype=np.float64)) <= tolerances))
+
+    def read_unavailable(self, error: requests.HTTPError) -> bool:
+        """Indique si error montre que le serveur n'expose pas /joints/read (404 ou 405 à la première lecture).
+
+        Dans ce cas, les attentes suivantes passent à l'attente fixe FALLBACK_SETTLE_S.
+        """
+        if self.can_read is None and error.response is not None and error.response.status_code in (404, 405):
+            self.can_read = False
+            print("⚠️ /joints/read indisponible : attente fixe entre les poses")
+            return True
+        return False
+
+    def wait_until_reached(self, target, unit: str = "rad", tolerance: float | None = None,
+                           timeout: float = MOVE_TIMEOUT_S) -> bool:
+        """Interroge /joints/read jusqu'à ce que la pose soit atteinte.
+
+        Sans /joints/read sur le serveur, attend FALLBACK_SETTLE_S.
+
+        Returns:
+            False si la pose n'est pas atteinte avant timeout.
+        """
+        return self._wait(JointPoll(target, unit, tolerance, timeout))
+
+    def wait_until_settled(self, unit: str = "rad", tolerance: float | None = None,
+                           timeout: float = MOVE_TIMEOUT_S) -> bool:
+        """Attend que les articulations ne bougent plus depuis SETTLE_S, pour une pose inconnue à l'avance
+        (celle de /move/init par exemple).
+
+        Sans /joints/read sur le serveur, attend FALLBACK_SETTLE_S.
+
+        Returns:
+            False si les articulations bougent encore après timeout.
+        """
+        return self._wait(JointPoll(None, unit, tolerance, timeout))
+
+    def _wait(self, poll: JointPoll) -> bool:
+        while self.can_read is not False:
+            try:
+                current = self.read(poll.unit)
+            except requests.HTTPError as e:
+                if not self.read_unavailable(e):
+                    raise
+                break
+            self.can_read = True
+            done = poll.update(current)
+            if done is not None:
+                return done
+            time.sleep(POLL_INTERVAL_S)
+        time.sleep(FALLBACK_SETTLE_S)
+        return True
+
+    def move_to(self, angles, unit: str = "rad", wait: bool = True, tolerance: float | None = None,
+                timeout: float = MOVE_TIMEOUT_S, strict: bool = False) -> dict:
+        """Envoie une pose et, si wait, attend qu'elle soit atteinte.
+
+        Une pose non atteinte avant timeout est signalée, puis la suite continue,
+        comme avec l'attente fixe d'origine.
+
+        Raises:
+            TimeoutError: Avec strict, si la pose n'est pas atteinte avant timeout.
+        """
+        response = self.write(angles, unit)
+        if wait and not self.wait_until_reached(angles, unit, tolerance, timeout):
+            if strict:
+                raise TimeoutError(f"Pose non atteinte en {timeout} s : {list(angles)}")
+            print(f"⚠️ Pose non atteinte en {timeout} s, on continue : {list(angles)}")
+        return response
+
+    def stream(self, trajectory, unit: str = "rad", rate_hz: float | None = None,
+               max_in_flight: int = MAX_IN_FLIGHT) -> list[dict]:
+        """Envoie chaque ligne de trajectory (N, J), avec au plus max_in_flight requêtes en attente.
+
+        Args:
+            rate_hz: Cadence d'envoi des consignes (None : aussi vite que possible).
+
+        Returns:
+            Les réponses, dans l'ordre de la trajectoire.
+        """
+        period = 1.0 / rate_hz if rate_hz else 0.0
+        slots = threading.BoundedSemaphore(max_in_flight)
+
+        def send(angles):
+            try:
+                return self.write(angles, unit)
+            finally:
+                slots.release()
+
+        futures = []
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=max_in_flight) as pool:
+            for i, angles in enumerate(trajectory):
+                if period:
+                    delay = start + i * period - time.perf_counter()
+                    if delay > 0:
+                        time.sleep(delay)
+                slots.acquire()
+                futures.append(pool.submit(send, angles))
+            return [future.result() for future in futures]
+
+
+class AsyncJointClient:
+    """Variante asyncio de JointClient : les requêtes passent par la même session, dans des threads."""
+
+    def __init__(self, base_url: str = BASE_URL, robot_id: int = ROBOT_ID, timeout: float = REQUEST_TIMEOUT_S,
+                 pool_size: int = MAX_IN_FLIGHT):
+        self.client = JointClient(base_url, robot_id, timeout, pool_size)
+
+    async def __aenter__(self) -> "AsyncJointClient":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        self.client.close()
+
+    async def init(self) -> dict:
+        return await asyncio.to_thread(self.client.init)
+
+    async def write(self, angles, unit: str = "rad") -> dict:
+        return await asyncio.to_thread(self.client.write, angles, unit)
+
+    async def read(self, unit: str = "rad") -> np.ndarray:
+        return await asyncio.to_thread(self.client.read, unit)
+
+    async def wait_until_reached(self, target, unit: str = "rad", tolerance: float | None = None,
+                                 timeout: float = MOVE_TIMEOUT_S) -> bool:
+        """Comme JointClient.wait_until_reached, sans bloquer la boucle d'événements."""
+        return await self._wait(JointPoll(target, unit, tolerance, timeout))
+
+    async def wait_until_settled(self, unit: str = "rad", tolerance: float | None = None,
+                                 timeout: float = MOVE_TIMEOUT_S) -> bool:
+        """Comme JointClient.wait_until_settled, sans bloquer la boucle d'événements."""
+        return await self._wait(JointPoll(None, unit, tolerance, timeout))
+
+    async def _wait(self, poll: JointPoll) -> bool:
+        while self.client.can_read is not False:
+            try:
+                current = await self.read(poll.unit)
+            except requests.HTTPError as e:
+                if not self.client.read_unavailable(e):
+                    raise
+                break
+            self.client.can_read = True
+            done = poll.update(current)
+            if done is not None:
+                return done
+            await asyncio.sleep(POLL_INTERVAL_S)
+        await asyncio.sleep(FALLBACK_SETTLE_S)
+        return True
+
+    async def move_to(self, angles, unit: str = "rad", wait: bool = True, tolerance: float | None = None,
+                      timeout: float = MOVE_TIMEOUT_S, strict: bool = False) -> dict:
+        response = await self.write(angles, unit)
+        if wait and not await self.wait_until_reached(angles, unit, tolerance, timeout):
+            if strict:
+                raise TimeoutError(f"Pose non atteinte en {timeout} s : {list(angles)}")
+            print(f"⚠️ Pose non atteinte en {timeout} s, on continue : {list(angles)}")
+        return response
+
+    async def stream(self, trajectory, unit: str = "rad", rate_hz: float | None = None,
+                     max_in_flight: int = MAX_IN_FLIGHT) -> list[dict]:
+        """Comme JointClient.stream, avec un sémaphore asyncio."""
+        period = 1.0 / rate_hz if rate_hz else 0.0
+        slots = asyncio.Semaphore(max_in_flight)
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+
+        async def send(angles):
+            try:
+                return await self.write(angles, unit)
+            finally:
+                slots.release()
+
+        tasks = []
+        for i, angles in enumerate(trajectory):
+            if period:
+                delay = start + i * period - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            await slots.acquire()
+            tasks.append(asyncio.create_task(send(angles)))
+        return list(await asyncio.gather(*tasks))
@@ -0,0 +1,148 @@
+"""Serveur local qui imite l'API phosphobot, pour tester sans robot.
+
+Les articulations rejoignent la consigne à vitesse constante (MAX_SPEED_RAD_S),
+ce qui permet de vérifier l'attente de fin de mouvement de joint_client.py.
+
+Usage :
+    python mock_server.py --port 8020
+    python callibration_a5.py --url http://127.0.0.1:8020
+"""
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+import numpy as np
+
+# === CONFIGURATION ===
+MAX_SPEED_RAD_S = 2.0
+LATENCY_S = 0.005  # temps de traitement simulé de chaque requête
+INIT_ANGLES = [0.0, 1.2, 0.0, -1.0, -1.57, -1.1]
+# Correspondance approximative rad → unités moteur (4096 pas par tour, 2048 au centre)
+MOTOR_UNITS_PER_RAD = 4096 / (2 * np.pi)
+
+
+class MockRobot:
+    """Articulations qui se déplacent linéairement vers la dernière consigne."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.start = np.array(INIT_ANGLES)
+        self.target = np.array(INIT_ANGLES)
+        self.start_time = time.monotonic()
+        self.writes = 0
+        self.can_read = True  # False : imite un serveur sans /joints/read
+        self.in_flight = 0
+        self.peak_in_flight = 0  # plus grand nombre de requêtes traitées en même temps
+
+    def position(self) -> np.ndarray:
+        with self.lock:
+            delta = self.target - self.start
+            duration = np.abs(delta).max() / MAX_SPEED_RAD_S
+            if duration == 0:
+                return self.target.copy()
+            progress = min((time.monotonic() - self.start_time) / duration, 1.0)
+            return self.start + delta * progress
+
+    def write(self, angles) -> None:
+        current = self.position()
+        with self.lock:
+            self.start = current
+            self.target = np.asarray(angles, dtype=np.float64)
+            self.start_time = time.monotonic()
+            self.writes += 1
+
+    def begin_request(self) -> None:
+        with self.lock:
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+
+    def end_request(self) -> None:
+        with self.lock:
+            self.in_flight -= 1
+
+
+def to_rad(angles, unit: str) -> np.ndarray:
+    angles = np.asarray(angles, dtype=np.float64)
+    if unit == "deg":
+        return np.radians(angles)
+    if unit == "motor_units":
+        return (angles - 2048) / MOTOR_UNITS_PER_RAD
+    return angles
+
+
+def from_rad(angles: np.ndarray, unit: str) -> np.ndarray:
+    if unit == "deg":
+        return np.degrees(angles)
+    if unit == "motor_units":
+        return angles * MOTOR_UNITS_PER_RAD + 2048
+    return angles
+
+
+def make_handler(robot: MockRobot):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive, comme le serveur réel
+
+        def log_message(self, format, *args):
+            pass
+
+        def _reply(self, status: int, payload: dict) -> None:
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            payload = json.loads(self.rfile.read(length) or b"{}")
+            robot.begin_request()
+            try:
+                self._handle(urlparse(self.path).path, payload)
+            finally:
+                robot.end_request()
+
+        def _handle(self, path: str, payload: dict) -> None:
+            time.sleep(LATENCY_S)
+            if path == "/move/init":
+                robot.write(INIT_ANGLES)
+                self._reply(200, {"status": "ok"})
+            elif path == "/joints/write":
+                robot.write(to_rad(payload["angles"], payload.get("unit", "rad")))
+                self._reply(200, {"status": "ok"})
+            elif path == "/joints/read" and robot.can_read:
+                unit = payload.get("unit", "rad")
+                self._reply(200, {"angles": from_rad(robot.position(), unit).tolist(), "unit": unit})
+            else:
+                self._reply(404, {"detail": "Not Found"})
+
+    return Handler
+
+
+def start_mock_server(port: int = 0) -> tuple[ThreadingHTTPServer, MockRobot]:
+    """Démarre le serveur dans un thread ; port 0 choisit un port libre (server.server_port)."""
+    robot = MockRobot()
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(robot))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, robot
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Imite l'API phosphobot en local.")
+    parser.add_argument("--port", type=int, default=8020)
+    args = parser.parse_args()
+
+    server, _ = start_mock_server(args.port)
+    print(f"🤖 Serveur simulé sur http://127.0.0.1:{server.server_port} (Ctrl+C pour arrêter)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,38 @@
-"""Custom camera implementations for caligraphomate."""
+"""Custom camera implementations for caligraphomate.
 
-from .static_camera import StaticCamera, StaticCameraConfig
+Exports are resolved on first access, so that importing a single submodule
+(e.g. `cameras.target_atlas`) does not load PyAV and lerobot through the others.
+"""
 
-__all__ = ["StaticCamera", "StaticCameraConfig"]
+import importlib
+
+_EXPORTS = {
+    "CaptureGroup": ".capture_group",
+    "FrameSet": ".capture_group",
+    "GroupedCamera": ".capture_group",
+    "FrameBus": ".frame_bus",
+    "FrameBusCamera": ".frame_bus",
+    "FrameBusCameraConfig": ".frame_bus",
+    "FrameBusReader": ".frame_bus",
+    "FrameRef": ".frame_bus",
+    "ProceduralTargets": ".procedural_targets",
+    "ShapeSpec": ".procedural_targets",
+    "StaticCamera": ".static_camera",
+    "StaticCameraConfig": ".static_camera",
+    "VideoFileCamera": ".video_file_camera",
+    "VideoFileCameraConfig": ".video_file_camera",
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name: str):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,303 @@
+#!/usr/bin/env python
+
+"""CaptureGroup: captures several cameras on their own threads and returns time-aligned frames."""
+
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+from lerobot.cameras.camera import Camera
+from lerobot.cameras.configs import ColorMode
+
+
+@dataclass
+class FrameSet:
+    """Frames of every camera of a group, aligned on a common time.
+
+    Attributes:
+        frames: Frame of each camera.
+        timestamps: Capture time (time.perf_counter()) of each frame. Static
+            cameras have no capture time and are left out.
+        reference: Time the frames were aligned on.
+        skew_s: Largest distance between a frame's capture time and the reference.
+        stale: Cameras left out of the alignment because their latest frame is
+            too old; their latest frame is returned anyway.
+    """
+    frames: dict[str, np.ndarray]
+    timestamps: dict[str, float]
+    reference: float
+    skew_s: float
+    stale: list[str]
+
+
+class _CaptureThread:
+    """Reads one camera as fast as it delivers frames into a ring buffer of timestamped frames."""
+
+    def __init__(self, name: str, camera: Camera, buffer_size: int, condition: threading.Condition):
+        self.name = name
+        self.camera = camera
+        self.condition = condition
+        # (capture time, frame), oldest first
+        self.ring: deque[tuple[float, np.ndarray]] = deque(maxlen=buffer_size)
+        self.frame_count = 0
+        self.error: BaseException | None = None
+        self._stop_event = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        self._stop_event.clear()
+        self.error = None
+        self._thread = threading.Thread(target=self._run, name=f"{self.name}_capture", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        try:
+            while not self._stop_event.is_set():
+                # read() blocks until the device delivers the next frame
+                frame = self.camera.read()
+                timestamp = time.perf_counter()
+                with self.condition:
+                    self.ring.append((timestamp, frame))
+                    self.frame_count += 1
+                    self.condition.notify_all()
+        except BaseException as e:
+            with self.condition:
+                self.error = e
+                self.condition.notify_all()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+            self._thread = None
+
+    def closest(self, reference: float) -> tuple[float, np.ndarray]:
+        """Buffered frame captured closest to the reference time. Lock must be held."""
+        return min(self.ring, key=lambda item: abs(item[0] - reference))
+
+
+class CaptureGroup:
+    """Captures several cameras in parallel and returns their frames aligned in time.
+
+    Reading cameras one after the other inside a control tick adds their
+    latencies, and mixes frames captured at different times. Here, each camera
+    is read by its own thread, as fast as the device delivers frames, into a
+    small ring buffer of timestamped frames. read_aligned() never waits for a
+    device: it aligns on the latest frame of the camera that is furthest
+    behind and picks, for every other camera, the buffered frame captured
+    closest to it.
+
+    A camera whose latest frame is older than `stale_after_s` (unplugged,
+    stalled) is left out of the alignment so it does not drag the others back
+    in time; its latest frame is still returned. Static cameras (a target
+    image) have no capture thread and are read when the set is built.
+
+    install() puts the group behind a robot's cameras: robot.get_observation()
+    then reads one aligned set per tick.
+
+    Args:
+        cameras: Cameras of the group, by name.
+        static: Names of the cameras whose image does not change over time.
+        buffer_size: Frames kept per camera (8 frames cover ~270 ms at 30 fps).
+        stale_after_s: Age after which a camera is left out of the alignment.
+
+    Example:
+        group = CaptureGroup(robot.cameras, static=["target"])
+        group.connect()
+        frame_set = group.read_aligned()
+        print(frame_set.skew_s)
+    """
+
+    def __init__(self, cameras: dict[str, Camera], static: list[str] | tuple[str, ...] = (),
+                 buffer_size: int = 8, stale_after_s: float = 0.1):
+        if buffer_size < 1:
+            raise ValueError(f"`buffer_size` must be at least 1, but {buffer_size} is provided.")
+        unknown = set(static) - set(cameras)
+        if unknown:
+            raise ValueError(f"Unknown static cameras: {sorted(unknown)}")
+
+        self.cameras = dict(cameras)
+        self.static = [name for name in cameras if name in static]
+        self.stale_after_s = stale_after_s
+        self._condition = threading.Condition()
+        self._captures = {
+            name: _CaptureThread(name, camera, buffer_size, self._condition)
+            for name, camera in cameras.items() if name not in static
+        }
+        self._connected = False
+
+        # Aligned set shared by the views of one tick (see GroupedCamera)
+        self._current: FrameSet | None = None
+        self._consumed: set[str] = set()
+        self.skews: deque[float] = deque(maxlen=1000)
+
+    def __enter__(self) -> "CaptureGroup":
+        self.connect()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.disconnect()
+
+    @property
+    def is_connected(self) -> bool:
+        return self._connected
+
+    def connect(self, warmup: bool = True, timeout_s: float = 5.0) -> None:
+        """Connect every camera and start the capture threads.
+
+        Args:
+            warmup: Wait until every captured camera has delivered a frame.
+            timeout_s: Maximum time to wait for the first frames.
+
+        Raises:
+            TimeoutError: If a camera delivers no frame within the timeout.
+        """
+        if self._connected:
+            return
+        for camera in self.cameras.values():
+            if not camera.is_connected:
+                camera.connect()
+        for capture in self._captures.values():
+            capture.ring.clear()
+            capture.start()
+        self._connected = True
+        self._current = None
+        if warmup:
+            self._wait_first_frames(timeout_s)
+
+    def _wait_first_frames(self, timeout_s: float) -> None:
+        deadline = time.perf_counter() + timeout_s
+        with self._condition:
+            while True:
+                self._raise_errors()
+                missing = [name for name, capture in self._captures.items() if not capture.ring]
+                if not missing:
+                    return
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    raise TimeoutError(f"No frame received from: {', '.join(missing)}")
+                self._condition.wait(remaining)
+
+    def _raise_errors(self) -> None:
+        for name, capture in self._captures.items():
+            if capture.error is not None:
+                raise RuntimeError(f"Capture failed for camera '{name}'") from capture.error
+
+    def read_aligned(self, timeout_ms: float = 1000.0) -> FrameSet:
+        """Return the best time-aligned set of frames available now.
+
+        Only waits if a camera has not delivered its first frame yet.
+
+        Args:
+            timeout_ms: Maximum time to wait for first frames, in milliseconds.
+
+        Raises:
+            RuntimeError: If the group is not connected or a capture thread failed.
+            TimeoutError: If a camera delivers no frame within the timeout.
+        """
+        if not self._connected:
+            raise RuntimeError("Capture group not connected. Call connect() first.")
+        self._wait_first_frames(timeout_ms / 1000.0)
+
+        with self._condition:
+            latest = {name: capture.ring[-1][0] for name, capture in self._captures.items()}
+            newest = max(latest.values(), default=time.perf_counter())
+            stale = [name for name, t in latest.items() if newest - t > self.stale_after_s]
+            fresh = [t for name, t in latest.items() if name not in stale]
+            reference = min(fresh, default=newest)
+
+            frames, timestamps = {}, {}
+            for name, capture in self._captures.items():
+                t, frame = capture.ring[-1] if name in stale else capture.closest(reference)
+                frames[name] = frame
+                timestamps[name] = t
+
+        for name in self.static:
+            frames[name] = self.cameras[name].async_read()
+        skew = max((abs(t - reference) for name, t in timestamps.items() if name not in stale), default=0.0)
+        self.skews.append(skew)
+        return FrameSet(frames, timestamps, reference, skew, stale)
+
+    def read_for(self, name: str) -> np.ndarray:
+        """Frame of one camera for the current tick.
+
+        The first camera read in a tick builds a new aligned set; the other
+        cameras of the tick get their frame from the same set. A camera read
+        twice starts a new tick.
+        """
+        if self._current is None or name in self._consumed:
+            self._current = self.read_aligned()
+            self._consumed = set()
+        self._consumed.add(name)
+        return self._current.frames[name]
+
+    def stats(self) -> dict[str, Any]:
+        """Frames captured per camera, and alignment skew of the recent sets in milliseconds."""
+        skews = np.array(self.skews) * 1000
+        return {
+            "frames": {name: capture.frame_count for name, capture in self._captures.items()},
+            "skew_ms_p50": float(np.percentile(skews, 50)) if len(skews) else None,
+            "skew_ms_max": float(skews.max()) if len(skews) else None,
+        }
+
+    def install(self, robot) -> None:
+        """Replace the robot's cameras with views reading from this group.
+
+        The robot connects and disconnects the group through its cameras, as before.
+        """
+        for name in self.cameras:
+            robot.cameras[name] = GroupedCamera(self, name)
+
+    def disconnect(self) -> None:
+        """Stop the capture threads and disconnect every camera."""
+        if not self._connected:
+            return
+        for capture in self._captures.values():
+            capture.stop()
+        for camera in self.cameras.values():
+            if camera.is_connected:
+                camera.disconnect()
+        self._connected = False
+
+
+class GroupedCamera(Camera):
+    """One camera of a CaptureGroup, seen as a regular camera.
+
+    async_read() returns the camera's frame from the aligned set of the
+    current tick (see CaptureGroup.read_for), so the robot's cameras read in
+    one get_observation() share the same capture time.
+    """
+
+    def __init__(self, group: CaptureGroup, name: str):
+        super().__init__(group.cameras[name].config)
+        self.group = group
+        self.name = name
+
+    def __str__(self) -> str:
+        return f"GroupedCamera({self.name})"
+
+    @property
+    def is_connected(self) -> bool:
+        return self.group.is_connected
+
+    @staticmethod
+    def find_cameras() -> list[dict[str, Any]]:
+        return []
+
+    def connect(self, warmup: bool = True) -> None:
+        self.group.connect(warmup=warmup)
+
+    def read(self, color_mode: ColorMode | None = None) -> np.ndarray:
+        configured = getattr(self.config, "color_mode", None)
+        if color_mode is not None and configured is not None and ColorMode(color_mode) != ColorMode(configured):
+            raise ValueError(f"{self} captures frames in {configured}, not {color_mode}.")
+        return self.group.read_for(self.name)
+
+    def async_read(self, timeout_ms: float = 1000.0) -> np.ndarray:
+        return self.group.read_for(self.name)
+
+    def disconnect(self) -> None:
+        self.group.disconnect()
@@ -0,0 +1,482 @@
+#!/usr/bin/env python
+
+"""FrameBus: shares camera frames with other processes through a pool of shared-memory slots."""
+
+import os
+import threading
+import time
+from dataclasses import dataclass
+from multiprocessing import resource_tracker, shared_memory
+from typing import Any
+
+import numpy as np
+from lerobot.cameras.camera import Camera
+from lerobot.cameras.configs import CameraConfig, ColorMode
+
+_MAGIC = 0x4652414D45425553  # "FRAMEBUS"
+_MAX_DIMS = 4
+_HEADER_FIELDS = 16
+# Header fields (int64)
+_H_MAGIC, _H_SLOTS, _H_READERS, _H_NDIM = 0, 1, 2, 3
+_H_SHAPE = 4  # _MAX_DIMS fields
+_H_LATEST, _H_SEQ, _H_DROPPED = 8, 9, 10
+_DTYPE_BYTES = 16
+_ALIGN = 64
+
+# Sequence number of a slot being written or never written
+_INVALID = -1
+
+_attach_lock = threading.Lock()
+
+
+def _align(offset: int) -> int:
+    return (offset + _ALIGN - 1) // _ALIGN * _ALIGN
+
+
+class _Layout:
+    """Views on the header, slot table, reader table and frame slots of a bus segment.
+
+    Segment layout: header (int64[16]), dtype string, slot sequence numbers
+    (int64[slots]), slot timestamps (float64[slots]), reader pids
+    (int64[readers]), holds (int32[readers, slots]), then the frames, each
+    aligned on 64 bytes.
+    """
+
+    def __init__(self, buf, slots: int, readers: int, shape: tuple[int, ...], dtype: np.dtype):
+        offset = 0
+        self.header = np.ndarray(_HEADER_FIELDS, np.int64, buf, offset)
+        offset += self.header.nbytes
+        self.dtype_field = np.ndarray(_DTYPE_BYTES, np.uint8, buf, offset)
+        offset += _DTYPE_BYTES
+        self.seqs = np.ndarray(slots, np.int64, buf, offset)
+        offset += self.seqs.nbytes
+        self.timestamps = np.ndarray(slots, np.float64, buf, offset)
+        offset += self.timestamps.nbytes
+        self.pids = np.ndarray(readers, np.int64, buf, offset)
+        offset += self.pids.nbytes
+        # Each reader only writes its own row: no cross-process atomics needed
+        self.holds = np.ndarray((readers, slots), np.int32, buf, offset)
+        offset = _align(offset + self.holds.nbytes)
+        frame_bytes = _align(int(np.prod(shape)) * dtype.itemsize)
+        self.frames = [np.ndarray(shape, dtype, buf, offset + i * frame_bytes) for i in range(slots)]
+
+    @staticmethod
+    def size(slots: int, readers: int, shape: tuple[int, ...], dtype: np.dtype) -> int:
+        table = _HEADER_FIELDS * 8 + _DTYPE_BYTES + slots * 16 + readers * 8 + readers * slots * 4
+        return _align(table) + slots * _align(int(np.prod(shape)) * dtype.itemsize)
+
+    def release(self) -> None:
+        """Drop the views so that the segment can be closed."""
+        self.header = self.dtype_field = self.seqs = self.timestamps = self.pids = self.holds = None
+        self.frames = []
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    """Open an existing segment without registering it with this process's resource tracker.
+
+    A registered segment is unlinked by the tracker when the process exits,
+    which would remove the bus from under the producer. Unregistering after the
+    fact is not an option either: processes started by multiprocessing share
+    their parent's tracker, and would unregister the producer's own segment.
+    """
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:  # Python < 3.13
+        with _attach_lock:
+            register = resource_tracker.register
+            resource_tracker.register = lambda *args: None
+            try:
+                return shared_memory.SharedMemory(name=name)
+            finally:
+                resource_tracker.register = register
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class FrameBus:
+    """Producer side of a shared-memory frame bus for one camera.
+
+    Frames of a fixed shape and dtype are written into a fixed pool of
+    shared-memory slots. Readers in other processes (FrameBusReader,
+    FrameBusCamera) get NumPy views of the slots without any copy, so moving
+    the video writer or the visualizer to another process costs one copy per
+    frame (into the slot), whatever the number of consumers.
+
+    Each slot has a sequence number, and each reader marks the slots it holds
+    in its own row of a hold table. publish() never overwrites the latest
+    frame nor a held slot: if every slot is held, the frame is dropped rather
+    than blocking the producer. Slots held by readers that died are reclaimed.
+
+    Args:
+        shape: Shape of the frames, e.g. (480, 640, 3).
+        dtype: Dtype of the frames.
+        slots: Number of frame slots (at least 2).
+        max_readers: Maximum number of readers attached at the same time.
+        name: Name of the shared-memory segment (generated if None).
+
+    Example:
+        bus = FrameBus((480, 640, 3), slots=8)
+        # pass bus.name to the consumer processes
+        bus.publish(camera.async_read())
+    """
+
+    def __init__(self, shape: tuple[int, ...], dtype: Any = np.uint8, slots: int = 8, max_readers: int = 8,
+                 name: str | None = None):
+        if slots < 2:
+            raise ValueError(f"`slots` must be at least 2, but {slots} is provided.")
+        if not 1 <= len(shape) <= _MAX_DIMS:
+            raise ValueError(f"Frames must have 1 to {_MAX_DIMS} dimensions, not {len(shape)}.")
+        self.shape = tuple(int(n) for n in shape)
+        self.dtype = np.dtype(dtype)
+        self.slots = slots
+        self.max_readers = max_readers
+
+        size = _Layout.size(slots, max_readers, self.shape, self.dtype)
+        self._shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        self._layout = _Layout(self._shm.buf, slots, max_readers, self.shape, self.dtype)
+        layout = self._layout
+        layout.header[:] = 0
+        layout.header[_H_SLOTS] = slots
+        layout.header[_H_READERS] = max_readers
+        layout.header[_H_NDIM] = len(self.shape)
+        layout.header[_H_SHAPE:_H_SHAPE + len(self.shape)] = self.shape
+        layout.header[_H_LATEST] = _INVALID
+        dtype_str = self.dtype.str.encode()
+        layout.dtype_field[:] = 0
+        layout.dtype_field[:len(dtype_str)] = np.frombuffer(dtype_str, np.uint8)
+        layout.seqs[:] = _INVALID
+        layout.pids[:] = 0
+        layout.holds[:] = 0
+        # Written last: readers check it before trusting the rest of the header
+        layout.header[_H_MAGIC] = _MAGIC
+        self._next_slot = 0
+
+    @property
+    def name(self) -> str:
+        return self._shm.name
+
+    @property
+    def seq(self) -> int:
+        """Sequence number of the latest published frame (0 before the first one)."""
+        return int(self._layout.header[_H_SEQ])
+
+    @property
+    def dropped(self) -> int:
+        """Frames dropped because every slot was held by readers."""
+        return int(self._layout.header[_H_DROPPED])
+
+    def __enter__(self) -> "FrameBus":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _reap_readers(self) -> None:
+        """Release the slots held by readers whose process is gone."""
+        layout = self._layout
+        for reader, pid in enumerate(layout.pids):
+            if pid and not _pid_alive(int(pid)):
+                layout.holds[reader] = 0
+                layout.pids[reader] = 0
+
+    def _claim_slot(self) -> int | None:
+        layout = self._layout
+        latest = int(layout.header[_H_LATEST])
+        held = layout.holds.any(axis=0)
+        for i in range(self.slots):
+            slot = (self._next_slot + i) % self.slots
+            if slot == latest or held[slot]:
+                continue
+            layout.seqs[slot] = _INVALID
+            # A reader may have taken the slot between the check and the invalidation:
+            # it sees the invalid sequence number and lets go, so just try another slot
+            if layout.holds[:, slot].any():
+                continue
+            self._next_slot = slot + 1
+            return slot
+        return None
+
+    def publish(self, frame: np.ndarray, timestamp: float | None = None) -> int | None:
+        """Copy a frame into a free slot and make it the latest.
+
+        Args:
+            frame: Frame with the bus shape and dtype.
+            timestamp: Capture time (time.perf_counter() by default).
+
+        Returns:
+            The frame's sequence number, or None if it was dropped.
+
+        Raises:
+            ValueError: If the frame shape or dtype does not match the bus.
+        """
+        if frame.shape != self.shape or frame.dtype != self.dtype:
+            raise ValueError(f"Expected a {self.shape} {self.dtype} frame, got {frame.shape} {frame.dtype}.")
+        layout = self._layout
+        slot = self._claim_slot()
+        if slot is None:
+            self._reap_readers()
+            slot = self._claim_slot()
+        if slot is None:
+            layout.header[_H_DROPPED] += 1
+            return None
+
+        np.copyto(layout.frames[slot], frame)
+        layout.timestamps[slot] = time.perf_counter() if timestamp is None else timestamp
+        seq = int(layout.header[_H_SEQ]) + 1
+        layout.seqs[slot] = seq
+        layout.header[_H_SEQ] = seq
+        layout.header[_H_LATEST] = slot
+        return seq
+
+    def close(self) -> None:
+        """Close and remove the segment. Readers still attached keep their mapping."""
+        if self._shm is None:
+            return
+        self._layout.release()
+        self._shm.close()
+        self._shm.unlink()
+        self._shm = None
+
+
+class FrameRef:
+    """A frame held in a bus slot. The slot is not reused until release() (or the end of a with block)."""
+
+    def __init__(self, reader: "FrameBusReader", slot: int, seq: int, timestamp: float, array: np.ndarray):
+        self._reader = reader
+        self.slot = slot
+        self.seq = seq
+        self.timestamp = timestamp
+        self.array = array
+
+    def __enter__(self) -> "FrameRef":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.release()
+
+    def release(self) -> None:
+        if self._reader is not None:
+            self._reader._release(self.slot)
+            self._reader = None
+            self.array = None
+
+
+class FrameBusReader:
+    """Consumer side of a FrameBus, usable from any process.
+
+    Frames are read-only NumPy views of the shared slots: they stay valid
+    until their FrameRef is released. There is no cross-process notification,
+    so wait() polls the latest sequence number.
+
+    Args:
+        name: Name of the bus segment (FrameBus.name).
+        reader_id: Row of the hold table to use (the first free one if None).
+
+    Raises:
+        ValueError: If the segment is not a frame bus.
+        RuntimeError: If the bus already has max_readers readers.
+
+    Example:
+        with FrameBusReader(bus_name) as reader:
+            with reader.wait(timeout_s=1.0) as frame:
+                encoder.write(frame.array)
+    """
+
+    def __init__(self, name: str, reader_id: int | None = None):
+        self._shm = _attach(name)
+        header = np.ndarray(_HEADER_FIELDS, np.int64, self._shm.buf, 0)
+        if header[_H_MAGIC] != _MAGIC:
+            del header
+            self._shm.close()
+            raise ValueError(f"Shared memory segment '{name}' is not a frame bus.")
+        slots, readers, ndim = int(header[_H_SLOTS]), int(header[_H_READERS]), int(header[_H_NDIM])
+        self.shape = tuple(int(n) for n in header[_H_SHAPE:_H_SHAPE + ndim])
+        dtype_field = np.ndarray(_DTYPE_BYTES, np.uint8, self._shm.buf, _HEADER_FIELDS * 8)
+        self.dtype = np.dtype(dtype_field.tobytes().rstrip(b"\0").decode())
+        del header, dtype_field
+
+        self._layout = _Layout(self._shm.buf, slots, readers, self.shape, self.dtype)
+        for frame in self._layout.frames:
+            frame.flags.writeable = False
+        self.reader_id = self._register(reader_id)
+
+    def _register(self, reader_id: int | None) -> int:
+        pids = self._layout.pids
+        candidates = [reader_id] if reader_id is not None else range(len(pids))
+        for candidate in candidates:
+            if pids[candidate] == 0 or not _pid_alive(int(pids[candidate])):
+                pids[candidate] = os.getpid()
+                self._layout.holds[candidate] = 0
+                return candidate
+        raise RuntimeError(f"No free reader slot on frame bus '{self._shm.name}'.")
+
+    def __enter__(self) -> "FrameBusReader":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    @property
+    def seq(self) -> int:
+        """Sequence number of the latest published frame."""
+        return int(self._layout.header[_H_SEQ])
+
+    def latest(self, min_seq: int = 1) -> FrameRef | None:
+        """Hold the latest frame if its sequence number is at least min_seq, else return None."""
+        layout = self._layout
+        holds = layout.holds[self.reader_id]
+        while True:
+            slot = int(layout.header[_H_LATEST])
+            if slot < 0:
+                return None
+            seq = int(layout.seqs[slot])
+            if seq == _INVALID:
+                continue  # the producer is switching slots
+            if seq < min_seq:
+                return None
+            holds[slot] += 1
+            # Recheck after taking the hold: the producer may have started rewriting the slot
+            if layout.seqs[slot] == seq:
+                return FrameRef(self, slot, seq, float(layout.timestamps[slot]), layout.frames[slot])
+            holds[slot] -= 1
+
+    def wait(self, min_seq: int | None = None, timeout_s: float = 1.0, poll_s: float = 0.0005) -> FrameRef:
+        """Wait for a frame newer than the latest one (or with a sequence number of at least min_seq).
+
+        Raises:
+            TimeoutError: If no such frame is published within the timeout.
+        """
+        min_seq = self.seq + 1 if min_seq is None else min_seq
+        deadline = time.perf_counter() + timeout_s
+        while True:
+            frame = self.latest(min_seq)
+            if frame is not None:
+                return frame
+            if time.perf_counter() > deadline:
+                raise TimeoutError(f"No frame #{min_seq} on frame bus '{self._shm.name}' after {timeout_s} s.")
+            time.sleep(poll_s)
+
+    def _release(self, slot: int) -> None:
+        if self._layout.holds is not None and self._layout.holds[self.reader_id, slot] > 0:
+            self._layout.holds[self.reader_id, slot] -= 1
+
+    def close(self) -> None:
+        """Release every held slot and detach. Frames still referenced keep the mapping alive."""
+        if self._shm is None:
+            return
+        self._layout.holds[self.reader_id] = 0
+        self._layout.pids[self.reader_id] = 0
+        self._layout.release()
+        try:
+            self._shm.close()
+        except BufferError:
+            pass  # a FrameRef array is still in use; the mapping goes away with it
+        self._shm = None
+
+
+@dataclass(kw_only=True)
+class FrameBusCameraConfig(CameraConfig):
+    """Configuration for FrameBusCamera.
+
+    Attributes:
+        bus_name: Name of the FrameBus shared-memory segment to read.
+        fps: Frame rate of the producer (default: 30).
+        width: Frame width in pixels (read from the bus if not provided).
+        height: Frame height in pixels (read from the bus if not provided).
+        color_mode: Color mode of the published frames (default: RGB).
+        reader_id: Row of the bus hold table to use (first free one if None).
+    """
+    bus_name: str
+    fps: int = 30
+    width: int | None = None
+    height: int | None = None
+    color_mode: ColorMode = ColorMode.RGB
+    reader_id: int | None = None
+
+
+class FrameBusCamera(Camera):
+    """A camera reading the frames published on a FrameBus by another process.
+
+    Returned frames are zero-copy, read-only views of the bus slots. The frame
+    returned by a read stays valid until the next read: the camera holds its
+    slot until then.
+
+    Example:
+        camera = FrameBusCamera(FrameBusCameraConfig(bus_name=bus.name))
+        camera.connect()
+        frame = camera.async_read()
+    """
+
+    def __init__(self, config: FrameBusCameraConfig):
+        super().__init__(config)
+        self.config = config
+        self.color_mode = ColorMode(config.color_mode)
+        self._reader: FrameBusReader | None = None
+        self._held: FrameRef | None = None
+
+    def __str__(self) -> str:
+        return f"FrameBusCamera({self.config.bus_name})"
+
+    @property
+    def is_connected(self) -> bool:
+        return self._reader is not None
+
+    @staticmethod
+    def find_cameras() -> list[dict[str, Any]]:
+        return []
+
+    def connect(self, warmup: bool = True) -> None:
+        """Attach to the bus.
+
+        Args:
+            warmup: If True, wait for a first frame.
+        """
+        if self.is_connected:
+            return
+        self._reader = FrameBusReader(self.config.bus_name, self.config.reader_id)
+        if self.height is None or self.width is None:
+            self.height, self.width = self._reader.shape[:2]
+        if warmup:
+            self.async_read()
+
+    def _hold(self, frame: FrameRef) -> np.ndarray:
+        if self._held is not None:
+            self._held.release()
+        self._held = frame
+        return frame.array
+
+    def _check(self, color_mode: ColorMode | None) -> None:
+        if not self.is_connected:
+            raise RuntimeError("Camera not connected. Call connect() first.")
+        if color_mode is not None and ColorMode(color_mode) != self.color_mode:
+            raise ValueError(f"{self} publishes frames in {self.color_mode}, not {color_mode}.")
+
+    def read(self, color_mode: ColorMode | None = None) -> np.ndarray:
+        """Wait for a frame newer than the last one returned and return it."""
+        self._check(color_mode)
+        min_seq = self._held.seq + 1 if self._held is not None else 1
+        return self._hold(self._reader.wait(min_seq))
+
+    def async_read(self, timeout_ms: float = 1000.0) -> np.ndarray:
+        """Return the latest frame, waiting only if none was published yet."""
+        self._check(None)
+        frame = self._reader.latest()
+        if frame is None:
+            frame = self._reader.wait(1, timeout_s=timeout_ms / 1000.0)
+        return self._hold(frame)
+
+    def disconnect(self) -> None:
+        if self._held is not None:
+            self._held.release()
+            self._held = None
+        if self._reader is not None:
+            self._reader.close()
+            self._reader = None
@@ -0,0 +1,287 @@
+#!/usr/bin/env python
+
+"""ProceduralTargets: seeded target shapes drawn straight into frames, with no file.
+
+The shape families and their random parameters are those of notebook/createSvg.ipynb
+(circle, ellipse, line, polygon, rectangle, path), placed in the A5 area centered on
+an A4 page. Instead of writing an SVG that is later rasterized to PNG, converted to
+JPG and decoded again, a target is sampled from a seed and an index and drawn into a
+BGR frame at the requested resolution. The same (seed, target) always gives the same
+image, so an unlimited number of reproducible targets is available for recording and
+evaluation.
+
+Targets are named like the files they replace ("circle/circle_001"), and a
+ProceduralTargets can be used wherever a TargetAtlas is expected.
+
+Usage:
+    python -m cameras.procedural_targets render preview --seed 0 --count 12
+    python -m cameras.procedural_targets render preview --shapes circle path --width 640 --height 480
+"""
+
+import argparse
+import re
+from dataclasses import dataclass
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+# Page layout of the SVG targets, in millimeters (SVG user units)
+A4_WIDTH = 297
+A4_HEIGHT = 210
+A5_WIDTH = A4_HEIGHT
+A5_HEIGHT = A4_WIDTH / 2
+# Origin of the A5 area on the page, truncated as in createSvg.ipynb
+A5_X = int((A4_WIDTH - A5_WIDTH) / 2)
+A5_Y = int((A4_HEIGHT - A5_HEIGHT) / 2)
+
+SHAPES = ("circle", "ellipse", "line", "polygon", "rectangle", "path")
+# Rendered SVG page size (A4 at 96 dpi), the resolution of the existing PNG and JPG targets
+PAGE_WIDTH = 1123
+PAGE_HEIGHT = 794
+# Shapes are drawn at this multiple of the output resolution, then averaged down: the
+# anti-aliasing and fractional stroke widths then match those of the rendered SVGs
+SUPERSAMPLE = 4
+# Curves are flattened into segments of about this length, in supersampled pixels
+SEGMENT_PX = 2.0
+# Fixed point precision of the polyline coordinates given to OpenCV (1/16 pixel)
+_SHIFT = 4
+
+_NAME_PATTERN = re.compile(r"^([a-z]+)/\1_(\d+)$")
+
+
+@dataclass
+class ShapeSpec:
+    """Geometry of one procedural target.
+
+    Attributes:
+        shape: Shape family, one of SHAPES.
+        polylines: Outlines as (N, 2) float arrays of (x, y) page coordinates in millimeters.
+        closed: Whether each outline is closed.
+        stroke_width: Stroke width in millimeters.
+    """
+    shape: str
+    polylines: list[np.ndarray]
+    closed: bool
+    stroke_width: float
+
+
+def _randint(rng: np.random.Generator, low: int, high: int) -> int:
+    """Integer in [low, high], bounds included like random.randint."""
+    return int(rng.integers(low, high + 1))
+
+
+def _arc_points(length_mm: float, scale: float) -> int:
+    return max(16, int(np.ceil(length_mm * scale / SEGMENT_PX)))
+
+
+def _sample_box(rng: np.random.Generator) -> tuple[int, int, int, int]:
+    a5w, a5h = int(A5_WIDTH), int(A5_HEIGHT)
+    x = _randint(rng, 0, a5w - 1)
+    y = _randint(rng, 0, a5h - 1)
+    return x, y, _randint(rng, 1, a5w - x), _randint(rng, 1, a5h - y)
+
+
+def _sample_points(rng: np.random.Generator, count: int) -> np.ndarray:
+    a5w, a5h = int(A5_WIDTH), int(A5_HEIGHT)
+    return np.stack([rng.integers(0, a5w + 1, count), rng.integers(0, a5h + 1, count)], axis=1).astype(np.float64)
+
+
+def _ellipse(cx: float, cy: float, rx: float, ry: float, scale: float) -> np.ndarray:
+    # Ramanujan's approximation of the perimeter, to pick the number of points
+    perimeter = np.pi * (3 * (rx + ry) - np.sqrt((3 * rx + ry) * (rx + 3 * ry)))
+    t = np.linspace(0, 2 * np.pi, _arc_points(perimeter, scale), endpoint=False)
+    return np.stack([cx + rx * np.cos(t), cy + ry * np.sin(t)], axis=1)
+
+
+def _quadratic_path(points: np.ndarray, controls: np.ndarray, scale: float) -> np.ndarray:
+    """Flatten the quadratic Béziers points[i] -> points[i + 1] (control controls[i]) into one polyline."""
+    starts, ends = points[:-1], points[1:]
+    # The chord plus the control detour bounds the curve length
+    length = np.linalg.norm(controls - starts, axis=1) + np.linalg.norm(ends - controls, axis=1)
+    steps = _arc_points(float(length.max()), scale)
+    t = np.linspace(0, 1, steps + 1)[1:, None, None]
+    curves = (1 - t) ** 2 * starts + 2 * (1 - t) * t * controls + t ** 2 * ends
+    # (steps, segments, 2) -> segment by segment, each without its start point
+    return np.concatenate([points[:1], curves.transpose(1, 0, 2).reshape(-1, 2)])
+
+
+def sample_shape(shape: str, rng: np.random.Generator, scale: float = PAGE_WIDTH / A4_WIDTH) -> ShapeSpec:
+    """Draw the random parameters of a shape, as createSvg.ipynb does.
+
+    Args:
+        shape: Shape family, one of SHAPES.
+        rng: Random generator the parameters are drawn from.
+        scale: Output pixels per millimeter, used only to flatten curves finely enough.
+
+    Returns:
+        The shape geometry in page millimeters.
+
+    Raises:
+        ValueError: If the shape family is unknown.
+    """
+    a5w, a5h = int(A5_WIDTH), int(A5_HEIGHT)
+    stroke_width = 1.0
+    closed = True
+    if shape == "rectangle":
+        x, y, w, h = _sample_box(rng)
+        polylines = [np.array([[x, y], [x + w, y], [x + w, y + h], [x, y + h]], dtype=np.float64)]
+    elif shape == "circle":
+        r = _randint(rng, 1, min(a5w, a5h) // 2)
+        cx = _randint(rng, r, a5w - r)
+        cy = _randint(rng, r, a5h - r)
+        polylines = [_ellipse(cx, cy, r, r, scale)]
+    elif shape == "ellipse":
+        x, y, w, h = _sample_box(rng)
+        polylines = [_ellipse(x + w / 2, y + h / 2, w / 2, h / 3, scale)]
+    elif shape == "line":
+        x, y, w, h = _sample_box(rng)
+        polylines = [np.array([[x, y], [x + w, y + h]], dtype=np.float64)]
+        closed = False
+    elif shape == "polygon":
+        polylines = [_sample_points(rng, 5)]
+    elif shape == "path":
+        # Four independent paths of four quadratic curves each, bulging by 20 to 50 mm
+        polylines = []
+        for _ in range(4):
+            points = _sample_points(rng, 5)
+            delta = np.diff(points, axis=0)
+            bulge = rng.integers(20, 51, len(delta))[:, None]
+            controls = (points[:-1] + points[1:]) / 2 + np.sign(delta[:, ::-1] * [-1, 1]) * bulge
+            polylines.append(_quadratic_path(points, controls, scale))
+        stroke_width = 2.0
+        closed = False
+    else:
+        raise ValueError(f"Unknown shape: {shape} (expected one of {', '.join(SHAPES)})")
+
+    return ShapeSpec(shape, [p + (A5_X, A5_Y) for p in polylines], closed, stroke_width)
+
+
+class ProceduralTargets:
+    """An unlimited, reproducible set of target images generated on demand.
+
+    Target ``i`` is the ``i // len(shapes) + 1``-th target of the shape
+    ``shapes[i % len(shapes)]``, named like the SVG files ("circle/circle_001").
+    Its parameters are drawn from a generator seeded with (seed, shape, number),
+    so a given name always gives the same image, whatever ``shapes`` is.
+
+    The shape outlines are flattened into polylines with vectorized NumPy and drawn
+    in a single OpenCV call at SUPERSAMPLE times the resolution, then area-averaged
+    down: black on white, anti-aliased, with the page stretched over the whole frame
+    as the static cameras do when resizing the JPG targets. A 640x480 target takes
+    about 15 ms to draw.
+
+    Indexing mirrors TargetAtlas, so a ProceduralTargets can be given wherever an
+    atlas is expected (e.g. the atlas of the training StaticImageCamera).
+
+    Args:
+        width: Frame width in pixels (default: the rendered SVG page width).
+        height: Frame height in pixels (default: the rendered SVG page height).
+        seed: Seed of the whole target set.
+        shapes: Shape families to cycle through (default: all of SHAPES).
+
+    Example:
+        targets = ProceduralTargets(640, 480, seed=0)
+        frame = targets[7]  # or targets["ellipse/ellipse_002"]
+        spec = targets.spec("path/path_010")
+    """
+
+    def __init__(self, width: int = PAGE_WIDTH, height: int = PAGE_HEIGHT, seed: int = 0,
+                 shapes: tuple[str, ...] | list[str] | None = None):
+        self.width = width
+        self.height = height
+        self.seed = seed
+        self.shapes: tuple[str, ...] = tuple(shapes) if shapes else SHAPES
+        unknown = [shape for shape in self.shapes if shape not in SHAPES]
+        if unknown:
+            raise ValueError(f"Unknown shapes: {', '.join(unknown)} (expected some of {', '.join(SHAPES)})")
+        # Output pixels per millimeter along each axis
+        self._scale = np.array([width / A4_WIDTH, height / A4_HEIGHT])
+
+    def name(self, index: int) -> str:
+        """Return the name of target ``index``, e.g. "circle/circle_001"."""
+        shape = self.shapes[index % len(self.shapes)]
+        return f"{shape}/{shape}_{index // len(self.shapes) + 1:03d}"
+
+    def _parse(self, target: int | str) -> tuple[str, int]:
+        if not isinstance(target, str):
+            index = int(target)
+            if index < 0:
+                raise IndexError(f"Target index must be non-negative, got {index}")
+            return self.shapes[index % len(self.shapes)], index // len(self.shapes) + 1
+        match = _NAME_PATTERN.match(target)
+        if match is None or match.group(1) not in SHAPES:
+            raise KeyError(f"Unknown target: {target}")
+        return match.group(1), int(match.group(2))
+
+    def __contains__(self, name: str) -> bool:
+        try:
+            self._parse(name)
+        except KeyError:
+            return False
+        return True
+
+    def spec(self, target: int | str) -> ShapeSpec:
+        """Return the geometry of a target, from its index or name.
+
+        Raises:
+            KeyError: If the name does not follow the "<shape>/<shape>_<number>" pattern.
+        """
+        shape, number = self._parse(target)
+        rng = np.random.default_rng([self.seed, SHAPES.index(shape), number])
+        return sample_shape(shape, rng, float(self._scale.max()) * SUPERSAMPLE)
+
+    def render(self, target: int | str, out: np.ndarray | None = None) -> np.ndarray:
+        """Draw a target into a BGR frame of shape (height, width, 3).
+
+        Args:
+            target: Index or name of the target.
+            out: Optional uint8 frame to draw into, overwritten, instead of a new one.
+
+        Returns:
+            The frame (``out`` if given).
+        """
+        spec = self.spec(target)
+        scale = self._scale * SUPERSAMPLE
+        canvas = np.full((self.height * SUPERSAMPLE, self.width * SUPERSAMPLE), 255, dtype=np.uint8)
+        polylines = [np.round(p * scale * (1 << _SHIFT)).astype(np.int32) for p in spec.polylines]
+        # OpenCV thick lines come out about one pixel wider than their thickness
+        thickness = max(1, round(spec.stroke_width * float(scale.mean())) - 1)
+        cv2.polylines(canvas, polylines, spec.closed, 0, thickness, cv2.LINE_8, _SHIFT)
+        gray = cv2.resize(canvas, (self.width, self.height), interpolation=cv2.INTER_AREA)
+        if out is None:
+            return cv2.cvtColor(gray, cv2.COLOR_GRAY2BGR)
+        return cv2.cvtColor(gray, cv2.COLOR_GRAY2BGR, dst=out)
+
+    def __getitem__(self, target: int | str) -> np.ndarray:
+        """Return a target as a new read-only BGR frame, like TargetAtlas."""
+        frame = self.render(target)
+        frame.flags.writeable = False
+        return frame
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    render = subparsers.add_parser("render", help="Write procedural targets as JPG files, to inspect them.")
+    render.add_argument("output", help="directory to write <shape>/<shape>_<number>.jpg into")
+    render.add_argument("--seed", type=int, default=0)
+    render.add_argument("--count", type=int, default=len(SHAPES), help="number of targets, cycling through shapes")
+    render.add_argument("--start", type=int, default=0, help="index of the first target")
+    render.add_argument("--shapes", nargs="+", choices=SHAPES, help="shape families (default: all)")
+    render.add_argument("--width", type=int, default=PAGE_WIDTH)
+    render.add_argument("--height", type=int, default=PAGE_HEIGHT)
+
+    args = parser.parse_args()
+    targets = ProceduralTargets(args.width, args.height, args.seed, args.shapes)
+    frame = np.empty((targets.height, targets.width, 3), dtype=np.uint8)
+    for index in range(args.start, args.start + args.count):
+        path = Path(args.output) / f"{targets.name(index)}.jpg"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        cv2.imwrite(str(path), targets.render(index, out=frame))
+    print(f"{args.output}: {args.count} targets at {targets.width}x{targets.height} (seed {args.seed})")
+
+
+if __name__ == "__main__":
+    main()
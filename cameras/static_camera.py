@@ -11,6 +11,18 @@ import numpy as np
 from lerobot.cameras.camera import Camera
 from lerobot.cameras.configs import CameraConfig, ColorMode
 
+from .procedural_targets import PAGE_HEIGHT, PAGE_WIDTH, ProceduralTargets
+from .target_atlas import TargetAtlas
+
+# Conversions from the BGR source image to every supported color mode, keyed by
+# ColorMode value so that modes missing from the installed lerobot are skipped.
+# Also used by training/target_cache.py.
+BGR_CONVERSIONS: dict[str, int | None] = {
+    "bgr": None,
+    "rgb": cv2.COLOR_BGR2RGB,
+    "grayscale": cv2.COLOR_BGR2GRAY,
+}
+
 
 @dataclass(kw_only=True)
 class StaticCameraConfig(CameraConfig):
@@ -21,11 +33,25 @@ class StaticCameraConfig(CameraConfig):
         fps: Frames per second (default: 30).
         width: Image width in pixels (will be inferred from image if not provided).
         height: Image height in pixels (will be inferred from image if not provided).
+        copy_frames: Return a fresh copy on every read instead of a read-only view
+            (default: False). Enable it for callers that modify frames in place.
+        atlas_path: Path to a target atlas directory (see cameras.target_atlas). If set,
+            it takes precedence over image_path.
+        procedural_seed: Seed of a procedural target set (see cameras.procedural_targets).
+            If set, targets are drawn on demand instead of read from image_path.
+        procedural_shapes: Shape families of the procedural targets (default: all).
+        atlas_target: Index or name of the target to replay, in the atlas or the
+            procedural target set (default: 0).
     """
     image_path: str | None = None
     fps: int = 30
     width: int | None = None
     height: int | None = None
+    copy_frames: bool = False
+    atlas_path: str | None = None
+    procedural_seed: int | None = None
+    procedural_shapes: tuple[str, ...] | None = None
+    atlas_target: int | str = 0
 
 
 class StaticCamera(Camera):
@@ -35,6 +61,10 @@ class StaticCamera(Camera):
     to use a fixed image instead of a live camera feed. The same image is returned
     on every frame capture.
 
+    Every color mode variant is built once at connect time and ``read`` returns
+    read-only views of them, so a frame capture costs no allocation nor color
+    conversion. Set ``copy_frames=True`` in the config to get writable copies.
+
     Args:
         config: StaticCameraConfig with optional image_path and resolution settings.
         image: Optional numpy array containing the image. If provided, this takes
@@ -53,6 +83,18 @@ class StaticCamera(Camera):
         camera = StaticCamera(config, image=image)
         camera.connect()
         frame = camera.read()
+
+        # From a target atlas, switching targets without decoding
+        config = StaticCameraConfig(atlas_path="atlas/jpg_640x480", atlas_target="circle/circle_001")
+        camera = StaticCamera(config)
+        camera.connect()
+        camera.select_target("line/line_042")
+
+        # From procedural targets, drawn on demand with no file at all
+        config = StaticCameraConfig(procedural_seed=0, width=640, height=480, atlas_target="path/path_007")
+        camera = StaticCamera(config)
+        camera.connect()
+        camera.select_target(12)
     """
 
     def __init__(self, config: StaticCameraConfig, image: np.ndarray | None = None):
@@ -65,6 +107,8 @@ class StaticCamera(Camera):
         super().__init__(config)
         self.config = config
         self._image: np.ndarray | None = image
+        self._frames: dict[ColorMode, np.ndarray] = {}
+        self._atlas: TargetAtlas | ProceduralTargets | None = None
         self._connected = False
         self._original_color_mode = ColorMode.BGR  # OpenCV loads as BGR by default
 
@@ -86,6 +130,12 @@ class StaticCamera(Camera):
         if self._image is not None:
             return  # Image already loaded
 
+        if self.config.atlas_path is not None or self.config.procedural_seed is not None:
+            self._image = self._get_atlas()[self.config.atlas_target]
+            self._original_color_mode = ColorMode.BGR
+            self._update_dimensions_from_image()
+            return
+
         if self.config.image_path is None:
             raise ValueError("No image provided. Set image_path in config or pass image to constructor.")
 
@@ -101,26 +151,75 @@ class StaticCamera(Camera):
         self._original_color_mode = ColorMode.BGR
         self._update_dimensions_from_image()
 
-    def _convert_color_mode(self, image: np.ndarray, target_mode: ColorMode) -> np.ndarray:
-        """Convert image between RGB and BGR color modes.
+    def _build_frames(self) -> None:
+        """Resize the image to the configured resolution and precompute every color mode.
 
-        Args:
-            image: Input image array.
-            target_mode: Target color mode (RGB or BGR).
+        The resulting frames are marked read-only so they can be shared by all readers.
+        """
+        image = self._image
+        if self._original_color_mode == ColorMode.RGB:
+            image = cv2.cvtColor(image, cv2.COLOR_RGB2BGR)
+        elif image.ndim == 2:
+            image = cv2.cvtColor(image, cv2.COLOR_GRAY2BGR)
+
+        if image.shape[:2] != (self.height, self.width):
+            image = cv2.resize(image, (self.width, self.height))
+
+        frames = {}
+        for mode in ColorMode:
+            if mode.value not in BGR_CONVERSIONS:
+                continue
+            code = BGR_CONVERSIONS[mode.value]
+            frame = image.view() if code is None else cv2.cvtColor(image, code)
+            frame.flags.writeable = False
+            frames[mode] = frame
+        # Swap all modes at once so that concurrent readers never see a partial set
+        self._frames = frames
+
+    def _get_atlas(self) -> TargetAtlas | ProceduralTargets:
+        if self._atlas is None:
+            if self.config.atlas_path is not None:
+                self._atlas = TargetAtlas(self.config.atlas_path)
+            elif self.config.procedural_seed is not None:
+                # Drawn at the configured resolution, so that no resize is needed
+                self._atlas = ProceduralTargets(
+                    self.width or PAGE_WIDTH,
+                    self.height or PAGE_HEIGHT,
+                    seed=self.config.procedural_seed,
+                    shapes=self.config.procedural_shapes,
+                )
+            else:
+                raise ValueError("No target atlas configured. Set atlas_path or procedural_seed in config.")
+        return self._atlas
+
+    def set_image(self, image: np.ndarray, color_mode: ColorMode = ColorMode.BGR) -> None:
+        """Replace the replayed image.
+
+        If the camera is connected, the new image is served from the next read on.
 
-        Returns:
-            Converted image array.
+        Args:
+            image: New image array.
+            color_mode: Color mode of the array (BGR or RGB).
         """
-        if target_mode == self._original_color_mode:
-            return image
+        self._image = image
+        self._original_color_mode = color_mode
+        self._update_dimensions_from_image()
+        if self._connected:
+            self._build_frames()
 
-        # Convert between RGB and BGR
-        if target_mode == ColorMode.RGB and self._original_color_mode == ColorMode.BGR:
-            return cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-        elif target_mode == ColorMode.BGR and self._original_color_mode == ColorMode.RGB:
-            return cv2.cvtColor(image, cv2.COLOR_RGB2BGR)
+    def select_target(self, target: int | str) -> None:
+        """Switch to another target of the configured atlas or procedural target set,
+        without decoding any file.
 
-        return image
+        Args:
+            target: Index or name of the target.
+
+        Raises:
+            ValueError: If neither an atlas nor a procedural seed is configured.
+            KeyError: If there is no target with that name.
+        """
+        self.set_image(self._get_atlas()[target])
+        self.config.atlas_target = target
 
     @property
     def is_connected(self) -> bool:
@@ -150,29 +249,32 @@ class StaticCamera(Camera):
         """
         if not self._connected:
             self._load_image()
+            self._build_frames()
             self._connected = True
 
     def read(self, color_mode: ColorMode | None = None) -> np.ndarray:
         """Capture and return a frame (the static image).
 
         Args:
-            color_mode: Desired color mode (RGB or BGR). If None, returns in original mode.
+            color_mode: Desired color mode (RGB, BGR or GRAYSCALE). If None, returns in original mode.
 
         Returns:
-            The static image as a numpy array.
+            The static image as a read-only numpy array, or a writable copy if
+            ``config.copy_frames`` is set.
 
         Raises:
             RuntimeError: If camera is not connected.
+            ValueError: If the color mode is not supported.
         """
         if not self.is_connected:
             raise RuntimeError("Camera not connected. Call connect() first.")
 
-        image = self._image.copy()
-
-        if color_mode is not None:
-            image = self._convert_color_mode(image, color_mode)
+        mode = self._original_color_mode if color_mode is None else ColorMode(color_mode)
+        if mode not in self._frames:
+            raise ValueError(f"Unsupported color mode: {color_mode}")
 
-        return image
+        frame = self._frames[mode]
+        return frame.copy() if self.config.copy_frames else frame
 
     def async_read(self, timeout_ms: float = 1000.0) -> np.ndarray:
         """Asynchronously capture and return a frame (the static image).
@@ -183,15 +285,16 @@ class StaticCamera(Camera):
             timeout_ms: Ignored for static camera (included for interface compatibility).
 
         Returns:
-            The static image as a numpy array.
+            The static image as a read-only numpy array (see read()).
         """
         return self.read()
 
     def disconnect(self) -> None:
         """Disconnect from the camera.
 
-        Releases the image and marks the camera as disconnected.
+        Releases the precomputed frames and marks the camera as disconnected.
         """
         self._connected = False
+        self._frames = {}
         # Optionally clear the image to free memory
         # self._image = None
@@ -0,0 +1,218 @@
+#!/usr/bin/env python
+
+"""TargetAtlas: every target image packed into one memory-mapped array.
+
+An atlas is a directory containing:
+    index.json   Resolution, color mode and target names (e.g. "circle/circle_001").
+    frames.npy   uint8 array of shape (N, height, width, 3), BGR, already resized.
+    bits.npy     Optional uint8 array of shape (N, height, ceil(width / 8)): the ink
+                 mask of each target, bit-packed, for black-on-white line drawings.
+
+Arrays are opened with ``mmap_mode="r"``: selecting a target costs no decoding, and
+every process using the same atlas shares the same physical pages.
+
+Usage:
+    python -m cameras.target_atlas build jpg atlas/jpg_640x480 --width 640 --height 480 --packed
+    python -m cameras.target_atlas info atlas/jpg_640x480
+"""
+
+import argparse
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+INDEX_FILE = "index.json"
+FRAMES_FILE = "frames.npy"
+BITS_FILE = "bits.npy"
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png")
+
+
+class TargetAtlas:
+    """Read-only access to the targets of an atlas directory.
+
+    Args:
+        path: Atlas directory.
+        packed: Read targets from the bit-packed masks instead of the full frames.
+            Defaults to True when the atlas has no frames.npy.
+
+    Example:
+        atlas = TargetAtlas("atlas/jpg_640x480")
+        frame = atlas["circle/circle_001"]  # or atlas[atlas.index("circle/circle_001")]
+    """
+
+    def __init__(self, path: str | Path, packed: bool | None = None):
+        self.path = Path(path)
+        index_path = self.path / INDEX_FILE
+        if not index_path.exists():
+            raise FileNotFoundError(f"Target atlas not found: {self.path}")
+
+        with open(index_path) as f:
+            index = json.load(f)
+        self.width: int = index["width"]
+        self.height: int = index["height"]
+        self.names: list[str] = index["names"]
+        self._indices = {name: i for i, name in enumerate(self.names)}
+
+        frames_path = self.path / FRAMES_FILE
+        bits_path = self.path / BITS_FILE
+        self.frames: np.ndarray | None = np.load(frames_path, mmap_mode="r") if frames_path.exists() else None
+        self.bits: np.ndarray | None = np.load(bits_path, mmap_mode="r") if bits_path.exists() else None
+
+        self.packed = self.frames is None if packed is None else packed
+        if self.packed and self.bits is None:
+            raise ValueError(f"Target atlas has no bit-packed masks: {self.path}")
+        if not self.packed and self.frames is None:
+            raise ValueError(f"Target atlas has no frames: {self.path}")
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._indices
+
+    def index(self, name: str) -> int:
+        """Return the index of a target from its name.
+
+        Raises:
+            KeyError: If the atlas has no target with that name.
+        """
+        try:
+            return self._indices[name]
+        except KeyError:
+            raise KeyError(f"Unknown target: {name}") from None
+
+    def __getitem__(self, target: int | str) -> np.ndarray:
+        """Return a target as a read-only BGR frame of shape (height, width, 3).
+
+        With full frames, this is a view into the memory-mapped file. With packed
+        masks, the mask is unpacked into a new black-on-white frame.
+        """
+        i = self.index(target) if isinstance(target, str) else int(target)
+        if not self.packed:
+            return self.frames[i]
+
+        ink = np.unpackbits(self.bits[i], axis=-1, count=self.width)
+        frame = np.repeat((255 - 255 * ink)[:, :, None], 3, axis=2)
+        frame.flags.writeable = False
+        return frame
+
+
+def _load_resized(path: Path, width: int, height: int) -> np.ndarray:
+    image = cv2.imread(str(path))
+    if image is None:
+        raise ValueError(f"Failed to load image: {path}")
+    # Plain resize, as the static cameras do with the configured resolution
+    return cv2.resize(image, (width, height))
+
+
+def build_atlas(
+    root: str | Path,
+    output: str | Path,
+    width: int = 640,
+    height: int = 480,
+    packed: bool = False,
+    frames: bool = True,
+    threshold: int = 128,
+    workers: int | None = None,
+) -> TargetAtlas:
+    """Decode every image under root into a new atlas directory.
+
+    Args:
+        root: Directory of targets, e.g. jpg/ (images are searched recursively).
+        output: Atlas directory to create.
+        width: Target width in pixels.
+        height: Target height in pixels.
+        packed: Also write the bit-packed ink masks.
+        frames: Write the full frames (disable to keep only the packed masks).
+        threshold: Gray level below which a pixel counts as ink in the packed masks.
+        workers: Number of decoding threads (default: one per core).
+
+    Returns:
+        The atlas, opened.
+    """
+    if not packed and not frames:
+        raise ValueError("The atlas needs frames, packed masks, or both.")
+
+    root = Path(root)
+    paths = sorted(p for p in root.rglob("*") if p.suffix.lower() in IMAGE_EXTENSIONS)
+    if not paths:
+        raise FileNotFoundError(f"No image found under: {root}")
+    names = [p.relative_to(root).with_suffix("").as_posix() for p in paths]
+
+    output = Path(output)
+    output.mkdir(parents=True, exist_ok=True)
+    frames_array = None
+    bits_array = None
+    if frames:
+        frames_array = np.lib.format.open_memmap(
+            output / FRAMES_FILE, mode="w+", dtype=np.uint8, shape=(len(paths), height, width, 3)
+        )
+    if packed:
+        bits_array = np.lib.format.open_memmap(
+            output / BITS_FILE, mode="w+", dtype=np.uint8, shape=(len(paths), height, (width + 7) // 8)
+        )
+
+    def store(i: int) -> None:
+        image = _load_resized(paths[i], width, height)
+        if frames_array is not None:
+            frames_array[i] = image
+        if bits_array is not None:
+            ink = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) < threshold
+            bits_array[i] = np.packbits(ink, axis=-1)
+
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        list(pool.map(store, range(len(paths))))
+
+    for array in (frames_array, bits_array):
+        if array is not None:
+            array.flush()
+    del frames_array, bits_array
+
+    with open(output / INDEX_FILE, "w") as f:
+        json.dump({"width": width, "height": height, "color_mode": "bgr", "names": names}, f, indent=1)
+
+    return TargetAtlas(output)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    build = subparsers.add_parser("build", help="Pack every image under a directory into an atlas.")
+    build.add_argument("root", help="directory of target images, e.g. jpg")
+    build.add_argument("output", help="atlas directory to create")
+    build.add_argument("--width", type=int, default=640)
+    build.add_argument("--height", type=int, default=480)
+    build.add_argument("--packed", action="store_true", help="also write the bit-packed ink masks")
+    build.add_argument("--packed-only", action="store_true", help="write only the bit-packed ink masks")
+    build.add_argument("--threshold", type=int, default=128, help="gray level below which a pixel is ink")
+
+    info = subparsers.add_parser("info", help="Describe an atlas.")
+    info.add_argument("atlas", help="atlas directory")
+
+    args = parser.parse_args()
+    if args.command == "build":
+        atlas = build_atlas(
+            args.root,
+            args.output,
+            args.width,
+            args.height,
+            packed=args.packed or args.packed_only,
+            frames=not args.packed_only,
+            threshold=args.threshold,
+        )
+    else:
+        atlas = TargetAtlas(args.atlas)
+
+    print(f"{atlas.path}: {len(atlas)} targets at {atlas.width}x{atlas.height}")
+    for name, array in (("frames", atlas.frames), ("packed masks", atlas.bits)):
+        if array is not None:
+            print(f"  {name}: {array.nbytes / 1e6:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
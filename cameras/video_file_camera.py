@@ -0,0 +1,411 @@
+#!/usr/bin/env python
+
+"""VideoFileCamera: A fake camera that replays a video file at a fixed frame rate."""
+
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+import av
+import numpy as np
+from lerobot.cameras.camera import Camera
+from lerobot.cameras.configs import CameraConfig, ColorMode
+
+# PyAV pixel formats matching every supported color mode, keyed by ColorMode value.
+_AV_FORMATS: dict[str, str] = {
+    "bgr": "bgr24",
+    "rgb": "rgb24",
+    "grayscale": "gray",
+}
+
+
+@dataclass(kw_only=True)
+class VideoFileCameraConfig(CameraConfig):
+    """Configuration for VideoFileCamera.
+
+    Attributes:
+        video_path: Path to the video file to replay (e.g. videos/circle/circle_001.mp4).
+        fps: Playback rate in frames per second (default: 30).
+        width: Frame width in pixels (will be inferred from the video if not provided).
+        height: Frame height in pixels (will be inferred from the video if not provided).
+        color_mode: Color mode of the returned frames (default: RGB).
+        loop: Restart from the first frame at the end of the video (default: True).
+        buffer_size: Number of frames decoded ahead of playback (default: 32).
+        copy_frames: Return a fresh copy on every read instead of a read-only array
+            (default: False).
+    """
+    video_path: str
+    fps: int = 30
+    width: int | None = None
+    height: int | None = None
+    color_mode: ColorMode = ColorMode.RGB
+    loop: bool = True
+    buffer_size: int = 32
+    copy_frames: bool = False
+
+    def __post_init__(self):
+        if self.buffer_size < 1:
+            raise ValueError(f"`buffer_size` must be at least 1, but {self.buffer_size} is provided.")
+
+
+class VideoFileCamera(Camera):
+    """A camera implementation that replays a video file.
+
+    Frames are decoded on a background thread into a bounded ring buffer and are
+    presented according to the configured fps, as a real camera would deliver them.
+    Frames whose presentation time has already passed are skipped, so playback
+    stays in real time even if the reader falls behind.
+
+    A keyframe index is built when connecting, by demuxing the file without
+    decoding it, so that seek() only decodes from the closest preceding keyframe.
+
+    Args:
+        config: VideoFileCameraConfig with the video path and playback settings.
+
+    Example:
+        config = VideoFileCameraConfig(video_path="videos/circle/circle_001.mp4", fps=30)
+        camera = VideoFileCamera(config)
+        camera.connect()
+        frame = camera.async_read()
+        camera.seek(75)
+    """
+
+    def __init__(self, config: VideoFileCameraConfig):
+        """Initialize the video file camera.
+
+        Args:
+            config: Camera configuration.
+        """
+        super().__init__(config)
+        self.config = config
+        self.color_mode = ColorMode(config.color_mode)
+        if self.color_mode.value not in _AV_FORMATS:
+            raise ValueError(f"Unsupported color mode: {config.color_mode}")
+
+        # Presentation timestamps of every frame, and indices of the keyframes among them
+        self._frame_pts: np.ndarray | None = None
+        self._keyframes: np.ndarray | None = None
+
+        # Decoded frames as (playback index, index in the file, array)
+        self._ring: deque[tuple[int, int, np.ndarray]] = deque()
+        self._latest: np.ndarray | None = None
+        self._latest_index = -1
+        self._latest_file_index = -1
+        self._last_read_index = -1
+        self._ended = False
+        self._start_time = 0.0
+        self._seek_request: int | None = None
+        self._condition = threading.Condition()
+        self._stop_event = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._error: BaseException | None = None
+
+    @property
+    def frame_count(self) -> int:
+        """Number of frames in the video file (available once connected)."""
+        return 0 if self._frame_pts is None else len(self._frame_pts)
+
+    @property
+    def position(self) -> int:
+        """Index in the video file of the latest presented frame (-1 before the first one)."""
+        return self._latest_file_index
+
+    @property
+    def is_connected(self) -> bool:
+        """Check if the camera is connected.
+
+        Returns:
+            True if the decoding thread is running, False otherwise.
+        """
+        return self._thread is not None and self._thread.is_alive()
+
+    @staticmethod
+    def find_cameras() -> list[dict[str, Any]]:
+        """Find available video file cameras.
+
+        Since video file cameras are not physical devices, this returns an empty list.
+
+        Returns:
+            Empty list.
+        """
+        return []
+
+    def _build_index(self, video_path: Path) -> None:
+        """Demux the video once to collect frame timestamps and keyframe positions."""
+        with av.open(str(video_path)) as container:
+            stream = container.streams.video[0]
+            if self.width is None:
+                self.width = stream.codec_context.width
+            if self.height is None:
+                self.height = stream.codec_context.height
+
+            pts, keyframe = [], []
+            for packet in container.demux(stream):
+                if packet.pts is None:
+                    continue
+                pts.append(packet.pts)
+                keyframe.append(packet.is_keyframe)
+
+        if not pts:
+            raise ValueError(f"No video frame found in: {video_path}")
+
+        order = np.argsort(pts, kind="stable")
+        self._frame_pts = np.asarray(pts, dtype=np.int64)[order]
+        self._keyframes = np.flatnonzero(np.asarray(keyframe, dtype=bool)[order])
+        if len(self._keyframes) == 0 or self._keyframes[0] != 0:
+            self._keyframes = np.concatenate([[0], self._keyframes])
+
+    def connect(self, warmup: bool = True) -> None:
+        """Connect to the camera (index the video and start decoding).
+
+        Args:
+            warmup: If True, wait until the first frame has been decoded.
+
+        Raises:
+            FileNotFoundError: If the video file does not exist.
+            ValueError: If the file contains no video frame.
+        """
+        if self.is_connected:
+            return
+
+        video_path = Path(self.config.video_path)
+        if not video_path.exists():
+            raise FileNotFoundError(f"Video file not found: {video_path}")
+
+        self._build_index(video_path)
+
+        self._ring.clear()
+        self._latest = None
+        self._latest_index = -1
+        self._latest_file_index = -1
+        self._last_read_index = -1
+        self._ended = False
+        self._error = None
+        self._seek_request = None
+        self._stop_event.clear()
+        self._start_time = time.perf_counter()
+        self._thread = threading.Thread(
+            target=self._decode_loop, args=(video_path,), name=f"{self}_decode", daemon=True
+        )
+        self._thread.start()
+
+        if warmup:
+            self.async_read()
+
+    def seek(self, frame_index: int) -> None:
+        """Restart playback at the given frame index.
+
+        Decoding restarts from the closest keyframe before the requested frame and
+        the frames in between are decoded but not presented.
+
+        Args:
+            frame_index: Index of the frame to show next, in [0, frame_count).
+
+        Raises:
+            RuntimeError: If camera is not connected.
+            IndexError: If the frame index is out of range.
+        """
+        if not self.is_connected:
+            raise RuntimeError("Camera not connected. Call connect() first.")
+        if not 0 <= frame_index < self.frame_count:
+            raise IndexError(f"Frame index {frame_index} out of range [0, {self.frame_count}).")
+
+        with self._condition:
+            self._seek_request = frame_index
+            self._ring.clear()
+            self._ended = False
+            # The next read() waits for the first frame after the seek
+            self._last_read_index = self._latest_index
+            self._condition.notify_all()
+
+    def _due_index(self, now: float) -> int:
+        """Index of the frame that should be displayed at the given time."""
+        return int((now - self._start_time) * self.fps)
+
+    def _to_array(self, frame: av.VideoFrame) -> np.ndarray:
+        array = frame.reformat(
+            width=self.width, height=self.height, format=_AV_FORMATS[self.color_mode.value]
+        ).to_ndarray()
+        array.flags.writeable = False
+        return array
+
+    def _decode_loop(self, video_path: Path) -> None:
+        """Decode frames ahead of playback into the ring buffer."""
+        try:
+            with av.open(str(video_path)) as container:
+                stream = container.streams.video[0]
+                stream.thread_type = "AUTO"
+                self._decode_stream(container, stream)
+        except BaseException as e:
+            self._error = e
+            with self._condition:
+                self._condition.notify_all()
+
+    def _decode_stream(self, container, stream) -> None:
+        n_frames = len(self._frame_pts)
+        # Playback index of the first frame of the current pass through the file
+        base_index = 0
+        skip_until = 0
+        # Restart the playback clock on the next buffered frame (set after a seek)
+        resync = False
+        frames = container.decode(stream)
+
+        while not self._stop_event.is_set():
+            with self._condition:
+                seek_request, self._seek_request = self._seek_request, None
+            if seek_request is not None:
+                keyframe = self._keyframes[np.searchsorted(self._keyframes, seek_request, side="right") - 1]
+                container.seek(int(self._frame_pts[keyframe]), stream=stream, backward=True)
+                frames = container.decode(stream)
+                skip_until = seek_request
+                resync = True
+                with self._condition:
+                    self._ring.clear()
+                    base_index = self._latest_index + 1 - seek_request
+
+            frame = next(frames, None)
+            if frame is None:
+                if not self.config.loop:
+                    with self._condition:
+                        self._ended = True
+                        self._condition.notify_all()
+                        while not self._stop_event.is_set() and self._seek_request is None:
+                            self._condition.wait(0.1)
+                    continue
+                container.seek(int(self._frame_pts[0]), stream=stream, backward=True)
+                frames = container.decode(stream)
+                base_index += n_frames
+                continue
+
+            file_index = int(np.searchsorted(self._frame_pts, frame.pts)) if frame.pts is not None else 0
+            if file_index < skip_until:
+                continue
+            skip_until = 0
+            index = base_index + file_index
+
+            with self._condition:
+                # Skip late frames, unless nothing would be left to present
+                late = not resync and index < self._due_index(time.perf_counter())
+                if late and (self._ring or self._latest is not None):
+                    continue
+                while len(self._ring) >= self.config.buffer_size and not self._stop_event.is_set():
+                    if self._seek_request is not None:
+                        break
+                    self._condition.wait(0.1)
+                if self._seek_request is not None:
+                    continue
+            array = self._to_array(frame)
+            with self._condition:
+                if self._seek_request is not None:
+                    continue
+                if resync:
+                    self._start_time = time.perf_counter() - index / self.fps
+                    resync = False
+                self._ring.append((index, file_index, array))
+                self._condition.notify_all()
+
+    def _present(self) -> None:
+        """Move every frame whose presentation time has come to the front. Lock must be held."""
+        due = self._due_index(time.perf_counter())
+        while self._ring and (self._ring[0][0] <= due or self._latest is None):
+            self._latest_index, self._latest_file_index, self._latest = self._ring.popleft()
+        self._condition.notify_all()
+
+    def _output(self, frame: np.ndarray) -> np.ndarray:
+        return frame.copy() if self.config.copy_frames else frame
+
+    def read(self, color_mode: ColorMode | None = None) -> np.ndarray:
+        """Wait for the next frame and return it.
+
+        Blocks until a frame newer than the one returned by the previous read is due,
+        like a real camera delivering frames at its own rate. At the end of a
+        non-looping video, the last frame is returned immediately.
+
+        Args:
+            color_mode: Must be None or the configured color mode; frames are decoded
+                directly in that mode.
+
+        Returns:
+            The frame as a read-only numpy array, or a writable copy if
+            ``config.copy_frames`` is set.
+
+        Raises:
+            RuntimeError: If camera is not connected or decoding failed.
+            ValueError: If another color mode is requested.
+            TimeoutError: If no frame is decoded within one second.
+        """
+        if not self.is_connected:
+            raise RuntimeError("Camera not connected. Call connect() first.")
+        if color_mode is not None and ColorMode(color_mode) != self.color_mode:
+            raise ValueError(f"VideoFileCamera decodes frames in {self.color_mode}, not {color_mode}.")
+
+        deadline = time.perf_counter() + 1.0
+        with self._condition:
+            while True:
+                self._present()
+                if self._latest is not None and (
+                    self._latest_index > self._last_read_index or (self._ended and not self._ring)
+                ):
+                    break
+                if self._error is not None:
+                    raise RuntimeError(f"Failed to decode {self.config.video_path}") from self._error
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    raise TimeoutError(f"Timed out waiting for a frame from {self.config.video_path}")
+                if self._ring:
+                    # Sleep until the next buffered frame is due
+                    next_due = self._start_time + self._ring[0][0] / self.fps
+                    remaining = min(remaining, max(next_due - time.perf_counter(), 0.0))
+                self._condition.wait(remaining)
+
+            self._last_read_index = self._latest_index
+            return self._output(self._latest)
+
+    def async_read(self, timeout_ms: float = 1000.0) -> np.ndarray:
+        """Return the latest presented frame without waiting for a new one.
+
+        Only the very first call after connect() may wait, until the first frame
+        has been decoded.
+
+        Args:
+            timeout_ms: Maximum time to wait for the first frame, in milliseconds.
+
+        Returns:
+            The latest frame as a read-only numpy array (see read()).
+
+        Raises:
+            RuntimeError: If camera is not connected or decoding failed.
+            TimeoutError: If no frame is decoded within the timeout.
+        """
+        if not self.is_connected:
+            raise RuntimeError("Camera not connected. Call connect() first.")
+
+        deadline = time.perf_counter() + timeout_ms / 1000.0
+        with self._condition:
+            self._present()
+            while self._latest is None:
+                if self._error is not None:
+                    raise RuntimeError(f"Failed to decode {self.config.video_path}") from self._error
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    raise TimeoutError(f"Timed out waiting for a frame from {self.config.video_path}")
+                self._condition.wait(remaining)
+                self._present()
+            return self._output(self._latest)
+
+    def disconnect(self) -> None:
+        """Disconnect from the camera.
+
+        Stops the decoding thread and releases the buffered frames.
+        """
+        self._stop_event.set()
+        with self._condition:
+            self._condition.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self._ring.clear()
+        self._latest = None
@@ -1,6 +1,15 @@
 #!/usr/bin/env python3
+import argparse
+import hashlib
+import json
 import os
+import shutil
+import subprocess
+import sys
+import time
 import cv2
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 
 # === CONFIGURATION ===
@@ -10,46 +19,344 @@ WIDTH = 640
 HEIGHT = 480
 FPS = 30
 DURATION_S = 5  # durée de chaque vidéo en secondes
+ENCODER = "pyav"  # "pyav" (x264, image clé seule + images « skip » réutilisées, recommandé), "ffmpeg" (x264 image fixe) ou "opencv" (mp4v)
+FFMPEG_CRF = 28  # qualité x264 : plus bas = meilleur, plus lourd
+FFMPEG_PRESET = "ultrafast"  # l'image clé domine la taille, les images répétées dominent le temps
+MANIFEST_NAME = "manifest.json"  # empreintes des sources déjà encodées, dans OUTPUT_ROOT
 
-def create_static_video(png_path: str, output_path: str, width: int, height: int, fps: int, duration_s: int):
-    """Crée une vidéo MP4 à partir d'une image PNG statique."""
-    img = cv2.imread(png_path)
+def letterbox(img, width: int, height: int, background: int = 255):
+    """Redimensionne en conservant les proportions et centre l'image sur un fond blanc.
+
+    Même rendu que le filtre scale/overlay de gen_mp4_ffmpeg.sh.
+    """
+    h, w = img.shape[:2]
+    if w / h > width / height:
+        new_w, new_h = width, max(1, round(h * width / w))
+    else:
+        new_w, new_h = max(1, round(w * height / h)), height
+    interpolation = cv2.INTER_AREA if new_w < w else cv2.INTER_CUBIC
+    resized = cv2.resize(img, (new_w, new_h), interpolation=interpolation)
+
+    canvas = np.full((height, width, 3), background, dtype=np.uint8)
+    x, y = (width - new_w) // 2, (height - new_h) // 2
+    canvas[y:y + new_h, x:x + new_w] = resized
+    return canvas
+
+def flatten_alpha(img):
+    """Convertit une image (niveaux de gris, BGR ou BGRA) en BGR sur fond blanc."""
+    if img.ndim == 2:
+        return cv2.cvtColor(img, cv2.COLOR_GRAY2BGR)
+    if img.shape[2] == 4:
+        # Les PNG sont transparents : sans ce mélange le fond devient noir.
+        # bgr * a/255 + (255 - a), en entiers 8 bits via OpenCV (7x plus rapide qu'en float32)
+        bgr = cv2.cvtColor(img, cv2.COLOR_BGRA2BGR)
+        alpha = cv2.cvtColor(img[:, :, 3], cv2.COLOR_GRAY2BGR)
+        return cv2.add(cv2.multiply(bgr, alpha, scale=1 / 255), cv2.bitwise_not(alpha))
+    return img
+
+def load_target(png_path: str, width: int, height: int):
+    """Charge une cible, aplatit la transparence sur du blanc et la met au format vidéo."""
+    img = cv2.imread(png_path, cv2.IMREAD_UNCHANGED)
     if img is None:
-        print(f"❌ Impossible de lire {png_path}")
-        return
-    
-    # Redimensionne si nécessaire
-    img = cv2.resize(img, (width, height))
+        return None
+    return letterbox(flatten_alpha(img), width, height)
 
-    # Définition du codec et création du VideoWriter
+def encode_still_opencv(frame, output_path: str, fps: int, duration_s: int) -> bool:
+    """Encode l'image avec le VideoWriter mp4v d'OpenCV (une écriture par image de sortie)."""
+    height, width = frame.shape[:2]
     fourcc = cv2.VideoWriter_fourcc(*"mp4v")
     out = cv2.VideoWriter(output_path, fourcc, fps, (width, height))
+    if not out.isOpened():
+        print(f"❌ OpenCV ne peut pas écrire {output_path} (codec mp4v indisponible ?)")
+        return False
 
     frame_count = int(fps * duration_s)
     for _ in range(frame_count):
-        out.write(img)
+        out.write(frame)
 
     out.release()
+    return True
+
+def encode_still_ffmpeg(frame, output_path: str, fps: int, duration_s: int) -> bool:
+    """Encode l'image une seule fois via ffmpeg/x264 réglé pour les images fixes.
+
+    L'image est convertie une seule fois en YUV 4:2:0, envoyée une seule fois sur
+    l'entrée standard et répétée par le filtre `loop` ; avec une seule image clé,
+    les images suivantes ne sont que des blocs « skip » de quelques octets.
+    """
+    height, width = frame.shape[:2]
+    frame_count = int(fps * duration_s)
+    yuv = cv2.cvtColor(frame, cv2.COLOR_BGR2YUV_I420)
+    cmd = [
+        "ffmpeg", "-y", "-loglevel", "error",
+        "-f", "rawvideo", "-pix_fmt", "yuv420p", "-s", f"{width}x{height}", "-framerate", str(fps), "-i", "pipe:0",
+        "-vf", f"loop=loop={frame_count - 1}:size=1:start=0",
+        "-frames:v", str(frame_count), "-r", str(fps),
+        "-c:v", "libx264", "-tune", "stillimage", "-preset", FFMPEG_PRESET, "-crf", str(FFMPEG_CRF),
+        "-g", str(frame_count), "-movflags", "+faststart",
+        output_path,
+    ]
+    result = subprocess.run(cmd, input=yuv.tobytes(), capture_output=True)
+    if result.returncode != 0:
+        print(f"❌ ffmpeg a échoué pour {output_path} : {result.stderr.decode(errors='replace').strip()}")
+        return False
+    return True
+
+def _x264_options(frame_count: int) -> dict:
+    return {"tune": "stillimage", "preset": FFMPEG_PRESET, "crf": str(FFMPEG_CRF), "g": str(frame_count)}
+
+def _x264_packets(frame, fps: int, frame_count: int, encoded_frames: int):
+    """Encode encoded_frames copies de l'image avec libx264 (PyAV) ; renvoie (codec, paquets)."""
+    import av
+    from fractions import Fraction
+
+    height, width = frame.shape[:2]
+    codec = av.CodecContext.create("libx264", "w")
+    codec.width, codec.height, codec.pix_fmt = width, height, "yuv420p"
+    codec.time_base = Fraction(1, fps)
+    codec.framerate = fps
+    codec.options = _x264_options(frame_count)
+    video_frame = av.VideoFrame.from_ndarray(cv2.cvtColor(frame, cv2.COLOR_BGR2YUV_I420), format="yuv420p")
+    packets = []
+    for i in range(encoded_frames):
+        video_frame.pts = i
+        packets.extend(codec.encode(video_frame))
+    packets.extend(codec.encode(None))
+    return codec, packets
+
+# (largeur, hauteur, fps, images) -> (SPS/PPS, octets des images suivant l'image clé), par processus
+_SKIP_TEMPLATES: dict[tuple, tuple[list[bytes], list[bytes]]] = {}
+
+def _parameter_sets(keyframe: bytes) -> list[bytes]:
+    """Unités SPS et PPS (types NAL 7 et 8) en tête d'une image clé H.264 au format Annex B."""
+    units = [unit.lstrip(b"\x00") for unit in keyframe.split(b"\x00\x00\x01")]
+    return [unit for unit in units if unit and unit[0] & 0x1F in (7, 8)]
+
+def _skip_template(width: int, height: int, fps: int, frame_count: int) -> tuple[list[bytes], list[bytes]]:
+    """Images « skip » d'un clip fixe, encodées une fois par résolution puis réutilisées.
+
+    Après l'image clé d'une image fixe, x264 ne produit que des images P dont tous
+    les blocs sont « skip » : leur contenu ne dépend que de la résolution, des
+    réglages et du rang de l'image, pas de l'image elle-même.
+    """
+    key = (width, height, fps, frame_count)
+    if key not in _SKIP_TEMPLATES:
+        blank = np.full((height, width, 3), 255, dtype=np.uint8)
+        codec, packets = _x264_packets(blank, fps, frame_count, frame_count)
+        _SKIP_TEMPLATES[key] = (_parameter_sets(bytes(packets[0])), [bytes(packet) for packet in packets[1:]])
+    return _SKIP_TEMPLATES[key]
+
+def encode_still_pyav(frame, output_path: str, fps: int, duration_s: int) -> bool:
+    """Encode seulement l'image clé avec x264 (PyAV) et la fait suivre des images « skip » du gabarit.
+
+    Chaque vidéo ne coûte qu'un encodage d'image et un multiplexage, sans
+    processus ffmpeg. Si les paramètres du flux diffèrent de ceux du gabarit,
+    toutes les images sont encodées.
+    """
+    import av
+
+    height, width = frame.shape[:2]
+    frame_count = int(fps * duration_s)
+    parameter_sets, skip_packets = _skip_template(width, height, fps, frame_count)
+    codec, packets = _x264_packets(frame, fps, frame_count, 1)
+    if len(packets) != 1 or _parameter_sets(bytes(packets[0])) != parameter_sets:
+        codec, packets = _x264_packets(frame, fps, frame_count, frame_count)
+        skip_packets = [bytes(packet) for packet in packets[1:]]
+    try:
+        with av.open(output_path, "w", options={"movflags": "+faststart"}) as container:
+            stream = container.add_stream("h264", rate=fps)
+            stream.width, stream.height, stream.pix_fmt = width, height, "yuv420p"
+            stream.time_base = codec.time_base
+            for i, packet in enumerate([packets[0]] + [av.Packet(data) for data in skip_packets]):
+                packet.stream = stream
+                packet.pts = packet.dts = i
+                packet.time_base = codec.time_base
+                container.mux(packet)
+    except av.FFmpegError as e:
+        print(f"❌ PyAV a échoué pour {output_path} : {e}")
+        return False
+    return True
+
+def encoder_missing(encoder: str) -> str | None:
+    """Message d'erreur si l'encodeur n'est pas utilisable ici, sinon None."""
+    if encoder == "ffmpeg" and shutil.which("ffmpeg") is None:
+        return "❌ ffmpeg introuvable : installez-le ou utilisez --encoder pyav ou opencv"
+    if encoder == "pyav":
+        try:
+            import av
+        except ImportError:
+            return "❌ PyAV introuvable (pip install av) : utilisez --encoder ffmpeg ou opencv"
+    return None
+
+ENCODERS = {"ffmpeg": encode_still_ffmpeg, "opencv": encode_still_opencv, "pyav": encode_still_pyav}
+
+def create_static_video(png_path: str, output_path: str, width: int, height: int, fps: int, duration_s: int,
+                        encoder: str = ENCODER) -> bool:
+    """Crée une vidéo MP4 à partir d'une image PNG statique."""
+    img = load_target(png_path, width, height)
+    if img is None:
+        print(f"❌ Impossible de lire {png_path}")
+        return False
+
+    if not ENCODERS[encoder](img, output_path, fps, duration_s):
+        return False
     print(f"✅ Vidéo créée : {output_path}")
+    return True
 
-def main():
-    for shape_dir in os.listdir(PNG_ROOT):
-        shape_path = os.path.join(PNG_ROOT, shape_dir)
+def encode_params(width: int, height: int, fps: int, duration_s: int, encoder: str = ENCODER) -> dict:
+    """Paramètres d'encodage enregistrés dans le manifeste : tout changement force le ré-encodage."""
+    params = {"width": width, "height": height, "fps": fps, "duration_s": duration_s,
+              "encoder": encoder, "letterbox": True}
+    if encoder in ("ffmpeg", "pyav"):
+        params.update(crf=FFMPEG_CRF, preset=FFMPEG_PRESET)
+    return params
+
+# Codec produit par chaque encodeur, pour reconnaître une vidéo existante
+VIDEO_CODECS = {"ffmpeg": "h264", "pyav": "h264", "opencv": "mpeg4"}
+
+def probe_video(path: str) -> dict | None:
+    """Lit avec PyAV les caractéristiques d'une vidéo existante (None si illisible ou PyAV absent)."""
+    try:
+        import av
+        with av.open(path) as container:
+            stream = container.streams.video[0]
+            return {"codec": stream.codec_context.name, "width": stream.width, "height": stream.height,
+                    "pix_fmt": stream.codec_context.pix_fmt, "fps": stream.average_rate, "frames": stream.frames}
+    except Exception:
+        return None
+
+def video_matches(path: str, params: dict) -> bool:
+    """Vérifie qu'une vidéo existante a la taille, la durée, le format et le codec de `params` (encode_params).
+
+    La qualité (crf, preset) ne se relit pas : seule la forme de la vidéo est vérifiée.
+    """
+    info = probe_video(path)
+    return (info is not None
+            and info["codec"] == VIDEO_CODECS[params["encoder"]]
+            and (info["width"], info["height"]) == (params["width"], params["height"])
+            and info["pix_fmt"] == "yuv420p"
+            and info["fps"] == params["fps"]
+            and info["frames"] == int(params["fps"] * params["duration_s"]))
+
+def file_sha256(path: str) -> str:
+    """Empreinte SHA-256 du contenu d'un fichier."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def load_manifest(path: str) -> dict:
+    """Charge le manifeste des vidéos déjà produites (vide s'il n'existe pas ou est illisible)."""
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+def save_manifest(path: str, manifest: dict) -> None:
+    """Écrit le manifeste de façon atomique."""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, path)
+
+def list_targets(png_root: str, output_root: str) -> list[tuple[str, str]]:
+    """Liste les couples (png, mp4) à produire, dans un ordre stable."""
+    targets = []
+    for shape_dir in sorted(os.listdir(png_root)):
+        shape_path = os.path.join(png_root, shape_dir)
         if not os.path.isdir(shape_path):
             continue
 
-        output_shape_dir = os.path.join(OUTPUT_ROOT, shape_dir)
-        os.makedirs(output_shape_dir, exist_ok=True)
+        output_shape_dir = os.path.join(output_root, shape_dir)
 
-        for png_file in os.listdir(shape_path):
+        for png_file in sorted(os.listdir(shape_path)):
             if not png_file.lower().endswith(".png"):
                 continue
 
             png_path = os.path.join(shape_path, png_file)
             mp4_file = os.path.splitext(png_file)[0] + ".mp4"
-            output_path = os.path.join(output_shape_dir, mp4_file)
+            targets.append((png_path, os.path.join(output_shape_dir, mp4_file)))
+    return targets
+
+def init_worker() -> None:
+    """Un seul thread OpenCV par processus : le parallélisme vient du pool."""
+    cv2.setNumThreads(1)
+
+def build_target(png_path: str, output_path: str, width: int, height: int, fps: int, duration_s: int,
+                 encoder: str) -> tuple[bool, float]:
+    """Encode une cible (exécuté dans un processus du pool) ; renvoie (succès, durée)."""
+    start = time.perf_counter()
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    ok = create_static_video(png_path, output_path, width, height, fps, duration_s, encoder)
+    return ok, time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description="Génère une vidéo MP4 par image PNG de PNG_ROOT.")
+    parser.add_argument("--jobs", "-j", type=int, default=os.cpu_count(),
+                        help="nombre de processus d'encodage (1 = séquentiel)")
+    parser.add_argument("--force", action="store_true",
+                        help="ré-encode toutes les cibles, même inchangées")
+    parser.add_argument("--encoder", choices=sorted(ENCODERS), default=ENCODER,
+                        help="encodeur vidéo (défaut : %(default)s)")
+    args = parser.parse_args()
+
+    missing = encoder_missing(args.encoder)
+    if missing:
+        sys.exit(missing)
+
+    start = time.perf_counter()
+    params = encode_params(WIDTH, HEIGHT, FPS, DURATION_S, args.encoder)
+    manifest_path = os.path.join(OUTPUT_ROOT, MANIFEST_NAME)
+    os.makedirs(OUTPUT_ROOT, exist_ok=True)
+    manifest = load_manifest(manifest_path)
+
+    # Ne garde que les cibles dont la source, les paramètres ou la sortie ont changé
+    todo = []
+    skipped = 0
+    for png_path, output_path in list_targets(PNG_ROOT, OUTPUT_ROOT):
+        key = os.path.relpath(output_path, OUTPUT_ROOT)
+        entry = {"source": png_path, "sha256": file_sha256(png_path), "params": params}
+        if not args.force and manifest.get(key) == entry and os.path.exists(output_path):
+            skipped += 1
+            continue
+        todo.append((key, entry, png_path, output_path))
+
+    print(f"🎬 {len(todo)} vidéo(s) à encoder, {skipped} inchangée(s), {args.jobs} processus")
+
+    encoded = failed = 0
+    encode_time = 0.0
+    pool = None
+    try:
+        if args.jobs <= 1:
+            results = ((item, build_target(*item[2:], WIDTH, HEIGHT, FPS, DURATION_S, args.encoder)) for item in todo)
+        else:
+            pool = ProcessPoolExecutor(max_workers=args.jobs, initializer=init_worker)
+            futures = {pool.submit(build_target, *item[2:], WIDTH, HEIGHT, FPS, DURATION_S, args.encoder): item for item in todo}
+            results = ((futures[future], future.result()) for future in as_completed(futures))
+
+        for done, ((key, entry, _, _), (ok, seconds)) in enumerate(results, start=1):
+            encode_time += seconds
+            if ok:
+                encoded += 1
+                manifest[key] = entry
+            else:
+                failed += 1
+                manifest.pop(key, None)
+            if done % 50 == 0 or done == len(todo):
+                print(f"   {done}/{len(todo)}")
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+        save_manifest(manifest_path, manifest)
 
-            create_static_video(png_path, output_path, WIDTH, HEIGHT, FPS, DURATION_S)
+    elapsed = time.perf_counter() - start
+    frames = encoded * int(FPS * DURATION_S)
+    print(f"\n📊 {encoded} encodée(s), {skipped} inchangée(s), {failed} échec(s) en {elapsed:.1f} s")
+    if encoded:
+        print(f"   {encoded / elapsed:.1f} vidéos/s, {frames / elapsed:.0f} images/s "
+              f"({encode_time / encoded:.2f} s d'encodage par vidéo)")
 
 if __name__ == "__main__":
     main()
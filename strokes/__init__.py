@@ -0,0 +1,5 @@
+"""Stroke extraction and processing for caligraphomate."""
+
+from .stroke_set import StrokeSet
+
+__all__ = ["StrokeSet"]
@@ -0,0 +1,336 @@
+#!/usr/bin/env python
+
+"""Text to strokes: glyph outlines flattened once, cached, and laid out as StrokeSet polylines.
+
+A GlyphCache decodes the outline of each glyph of a font with FreeType (unhinted,
+in font units) and flattens it into polylines in millimetres at a given size, with
+the vectorized flattening of strokes.svg_compiler: every glyph missing from a
+string is flattened in the same pass. Flattened glyphs are kept in an in-memory
+LRU and written to an on-disk cache keyed by the font content, the size and the
+tolerance, so that a later run reads them back without touching the outlines.
+
+Laying out a string is then only array work on cached glyphs: the pen positions
+are the cumulative sums of the advances and kerning, line by line, and every
+glyph's points are offset and concatenated at once.
+
+Coordinates are on the sheet, in millimetres, with y pointing down like the SVG
+targets; the origin is the start of the first baseline.
+
+The disk cache holds one file per glyph, a float64 array read with a single np.load:
+    <cache_dir>/<font digest>/<size>mm_<tolerance>/<glyph index>.npy
+        [advance, S, stroke_offsets (S + 1 values), x0, y0, x1, y1, ...]
+
+Usage:
+    python -m strokes.glyphs notebook/fonts/AndikaNewBasic_R.ttf "Hello world" strokes/hello --size 10
+"""
+
+import argparse
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+
+import freetype
+import numpy as np
+
+from .stroke_set import StrokeSet
+from .svg_compiler import _CUBIC, _LINE, _MOVE, _QUAD, DEFAULT_TOLERANCE_MM, _Segments, flatten
+
+DEFAULT_CACHE_DIR = ".glyph_cache"
+DEFAULT_MAX_GLYPHS = 4096
+DEFAULT_LINE_HEIGHT = 1.2  # in ems
+
+
+@dataclass
+class Glyph:
+    """Polylines of one glyph at one size, relative to its origin on the baseline.
+
+    Attributes:
+        points: float32 array of shape (P, 2), in millimetres.
+        stroke_offsets: int64 array of shape (S + 1,) delimiting the strokes in points.
+        advance: Horizontal advance to the next glyph, in millimetres.
+    """
+    points: np.ndarray
+    stroke_offsets: np.ndarray
+    advance: float
+
+
+def font_digest(path: str | Path) -> str:
+    """Short SHA-256 of a font file, so that an edited font gets a new disk cache."""
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()[:16]
+
+
+class GlyphCache:
+    """Flattened glyphs of one font, cached in memory and on disk, and text layout.
+
+    Glyphs are keyed by (glyph index, size). A lookup checks the in-memory LRU,
+    then the disk cache, and only then decodes the outline; layout() gathers the
+    glyphs of a whole string first, so that all the misses are decoded and
+    flattened together. Methods can be called from several threads.
+
+    Kerning comes from the font's "kern" table, through FreeType; fonts that
+    only have GPOS kerning are laid out with their advances alone.
+
+    Args:
+        font_path: TrueType or OpenType font file.
+        tolerance: Maximum distance between an outline and its polyline, in millimetres.
+        cache_dir: Directory of the disk cache (None to keep glyphs in memory only).
+        max_glyphs: Number of glyphs kept in memory; the least recently used are evicted.
+
+    Example:
+        glyphs = GlyphCache("notebook/fonts/AndikaNewBasic_R.ttf")
+        stroke_set = glyphs.layout("Hello\\nworld", size_mm=8, origin=(60, 80))
+        stroke_set.save("strokes/hello")
+    """
+
+    def __init__(
+        self,
+        font_path: str | Path,
+        tolerance: float = DEFAULT_TOLERANCE_MM,
+        cache_dir: str | Path | None = DEFAULT_CACHE_DIR,
+        max_glyphs: int = DEFAULT_MAX_GLYPHS,
+    ):
+        if tolerance <= 0:
+            raise ValueError(f"`tolerance` must be positive, but {tolerance} is provided.")
+        self.font_path = Path(font_path)
+        if not self.font_path.exists():
+            raise FileNotFoundError(f"Font file not found: {self.font_path}")
+        self.tolerance = tolerance
+        self.max_glyphs = max_glyphs
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._face = freetype.Face(str(self.font_path))
+        self._units_per_em = self._face.units_per_EM
+        self._cache_dir = None if cache_dir is None else Path(cache_dir) / font_digest(self.font_path)
+        self._entries: OrderedDict[tuple[int, float], Glyph] = OrderedDict()
+        self._char_indices: dict[int, int] = {}
+        self._kerning: dict[tuple[int, int], int] = {}
+        self._lock = threading.Lock()
+
+    def _disk_path(self, glyph_index: int, size_mm: float) -> Path:
+        return self._cache_dir / f"{size_mm:g}mm_{self.tolerance:g}" / f"{glyph_index}.npy"
+
+    def _read_disk(self, glyph_index: int, size_mm: float) -> Glyph | None:
+        if self._cache_dir is None:
+            return None
+        try:
+            data = np.load(self._disk_path(glyph_index, size_mm))
+            n_strokes = int(data[1])
+            offsets = data[2:n_strokes + 3].astype(np.int64)
+            points = data[n_strokes + 3:].astype(np.float32).reshape(-1, 2)
+        except (OSError, ValueError, IndexError):
+            # Missing, or left unreadable by an interrupted run: decode again
+            return None
+        if len(points) != offsets[-1]:
+            return None
+        return Glyph(points, offsets, float(data[0]))
+
+    def _write_disk(self, glyph_index: int, size_mm: float, glyph: Glyph) -> None:
+        path = self._disk_path(glyph_index, size_mm)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        data = np.concatenate([[glyph.advance, len(glyph.stroke_offsets) - 1], glyph.stroke_offsets,
+                               glyph.points.ravel()]).astype(np.float64)
+        tmp_path = path.with_name(f"{path.stem}.{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp_path, "wb") as f:
+            np.save(f, data)
+        os.replace(tmp_path, path)
+
+    def _store(self, key: tuple[int, float], glyph: Glyph) -> None:
+        self._entries[key] = glyph
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_glyphs:
+            self._entries.popitem(last=False)
+
+    def _decode(self, glyph_indices: list[int], size_mm: float) -> list[Glyph]:
+        """Decode the outlines of several glyphs and flatten them in one vectorized pass."""
+        scale = size_mm / self._units_per_em
+        segments = _Segments()
+        # Font units, y up -> millimetres on the sheet, y down
+        matrix_id = segments.add_matrix(np.diag([scale, -scale, 1.0]))
+        advances = []
+
+        def move_to(a, _):
+            segments.add(_MOVE, matrix_id, a.x, a.y)
+            current[:] = a.x, a.y
+
+        def line_to(a, _):
+            segments.add(_LINE, matrix_id, a.x, a.y)
+            current[:] = a.x, a.y
+
+        def conic_to(a, b, _):
+            segments.add(_QUAD, matrix_id, *current, a.x, a.y, b.x, b.y)
+            current[:] = b.x, b.y
+
+        def cubic_to(a, b, c, _):
+            segments.add(_CUBIC, matrix_id, *current, a.x, a.y, b.x, b.y, c.x, c.y)
+            current[:] = c.x, c.y
+
+        current = [0, 0]
+        for glyph_index in glyph_indices:
+            self._face.load_glyph(glyph_index, freetype.FT_LOAD_NO_SCALE)
+            segments.target_starts.append(len(segments.stroke_starts))
+            # FreeType closes every contour, so each one is a closed stroke
+            self._face.glyph.outline.decompose(None, move_to, line_to, conic_to, cubic_to)
+            advances.append(self._face.glyph.advance.x * scale)
+
+        flat = flatten(segments, [str(g) for g in glyph_indices], self.tolerance)
+        glyphs = []
+        for t, advance in enumerate(advances):
+            first, last = flat.target_offsets[t], flat.target_offsets[t + 1]
+            offsets = flat.stroke_offsets[first:last + 1]
+            points = flat.points[offsets[0]:offsets[-1]] if last > first else np.zeros((0, 2), np.float32)
+            # Copies, so that a cached glyph does not keep the whole batch alive
+            glyphs.append(Glyph(points.copy(), (offsets - offsets[0]).astype(np.int64), advance))
+        return glyphs
+
+    def glyphs(self, glyph_indices: list[int], size_mm: float) -> dict[int, Glyph]:
+        """Return flattened glyphs, decoding all those in neither cache at once."""
+        found = {}
+        missing = []
+        with self._lock:
+            for glyph_index in dict.fromkeys(glyph_indices):
+                key = (glyph_index, size_mm)
+                glyph = self._entries.get(key)
+                if glyph is not None:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                else:
+                    glyph = self._read_disk(glyph_index, size_mm)
+                    if glyph is None:
+                        missing.append(glyph_index)
+                        continue
+                    self._store(key, glyph)
+                    self.disk_hits += 1
+                found[glyph_index] = glyph
+
+            if missing:
+                self.misses += len(missing)
+                for glyph_index, glyph in zip(missing, self._decode(missing, size_mm)):
+                    self._store((glyph_index, size_mm), glyph)
+                    if self._cache_dir is not None:
+                        self._write_disk(glyph_index, size_mm, glyph)
+                    found[glyph_index] = glyph
+        return found
+
+    def char_indices(self, codepoints: np.ndarray) -> np.ndarray:
+        """Glyph index of each code point (0, the "missing glyph", where the font lacks it)."""
+        unique, inverse = np.unique(codepoints, return_inverse=True)
+        with self._lock:
+            indices = []
+            for codepoint in unique.tolist():
+                glyph_index = self._char_indices.get(codepoint)
+                if glyph_index is None:
+                    glyph_index = self._char_indices[codepoint] = self._face.get_char_index(codepoint)
+                indices.append(glyph_index)
+        return np.asarray(indices, dtype=np.int64)[inverse.ravel()]
+
+    def _pair_kerning(self, left: np.ndarray, right: np.ndarray) -> np.ndarray:
+        """Kerning of each (left, right) glyph pair, in font units."""
+        kerning = np.zeros(len(left))
+        if not self._face.has_kerning or len(left) == 0:
+            return kerning
+        pairs = np.stack([left, right], axis=1)
+        unique, inverse = np.unique(pairs, axis=0, return_inverse=True)
+        with self._lock:
+            values = []
+            for l, r in unique.tolist():
+                value = self._kerning.get((l, r))
+                if value is None:
+                    value = self._kerning[l, r] = self._face.get_kerning(l, r, freetype.FT_KERNING_UNSCALED).x
+                values.append(value)
+        return np.asarray(values, dtype=np.float64)[inverse.ravel()]
+
+    def layout(
+        self,
+        text: str,
+        size_mm: float,
+        origin: tuple[float, float] = (0.0, 0.0),
+        line_height: float = DEFAULT_LINE_HEIGHT,
+        name: str | None = None,
+    ) -> StrokeSet:
+        """Lay out a string as a single-target StrokeSet, one stroke per glyph contour.
+
+        Args:
+            text: Text to write; "\\n" starts a new line.
+            size_mm: Em size, in millimetres (the font size, as a word processor would set it).
+            origin: Start of the first baseline on the sheet, in millimetres.
+            line_height: Distance between baselines, in ems.
+            name: Target name (default: the text).
+
+        Returns:
+            The strokes of the text, in millimetres on the sheet.
+        """
+        if size_mm <= 0:
+            raise ValueError(f"`size_mm` must be positive, but {size_mm} is provided.")
+        codepoints = np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32)
+        newline = codepoints == ord("\n")
+        line_of = np.cumsum(newline)[~newline]
+        unique, placed = np.unique(self.char_indices(codepoints[~newline]), return_inverse=True)
+        placed = placed.ravel()
+        glyphs = self.glyphs(unique.tolist(), size_mm)
+        table = [glyphs[g] for g in unique.tolist()]
+
+        # Pen position: advances plus the kerning with the next glyph on the same line
+        step = np.array([glyph.advance for glyph in table], dtype=np.float64)[placed]
+        same_line = line_of[1:] == line_of[:-1]
+        kerning = self._pair_kerning(unique[placed[:-1][same_line]], unique[placed[1:][same_line]])
+        step[:-1][same_line] += kerning * size_mm / self._units_per_em
+        pen = np.cumsum(step) - step
+        # Back to the origin at the first glyph of each line
+        line_first = np.flatnonzero(np.diff(line_of, prepend=-1))
+        pen -= np.repeat(pen[line_first], np.diff(line_first, append=len(pen)))
+        positions = np.stack([origin[0] + pen, origin[1] + line_of * line_height * size_mm], axis=1)
+
+        # Points and strokes of the distinct glyphs, gathered for every placed glyph at once
+        glyph_points = np.concatenate([np.zeros((0, 2), np.float32)] + [glyph.points for glyph in table])
+        glyph_ends = np.concatenate([np.zeros(0, np.int64)] + [glyph.stroke_offsets[1:] for glyph in table])
+        point_counts = np.array([len(glyph.points) for glyph in table], dtype=np.int64)[placed]
+        stroke_counts = np.array([len(glyph.stroke_offsets) - 1 for glyph in table], dtype=np.int64)[placed]
+        point_base = np.cumsum(point_counts) - point_counts
+        stroke_base = np.cumsum(stroke_counts) - stroke_counts
+        point_starts = np.cumsum([0] + [len(glyph.points) for glyph in table])[:-1][placed]
+        stroke_starts = np.cumsum([0] + [len(glyph.stroke_offsets) - 1 for glyph in table])[:-1][placed]
+
+        gather = np.repeat(point_starts - point_base, point_counts) + np.arange(point_counts.sum())
+        points = (glyph_points[gather] + np.repeat(positions, point_counts, axis=0)).astype(np.float32)
+        gather = np.repeat(stroke_starts - stroke_base, stroke_counts) + np.arange(stroke_counts.sum())
+        stroke_offsets = np.concatenate(
+            [[0], glyph_ends[gather] + np.repeat(point_base, stroke_counts)]
+        ).astype(np.int64)
+        return StrokeSet(
+            points=points,
+            stroke_offsets=stroke_offsets,
+            target_offsets=np.array([0, len(stroke_offsets) - 1], dtype=np.int64),
+            names=[text if name is None else name],
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("font", help="TrueType or OpenType font file")
+    parser.add_argument("text", help='text to write ("\\n" for a new line)')
+    parser.add_argument("output", help="stroke set directory to write")
+    parser.add_argument("--size", type=float, default=10.0, help="em size in millimetres (default: %(default)s)")
+    parser.add_argument("--origin", type=float, nargs=2, default=(0.0, 0.0), metavar=("X", "Y"),
+                        help="start of the first baseline, in millimetres")
+    parser.add_argument("--line-height", type=float, default=DEFAULT_LINE_HEIGHT, help="in ems")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE_MM,
+                        help="maximum deviation from the outlines, in millimetres (default: %(default)s)")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR, help="disk cache of the flattened glyphs")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    glyphs = GlyphCache(args.font, args.tolerance, args.cache_dir)
+    stroke_set = glyphs.layout(args.text.replace("\\n", "\n"), args.size, tuple(args.origin), args.line_height)
+    stroke_set.save(args.output)
+    print(f"{stroke_set.n_strokes} strokes, {len(stroke_set.points)} points in {time.perf_counter() - start:.3f} s "
+          f"({glyphs.hits + glyphs.disk_hits} cached glyphs, {glyphs.misses} decoded) -> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
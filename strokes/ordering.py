@@ -0,0 +1,268 @@
+#!/usr/bin/env python
+
+"""Reorder and reverse strokes to minimize the pen-up travel of the arm.
+
+The order starts with a greedy nearest-neighbour pass: from the current pen
+position, the closest free stroke end is found with a uniform grid over both ends
+of every stroke, and the stroke is drawn from that end. The tour is then refined
+with 2-opt moves until no move helps or the time budget runs out. Reversing a run
+of strokes also reverses each stroke of the run, so only the two pen-up moves at
+the ends of the run change and every move is evaluated in constant time.
+
+Usage:
+    python -m strokes.ordering strokes/svg strokes/svg_ordered --budget 0.5
+"""
+
+import argparse
+import math
+import time
+from dataclasses import dataclass
+
+import numpy as np
+
+from .stroke_set import StrokeSet
+
+# Estimated SO-100 speeds, used to report drawing times
+PEN_DOWN_SPEED_MM_S = 20.0
+PEN_UP_SPEED_MM_S = 60.0
+PEN_LIFT_S = 0.3  # lifting then lowering the pen, once per stroke
+DEFAULT_TIME_BUDGET_S = 0.5
+
+
+@dataclass
+class OrderResult:
+    """Optimized order of the strokes of one target.
+
+    Attributes:
+        order: Index of the stroke drawn at each step.
+        reversed: Whether the stroke drawn at each step is drawn from its last point.
+        pen_up_before: Pen-up travel of the original order, in millimetres.
+        pen_up_after: Pen-up travel of the optimized order, in millimetres.
+        time_before: Estimated drawing time of the original order, in seconds.
+        time_after: Estimated drawing time of the optimized order, in seconds.
+        two_opt_moves: Number of 2-opt moves applied.
+    """
+    order: np.ndarray
+    reversed: np.ndarray
+    pen_up_before: float
+    pen_up_after: float
+    time_before: float
+    time_after: float
+    two_opt_moves: int = 0
+
+    def apply(self, strokes: list[np.ndarray]) -> list[np.ndarray]:
+        """Return the strokes in the optimized order and direction."""
+        return [strokes[i][::-1] if flip else strokes[i] for i, flip in zip(self.order, self.reversed)]
+
+
+def pen_up_distance(starts: np.ndarray, ends: np.ndarray, home: np.ndarray) -> float:
+    """Pen-up travel from home through strokes going from starts[i] to ends[i], in order."""
+    if len(starts) == 0:
+        return 0.0
+    previous = np.vstack([home[None], ends[:-1]])
+    return float(np.linalg.norm(starts - previous, axis=1).sum())
+
+
+def drawing_time(pen_down: float, pen_up: float, n_strokes: int) -> float:
+    """Estimated time to draw, in seconds, from the pen-down and pen-up lengths in millimetres."""
+    return pen_down / PEN_DOWN_SPEED_MM_S + pen_up / PEN_UP_SPEED_MM_S + n_strokes * PEN_LIFT_S
+
+
+class _EndpointGrid:
+    """Uniform grid over both ends of every stroke, for nearest free end queries."""
+
+    def __init__(self, starts: np.ndarray, ends: np.ndarray):
+        points = np.concatenate([starts, ends])  # end k belongs to stroke k % n
+        self.points = points
+        self.n = len(starts)
+        self.origin = points.min(axis=0)
+        extent = points.max(axis=0) - self.origin
+        # About two ends per cell, and no more cells than ends along a thin drawing
+        self.cell = max(math.sqrt(extent[0] * extent[1] / max(self.n, 1)), extent.max() / max(self.n, 1), 1e-3)
+        self.shape = np.floor(extent / self.cell).astype(int) + 1
+        cells = np.floor((points - self.origin) / self.cell).astype(int)
+        self.cells: dict[tuple[int, int], list[int]] = {}
+        for k, (cx, cy) in enumerate(cells):
+            self.cells.setdefault((cx, cy), []).append(k)
+        self.cell_of = [tuple(c) for c in cells]
+
+    def remove(self, stroke: int) -> None:
+        for k in (stroke, stroke + self.n):
+            cell = self.cells[self.cell_of[k]]
+            cell.remove(k)
+            if not cell:
+                del self.cells[self.cell_of[k]]
+
+    def nearest(self, position: np.ndarray) -> int:
+        """Return the free end (k < n: a stroke start, k >= n: a stroke end) closest to position."""
+        # Rings are centered on the closest cell of the grid: projecting the position
+        # onto the grid never makes it farther from an end
+        cx, cy = np.clip(np.floor((position - self.origin) / self.cell).astype(int), 0, self.shape - 1)
+        best, best_distance = -1, math.inf
+        for ring in range(int(self.shape.max()) + 1):
+            # Every end in ring r or beyond is at least (r - 1) cells away
+            if best >= 0 and best_distance <= (ring - 1) * self.cell:
+                break
+            for x in range(cx - ring, cx + ring + 1):
+                edge = ring if x in (cx - ring, cx + ring) else 0
+                ys = range(cy - ring, cy + ring + 1) if edge else (cy - ring, cy + ring)
+                for y in ys:
+                    for k in self.cells.get((x, y), ()):
+                        distance = math.dist(position, self.points[k])
+                        if distance < best_distance:
+                            best, best_distance = k, distance
+        return best
+
+
+def greedy_order(starts: np.ndarray, ends: np.ndarray, home: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Nearest-neighbour order: always draw next the stroke with the closest free end."""
+    n = len(starts)
+    grid = _EndpointGrid(starts, ends)
+    order = np.empty(n, dtype=np.int64)
+    flipped = np.zeros(n, dtype=bool)
+    position = home
+    for step in range(n):
+        k = grid.nearest(position)
+        stroke, flip = k % n, k >= n
+        grid.remove(stroke)
+        order[step], flipped[step] = stroke, flip
+        position = starts[stroke] if flip else ends[stroke]
+    return order, flipped
+
+
+def two_opt(
+    order: np.ndarray, flipped: np.ndarray, starts: np.ndarray, ends: np.ndarray, home: np.ndarray,
+    time_budget: float,
+) -> int:
+    """Improve the order in place with 2-opt moves until none helps or time_budget is spent.
+
+    Reversing steps i..j changes only two pen-up moves: a -> b becomes a -> c and
+    c -> d becomes b -> d, where a is the pen position before step i, b the start
+    of step i, c the end of step j and d the start of step j + 1 (nothing after the
+    last step: the tour is open).
+
+    Returns:
+        The number of moves applied.
+    """
+    n = len(order)
+    deadline = time.perf_counter() + time_budget
+    first = np.where(flipped[:, None], ends[order], starts[order])
+    last = np.where(flipped[:, None], starts[order], ends[order])
+    moves = 0
+    improved = True
+    while improved and time.perf_counter() < deadline:
+        improved = False
+        for i in range(n):
+            if time.perf_counter() >= deadline:
+                break
+            a = home if i == 0 else last[i - 1]
+            b = first[i]
+            c = last[i:]
+            ab = math.dist(a, b)
+            ac = np.linalg.norm(c - a, axis=1)
+            # Pen-up moves after each candidate j; the last step has none
+            cd = np.zeros(n - i)
+            bd = np.zeros(n - i)
+            cd[:-1] = np.linalg.norm(first[i + 1:] - c[:-1], axis=1)
+            bd[:-1] = np.linalg.norm(first[i + 1:] - b, axis=1)
+            gain = ab + cd - ac - bd
+            j = int(np.argmax(gain))
+            if gain[j] <= 1e-9:
+                continue
+            j += i
+            order[i:j + 1] = order[i:j + 1][::-1].copy()
+            flipped[i:j + 1] = ~flipped[i:j + 1][::-1]
+            first[i:j + 1], last[i:j + 1] = last[i:j + 1][::-1].copy(), first[i:j + 1][::-1].copy()
+            moves += 1
+            improved = True
+    return moves
+
+
+def optimize_order(
+    strokes: list[np.ndarray], home: tuple[float, float] = (0.0, 0.0), time_budget: float = DEFAULT_TIME_BUDGET_S,
+) -> OrderResult:
+    """Find a drawing order and direction of the strokes that shortens pen-up travel.
+
+    Args:
+        strokes: Polylines of shape (N, 2), in millimetres.
+        home: Pen position before the first stroke.
+        time_budget: Seconds allowed for the 2-opt refinement.
+    """
+    home = np.asarray(home, dtype=np.float64)
+    n = len(strokes)
+    starts = np.array([s[0] for s in strokes], dtype=np.float64).reshape(n, 2)
+    ends = np.array([s[-1] for s in strokes], dtype=np.float64).reshape(n, 2)
+    pen_down = float(sum(np.linalg.norm(np.diff(s, axis=0), axis=1).sum() for s in strokes))
+
+    pen_up_before = pen_up_distance(starts, ends, home)
+    if n == 0:
+        order, flipped = np.zeros(0, dtype=np.int64), np.zeros(0, dtype=bool)
+        moves = 0
+    else:
+        order, flipped = greedy_order(starts, ends, home)
+        moves = two_opt(order, flipped, starts, ends, home, time_budget)
+
+    first = np.where(flipped[:, None], ends[order], starts[order])
+    last = np.where(flipped[:, None], starts[order], ends[order])
+    pen_up_after = pen_up_distance(first, last, home)
+    if pen_up_after > pen_up_before:
+        # Never worse than the original order
+        order, flipped, pen_up_after = np.arange(n), np.zeros(n, dtype=bool), pen_up_before
+
+    return OrderResult(
+        order=order,
+        reversed=flipped,
+        pen_up_before=pen_up_before,
+        pen_up_after=pen_up_after,
+        time_before=drawing_time(pen_down, pen_up_before, n),
+        time_after=drawing_time(pen_down, pen_up_after, n),
+        two_opt_moves=moves,
+    )
+
+
+def optimize_stroke_set(
+    stroke_set: StrokeSet, home: tuple[float, float] = (0.0, 0.0), time_budget: float = DEFAULT_TIME_BUDGET_S,
+) -> tuple[StrokeSet, list[OrderResult]]:
+    """Optimize every target of a stroke set, each with its own time budget."""
+    targets = []
+    results = []
+    for t in range(len(stroke_set)):
+        strokes = stroke_set.strokes(t)
+        result = optimize_order(strokes, home, time_budget)
+        targets.append(StrokeSet.from_strokes(result.apply(strokes), stroke_set.names[t]))
+        results.append(result)
+    if not targets:
+        return stroke_set, results
+    return StrokeSet.concatenate(targets), results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("input", help="stroke set directory")
+    parser.add_argument("output", help="optimized stroke set directory to write")
+    parser.add_argument("--targets", nargs="+", help="only these targets (default: all)")
+    parser.add_argument("--budget", type=float, default=DEFAULT_TIME_BUDGET_S,
+                        help="2-opt time budget per target, in seconds (default: %(default)s)")
+    parser.add_argument("--home", type=float, nargs=2, default=(0.0, 0.0), help="pen position before drawing, in mm")
+    args = parser.parse_args()
+
+    stroke_set = StrokeSet.load(args.input)
+    if args.targets:
+        stroke_set = StrokeSet.concatenate([stroke_set.target(name) for name in args.targets])
+
+    start = time.perf_counter()
+    optimized, results = optimize_stroke_set(stroke_set, tuple(args.home), args.budget)
+    optimized.save(args.output)
+
+    pen_up_before = sum(r.pen_up_before for r in results)
+    pen_up_after = sum(r.pen_up_after for r in results)
+    time_before = sum(r.time_before for r in results)
+    time_after = sum(r.time_after for r in results)
+    print(f"{len(results)} targets optimized in {time.perf_counter() - start:.1f} s -> {args.output}")
+    print(f"pen-up travel: {pen_up_before / 1000:.1f} m -> {pen_up_after / 1000:.1f} m")
+    print(f"drawing time: {time_before / 60:.1f} min -> {time_after / 60:.1f} min "
+          f"({100 * (1 - time_after / time_before) if time_before else 0.0:.1f}% saved)")
+
+
+if __name__ == "__main__":
+    main()
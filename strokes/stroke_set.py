@@ -0,0 +1,136 @@
+#!/usr/bin/env python
+
+"""StrokeSet: polylines of many drawing targets packed into flat NumPy arrays.
+
+A stroke set is saved as a directory containing:
+    points.npy          float32 array of shape (P, 2): every point, in millimetres.
+    stroke_offsets.npy  int64 array of shape (S + 1,): stroke s is
+                        points[stroke_offsets[s]:stroke_offsets[s + 1]].
+    target_offsets.npy  int64 array of shape (T + 1,): target t is made of strokes
+                        target_offsets[t] to target_offsets[t + 1].
+    names.json          The T target names (e.g. "circle/circle_001").
+
+Loading maps the arrays in memory, so there is nothing to parse.
+"""
+
+import json
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+
+POINTS_FILE = "points.npy"
+STROKE_OFFSETS_FILE = "stroke_offsets.npy"
+TARGET_OFFSETS_FILE = "target_offsets.npy"
+NAMES_FILE = "names.json"
+
+
+@dataclass
+class StrokeSet:
+    """Polylines of one or more targets, in millimetres.
+
+    Attributes:
+        points: Array of shape (P, 2) with the x, y coordinates of every point.
+        stroke_offsets: Array of shape (S + 1,) delimiting the strokes in points.
+        target_offsets: Array of shape (T + 1,) delimiting the targets in strokes.
+        names: Name of each target.
+    """
+    points: np.ndarray
+    stroke_offsets: np.ndarray
+    target_offsets: np.ndarray
+    names: list[str]
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    @property
+    def n_strokes(self) -> int:
+        return len(self.stroke_offsets) - 1
+
+    def index(self, name: str) -> int:
+        """Return the index of a target from its name.
+
+        Raises:
+            KeyError: If there is no target with that name.
+        """
+        try:
+            return self.names.index(name)
+        except ValueError:
+            raise KeyError(f"Unknown target: {name}") from None
+
+    def strokes(self, target: int | str) -> list[np.ndarray]:
+        """Return the strokes of a target, as views into points."""
+        t = self.index(target) if isinstance(target, str) else target
+        first, last = self.target_offsets[t], self.target_offsets[t + 1]
+        offsets = self.stroke_offsets[first:last + 1]
+        return [self.points[start:end] for start, end in zip(offsets[:-1], offsets[1:])]
+
+    def target(self, target: int | str) -> "StrokeSet":
+        """Return a single target as its own StrokeSet (arrays are views where possible)."""
+        t = self.index(target) if isinstance(target, str) else target
+        first, last = self.target_offsets[t], self.target_offsets[t + 1]
+        offsets = self.stroke_offsets[first:last + 1]
+        return StrokeSet(
+            points=self.points[offsets[0]:offsets[-1]],
+            stroke_offsets=offsets - offsets[0],
+            target_offsets=np.array([0, last - first], dtype=np.int64),
+            names=[self.names[t]],
+        )
+
+    @classmethod
+    def from_strokes(cls, strokes: list[np.ndarray], name: str = "") -> "StrokeSet":
+        """Build a single-target StrokeSet from a list of (N, 2) polylines."""
+        lengths = [len(stroke) for stroke in strokes]
+        points = np.concatenate(strokes).astype(np.float32) if strokes else np.zeros((0, 2), np.float32)
+        return cls(
+            points=points,
+            stroke_offsets=np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64),
+            target_offsets=np.array([0, len(strokes)], dtype=np.int64),
+            names=[name],
+        )
+
+    @classmethod
+    def concatenate(cls, stroke_sets: list["StrokeSet"]) -> "StrokeSet":
+        """Merge several stroke sets, keeping their targets in order."""
+        point_base = np.cumsum([0] + [len(s.points) for s in stroke_sets])
+        stroke_base = np.cumsum([0] + [s.n_strokes for s in stroke_sets])
+        return cls(
+            points=np.concatenate([s.points for s in stroke_sets]).astype(np.float32),
+            stroke_offsets=np.concatenate(
+                [[0]] + [s.stroke_offsets[1:] + base for s, base in zip(stroke_sets, point_base)]
+            ).astype(np.int64),
+            target_offsets=np.concatenate(
+                [[0]] + [s.target_offsets[1:] + base for s, base in zip(stroke_sets, stroke_base)]
+            ).astype(np.int64),
+            names=[name for s in stroke_sets for name in s.names],
+        )
+
+    def save(self, path: str | Path) -> None:
+        """Write the stroke set to a directory."""
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+        np.save(path / POINTS_FILE, np.ascontiguousarray(self.points, dtype=np.float32))
+        np.save(path / STROKE_OFFSETS_FILE, np.ascontiguousarray(self.stroke_offsets, dtype=np.int64))
+        np.save(path / TARGET_OFFSETS_FILE, np.ascontiguousarray(self.target_offsets, dtype=np.int64))
+        with open(path / NAMES_FILE, "w") as f:
+            json.dump(self.names, f, indent=1)
+
+    @classmethod
+    def load(cls, path: str | Path, mmap: bool = True) -> "StrokeSet":
+        """Open a stroke set directory, memory-mapping its arrays unless mmap is False.
+
+        Raises:
+            FileNotFoundError: If the directory is not a stroke set.
+        """
+        path = Path(path)
+        if not (path / NAMES_FILE).exists():
+            raise FileNotFoundError(f"Stroke set not found: {path}")
+        mode = "r" if mmap else None
+        with open(path / NAMES_FILE) as f:
+            names = json.load(f)
+        return cls(
+            points=np.load(path / POINTS_FILE, mmap_mode=mode),
+            stroke_offsets=np.load(path / STROKE_OFFSETS_FILE, mmap_mode=mode),
+            target_offsets=np.load(path / TARGET_OFFSETS_FILE, mmap_mode=mode),
+            names=names,
+        )
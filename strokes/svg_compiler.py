@@ -0,0 +1,489 @@
+#!/usr/bin/env python
+
+"""Compile SVG targets into StrokeSet polylines a robot can follow.
+
+Every svg/<shape>/*.svg file is parsed with ElementTree: line, rect (with rounded
+corners), circle, ellipse, polyline, polygon and path elements (all commands,
+including elliptical arcs), nested in groups with transform attributes such as
+the translate(...) of the A5 area written by notebook/createSvg.ipynb.
+
+Parsing only records raw segments and the transform they are drawn with. The
+transforms and the flattening are then applied to all files at once, one
+vectorized NumPy pass per segment kind, with an adaptive number of points so that
+the polyline never deviates from the curve by more than the tolerance (in
+millimetres on the sheet).
+
+Usage:
+    python -m strokes.svg_compiler svg strokes/svg --tolerance 0.1
+"""
+
+import argparse
+import math
+import re
+import time
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+import numpy as np
+
+from .stroke_set import StrokeSet
+
+SVG_NS = "{http://www.w3.org/2000/svg}"
+DEFAULT_TOLERANCE_MM = 0.1
+# Upper bound on the points of a single flattened segment
+MAX_SEGMENT_POINTS = 4096
+
+# Millimetres per unit of the width/height attributes
+_UNITS_MM = {"mm": 1.0, "cm": 10.0, "in": 25.4, "pt": 25.4 / 72, "pc": 25.4 / 6, "px": 25.4 / 96}
+_PX_MM = _UNITS_MM["px"]
+
+_NUMBER = re.compile(r"[-+]?(?:\d*\.\d+|\d+\.?)(?:[eE][-+]?\d+)?")
+_PATH_TOKEN = re.compile(r"[A-Za-z]|[-+]?(?:\d*\.\d+|\d+\.?)(?:[eE][-+]?\d+)?")
+_TRANSFORM = re.compile(r"(matrix|translate|scale|rotate|skewX|skewY)\s*\(([^)]*)\)")
+_SKIPPED_TAGS = {"defs", "clipPath", "mask", "symbol", "marker", "pattern", "style", "title", "desc", "metadata"}
+
+# Segment kinds, and the number of values recorded for each
+_MOVE, _LINE, _QUAD, _CUBIC, _ARC = range(5)
+_PARAM_SIZES = {_MOVE: 2, _LINE: 2, _QUAD: 6, _CUBIC: 8, _ARC: 8}
+# Number of arguments of each path command
+_PATH_ARITY = {"M": 2, "L": 2, "H": 1, "V": 1, "C": 6, "S": 4, "Q": 4, "T": 2, "A": 7, "Z": 0}
+
+
+class _Segments:
+    """Raw segments of every parsed file, in drawing order.
+
+    Each segment produces the points following its start point; a MOVE produces
+    the first point of a stroke. Concatenating the points of all segments in order
+    therefore gives every stroke, one after the other.
+
+    Coordinates are stored in the user units of their element, along with the
+    index of the matrix mapping them to millimetres on the sheet. Arcs are stored
+    as (cx, cy, a00, a01, a10, a11, theta, dtheta): the point at angle t is
+    center + A @ (cos t, sin t).
+    """
+
+    def __init__(self):
+        self.kinds: list[int] = []
+        self.matrix_ids: list[int] = []
+        self.params: dict[int, list[float]] = {kind: [] for kind in _PARAM_SIZES}
+        self.matrices: list[np.ndarray] = []
+        self.stroke_starts: list[int] = []  # index of the MOVE segment of each stroke
+        self.target_starts: list[int] = []  # index of the first stroke of each target
+
+    def add_matrix(self, matrix: np.ndarray) -> int:
+        self.matrices.append(matrix)
+        return len(self.matrices) - 1
+
+    def add(self, kind: int, matrix_id: int, *params: float) -> None:
+        if kind == _MOVE:
+            self.stroke_starts.append(len(self.kinds))
+        self.kinds.append(kind)
+        self.matrix_ids.append(matrix_id)
+        self.params[kind].extend(params)
+
+
+def _length(value: str | None, default: float = 0.0) -> float:
+    if value is None:
+        return default
+    match = _NUMBER.match(value.strip())
+    return float(match.group()) if match else default
+
+
+def parse_transform(value: str | None) -> np.ndarray:
+    """Parse an SVG transform attribute into a 3x3 affine matrix."""
+    matrix = np.eye(3)
+    if not value:
+        return matrix
+    for name, args in _TRANSFORM.findall(value):
+        v = [float(x) for x in _NUMBER.findall(args)]
+        m = np.eye(3)
+        if name == "matrix" and len(v) == 6:
+            m[:2] = [[v[0], v[2], v[4]], [v[1], v[3], v[5]]]
+        elif name == "translate" and v:
+            m[0, 2], m[1, 2] = v[0], v[1] if len(v) > 1 else 0.0
+        elif name == "scale" and v:
+            m[0, 0], m[1, 1] = v[0], v[1] if len(v) > 1 else v[0]
+        elif name == "rotate" and v:
+            a = math.radians(v[0])
+            m[:2, :2] = [[math.cos(a), -math.sin(a)], [math.sin(a), math.cos(a)]]
+            if len(v) == 3:
+                t = np.eye(3)
+                t[:2, 2] = v[1:]
+                m = t @ m @ np.linalg.inv(t)
+        elif name == "skewX" and v:
+            m[0, 1] = math.tan(math.radians(v[0]))
+        elif name == "skewY" and v:
+            m[1, 0] = math.tan(math.radians(v[0]))
+        matrix = matrix @ m
+    return matrix
+
+
+def _root_transform(root: ET.Element) -> np.ndarray:
+    """Matrix from the user units of the root element to millimetres on the sheet."""
+    width, height = root.get("width"), root.get("height")
+    view_box = [float(x) for x in _NUMBER.findall(root.get("viewBox", ""))]
+    if len(view_box) != 4 or view_box[2] <= 0 or view_box[3] <= 0:
+        # Without a viewBox, one user unit is one CSS pixel
+        return np.diag([_PX_MM, _PX_MM, 1.0])
+
+    unit = re.sub(r"[\d.\s+-]", "", width or "")
+    scale = _UNITS_MM.get(unit, _PX_MM)
+    sx = scale * _length(width, view_box[2]) / view_box[2]
+    sy = scale * _length(height, view_box[3]) / view_box[3]
+    return np.array([[sx, 0, -view_box[0] * sx], [0, sy, -view_box[1] * sy], [0, 0, 1]])
+
+
+def _arc_flag(tokens: list[str], i: int) -> tuple[bool, int]:
+    """Read an arc flag, which may be written without separator (e.g. "a5 5 0 0110 10")."""
+    token = tokens[i]
+    if token in ("0", "1"):
+        return token == "1", i + 1
+    if token[0] not in "01":
+        raise ValueError(f"Invalid arc flag: {token!r}")
+    tokens[i] = token[1:]
+    return token[0] == "1", i
+
+
+def _arc_to_center(x0, y0, rx, ry, angle, large_arc, sweep, x1, y1):
+    """Convert a path "A" command from endpoint to center parameterization (SVG F.6.5).
+
+    Returns:
+        (cx, cy, rx, ry, phi, theta, dtheta), or None if the arc is a straight line.
+    """
+    rx, ry = abs(rx), abs(ry)
+    if rx == 0 or ry == 0:
+        return None
+    phi = math.radians(angle % 360)
+    cos_phi, sin_phi = math.cos(phi), math.sin(phi)
+    dx, dy = (x0 - x1) / 2, (y0 - y1) / 2
+    x_p = cos_phi * dx + sin_phi * dy
+    y_p = -sin_phi * dx + cos_phi * dy
+
+    ratio = x_p ** 2 / rx ** 2 + y_p ** 2 / ry ** 2
+    if ratio > 1:
+        rx, ry = rx * math.sqrt(ratio), ry * math.sqrt(ratio)
+    num = rx ** 2 * ry ** 2 - rx ** 2 * y_p ** 2 - ry ** 2 * x_p ** 2
+    den = rx ** 2 * y_p ** 2 + ry ** 2 * x_p ** 2
+    coef = math.sqrt(max(num, 0) / den) if den else 0.0
+    if large_arc == sweep:
+        coef = -coef
+    cx_p, cy_p = coef * rx * y_p / ry, -coef * ry * x_p / rx
+    cx = cos_phi * cx_p - sin_phi * cy_p + (x0 + x1) / 2
+    cy = sin_phi * cx_p + cos_phi * cy_p + (y0 + y1) / 2
+
+    theta = math.atan2((y_p - cy_p) / ry, (x_p - cx_p) / rx)
+    end = math.atan2((-y_p - cy_p) / ry, (-x_p - cx_p) / rx)
+    dtheta = end - theta
+    if sweep and dtheta < 0:
+        dtheta += 2 * math.pi
+    elif not sweep and dtheta > 0:
+        dtheta -= 2 * math.pi
+    return cx, cy, rx, ry, phi, theta, dtheta
+
+
+class _Builder:
+    """Records the segments of the elements of one file."""
+
+    def __init__(self, segments: _Segments):
+        self.segments = segments
+        self.matrix_id = -1
+
+    def ellipse_arc(self, cx, cy, rx, ry, phi, theta, dtheta) -> None:
+        """Arc of the ellipse centered on (cx, cy), rotated by phi, from theta over dtheta."""
+        cos_phi, sin_phi = math.cos(phi), math.sin(phi)
+        self.segments.add(_ARC, self.matrix_id, cx, cy, cos_phi * rx, -sin_phi * ry, sin_phi * rx, cos_phi * ry,
+                          theta, dtheta)
+
+    def element(self, element: ET.Element, parent: np.ndarray) -> None:
+        tag = element.tag.removeprefix(SVG_NS)
+        if tag in _SKIPPED_TAGS:
+            return
+        transform = element.get("transform")
+        matrix = parent @ parse_transform(transform) if transform else parent
+        if transform or self.matrix_id < 0:
+            self.matrix_id = self.segments.add_matrix(matrix)
+        add, matrix_id, get = self.segments.add, self.matrix_id, element.get
+
+        if tag == "line":
+            add(_MOVE, matrix_id, _length(get("x1")), _length(get("y1")))
+            add(_LINE, matrix_id, _length(get("x2")), _length(get("y2")))
+        elif tag == "rect":
+            self.rect(_length(get("x")), _length(get("y")), _length(get("width")), _length(get("height")),
+                      get("rx"), get("ry"))
+        elif tag in ("circle", "ellipse"):
+            cx, cy = _length(get("cx")), _length(get("cy"))
+            rx = _length(get("r") if tag == "circle" else get("rx"))
+            ry = _length(get("r") if tag == "circle" else get("ry"))
+            if rx > 0 and ry > 0:
+                add(_MOVE, matrix_id, cx + rx, cy)
+                self.ellipse_arc(cx, cy, rx, ry, 0.0, 0.0, 2 * math.pi)
+        elif tag in ("polyline", "polygon"):
+            coords = [float(x) for x in _NUMBER.findall(get("points", ""))]
+            if len(coords) >= 4:
+                add(_MOVE, matrix_id, coords[0], coords[1])
+                for i in range(2, len(coords) - 1, 2):
+                    add(_LINE, matrix_id, coords[i], coords[i + 1])
+                if tag == "polygon":
+                    add(_LINE, matrix_id, coords[0], coords[1])
+        elif tag == "path":
+            self.path(get("d", ""))
+
+        for child in element:
+            self.element(child, matrix)
+        if transform:
+            # Back to the transform of the parent for the following siblings
+            self.matrix_id = self.segments.add_matrix(parent)
+
+    def rect(self, x, y, width, height, rx_attr, ry_attr) -> None:
+        if width <= 0 or height <= 0:
+            return
+        add, matrix_id = self.segments.add, self.matrix_id
+        rx = _length(rx_attr, -1.0)
+        ry = _length(ry_attr, -1.0)
+        if rx < 0:
+            rx = max(ry, 0.0)
+        if ry < 0:
+            ry = rx
+        rx, ry = min(rx, width / 2), min(ry, height / 2)
+        if rx == 0 or ry == 0:
+            add(_MOVE, matrix_id, x, y)
+            for px, py in ((x + width, y), (x + width, y + height), (x, y + height), (x, y)):
+                add(_LINE, matrix_id, px, py)
+            return
+        half_pi = math.pi / 2
+        add(_MOVE, matrix_id, x + rx, y)
+        add(_LINE, matrix_id, x + width - rx, y)
+        self.ellipse_arc(x + width - rx, y + ry, rx, ry, 0.0, -half_pi, half_pi)
+        add(_LINE, matrix_id, x + width, y + height - ry)
+        self.ellipse_arc(x + width - rx, y + height - ry, rx, ry, 0.0, 0.0, half_pi)
+        add(_LINE, matrix_id, x + rx, y + height)
+        self.ellipse_arc(x + rx, y + height - ry, rx, ry, 0.0, half_pi, half_pi)
+        add(_LINE, matrix_id, x, y + ry)
+        self.ellipse_arc(x + rx, y + ry, rx, ry, 0.0, math.pi, half_pi)
+
+    def path(self, d: str) -> None:
+        add, matrix_id = self.segments.add, self.matrix_id
+        tokens = _PATH_TOKEN.findall(d)
+        x = y = start_x = start_y = 0.0
+        # Last control point, for the S and T shorthands
+        control_x = control_y = 0.0
+        previous = ""
+        command = ""
+        i = 0
+        while i < len(tokens):
+            if tokens[i][0].isalpha():
+                command = tokens[i]
+                i += 1
+            elif not command or command in "Zz":
+                raise ValueError(f"Expected a command before {tokens[i]!r} in: {d[:80]}")
+            upper = command.upper()
+            if upper not in _PATH_ARITY:
+                raise ValueError(f"Unsupported path command {command!r} in: {d[:80]}")
+            ox, oy = (x, y) if command.islower() else (0.0, 0.0)
+
+            if upper == "A":
+                rx, ry, angle = float(tokens[i]), float(tokens[i + 1]), float(tokens[i + 2])
+                large_arc, i = _arc_flag(tokens, i + 3)
+                sweep, i = _arc_flag(tokens, i)
+                x1, y1 = ox + float(tokens[i]), oy + float(tokens[i + 1])
+                i += 2
+                if (x1, y1) != (x, y):
+                    arc = _arc_to_center(x, y, rx, ry, angle, large_arc, sweep, x1, y1)
+                    if arc is None:
+                        add(_LINE, matrix_id, x1, y1)
+                    else:
+                        self.ellipse_arc(*arc)
+                x, y = x1, y1
+                previous = command
+                continue
+
+            arity = _PATH_ARITY[upper]
+            v = [float(t) for t in tokens[i:i + arity]]
+            if len(v) < arity:
+                raise ValueError(f"Missing arguments for {command!r} in: {d[:80]}")
+            i += arity
+
+            if upper == "M":
+                x, y = start_x, start_y = ox + v[0], oy + v[1]
+                add(_MOVE, matrix_id, x, y)
+                # Following coordinate pairs are implicit line-to commands
+                command = "l" if command == "m" else "L"
+            elif upper == "L":
+                x, y = ox + v[0], oy + v[1]
+                add(_LINE, matrix_id, x, y)
+            elif upper == "H":
+                x = ox + v[0]
+                add(_LINE, matrix_id, x, y)
+            elif upper == "V":
+                y = oy + v[0]
+                add(_LINE, matrix_id, x, y)
+            elif upper in "CS":
+                if upper == "C":
+                    x1, y1 = ox + v[0], oy + v[1]
+                    v = v[2:]
+                elif previous.upper() in ("C", "S"):
+                    x1, y1 = 2 * x - control_x, 2 * y - control_y
+                else:
+                    x1, y1 = x, y
+                control_x, control_y = ox + v[0], oy + v[1]
+                x3, y3 = ox + v[2], oy + v[3]
+                add(_CUBIC, matrix_id, x, y, x1, y1, control_x, control_y, x3, y3)
+                x, y = x3, y3
+            elif upper in "QT":
+                if upper == "Q":
+                    control_x, control_y = ox + v[0], oy + v[1]
+                    v = v[2:]
+                elif previous.upper() in ("Q", "T"):
+                    control_x, control_y = 2 * x - control_x, 2 * y - control_y
+                else:
+                    control_x, control_y = x, y
+                x2, y2 = ox + v[0], oy + v[1]
+                add(_QUAD, matrix_id, x, y, control_x, control_y, x2, y2)
+                x, y = x2, y2
+            else:  # Z
+                if (x, y) != (start_x, start_y):
+                    add(_LINE, matrix_id, start_x, start_y)
+                x, y = start_x, start_y
+            previous = command
+
+
+def parse_svg(source: str | Path | bytes, segments: _Segments) -> None:
+    """Record the strokes of one SVG file (path or content) as a new target."""
+    root = ET.fromstring(source) if isinstance(source, bytes) else ET.parse(source).getroot()
+    segments.target_starts.append(len(segments.stroke_starts))
+    _Builder(segments).element(root, _root_transform(root))
+
+
+def _wang_segments(control: np.ndarray, tolerance: float) -> np.ndarray:
+    """Number of line segments flattening each Bézier curve within the tolerance.
+
+    Wang's formula: n = sqrt(d (d - 1) / 8 * max |P[i] - 2 P[i+1] + P[i+2]| / tolerance).
+    """
+    degree = control.shape[1] - 1
+    second = control[:, :-2] - 2 * control[:, 1:-1] + control[:, 2:]
+    bound = np.linalg.norm(second, axis=2).max(axis=1, initial=0.0)
+    n = np.ceil(np.sqrt(degree * (degree - 1) / 8 * bound / tolerance))
+    return np.clip(n, 1, MAX_SEGMENT_POINTS).astype(np.int64)
+
+
+def _arc_segments(axes: np.ndarray, dtheta: np.ndarray, tolerance: float) -> np.ndarray:
+    """Number of chords keeping each arc within the tolerance of the true ellipse."""
+    radius = np.linalg.norm(axes, ord=2, axis=(1, 2)) if len(axes) else np.zeros(0)
+    ratio = np.clip(1 - tolerance / np.maximum(radius, tolerance), -1.0, 1.0)
+    step = 2 * np.arccos(ratio)
+    n = np.ceil(np.abs(dtheta) / np.maximum(step, 1e-9))
+    return np.clip(n, 1, MAX_SEGMENT_POINTS).astype(np.int64)
+
+
+def _sample_index(counts: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """For every output point: the segment it belongs to and its rank j in 1..n."""
+    segment = np.repeat(np.arange(len(counts)), counts)
+    starts = np.cumsum(counts) - counts
+    rank = np.arange(counts.sum()) - np.repeat(starts, counts) + 1
+    return segment, rank
+
+
+def flatten(segments: _Segments, names: list[str], tolerance: float = DEFAULT_TOLERANCE_MM) -> StrokeSet:
+    """Transform and flatten every recorded segment into polylines, one vectorized pass per kind."""
+    kinds = np.asarray(segments.kinds, dtype=np.int64)
+    matrix_ids = np.asarray(segments.matrix_ids, dtype=np.int64)
+    matrices = np.asarray(segments.matrices, dtype=np.float64).reshape(-1, 3, 3)
+
+    # Control points of each kind, in millimetres on the sheet
+    params = {}
+    for kind, size in _PARAM_SIZES.items():
+        values = np.asarray(segments.params[kind], dtype=np.float64).reshape(-1, size)
+        m = matrices[matrix_ids[kinds == kind]]
+        if kind == _ARC:
+            center = np.einsum("nij,nj->ni", m[:, :2, :2], values[:, :2]) + m[:, :2, 2]
+            axes = m[:, :2, :2] @ values[:, 2:6].reshape(-1, 2, 2)
+            params[kind] = (center, axes, values[:, 6], values[:, 7])
+        else:
+            points = values.reshape(len(values), size // 2, 2)
+            params[kind] = np.einsum("nij,nkj->nki", m[:, :2, :2], points) + m[:, None, :2, 2]
+
+    counts = np.ones(len(kinds), dtype=np.int64)
+    per_kind = {
+        _QUAD: _wang_segments(params[_QUAD], tolerance),
+        _CUBIC: _wang_segments(params[_CUBIC], tolerance),
+        _ARC: _arc_segments(params[_ARC][1], params[_ARC][3], tolerance),
+    }
+    for kind, n in per_kind.items():
+        counts[kinds == kind] = n
+    offsets = np.cumsum(counts) - counts
+    points = np.empty((int(counts.sum()), 2), dtype=np.float64)
+
+    for kind in (_MOVE, _LINE):
+        points[offsets[kinds == kind]] = params[kind][:, 0]
+
+    for kind, n in per_kind.items():
+        if len(n) == 0:
+            continue
+        segment, rank = _sample_index(n)
+        t = (rank / n[segment])[:, None]
+        dest = offsets[kinds == kind][segment] + rank - 1
+        if kind == _QUAD:
+            p = params[kind][segment]
+            points[dest] = (1 - t) ** 2 * p[:, 0] + 2 * (1 - t) * t * p[:, 1] + t ** 2 * p[:, 2]
+        elif kind == _CUBIC:
+            p = params[kind][segment]
+            points[dest] = ((1 - t) ** 3 * p[:, 0] + 3 * (1 - t) ** 2 * t * p[:, 1]
+                            + 3 * (1 - t) * t ** 2 * p[:, 2] + t ** 3 * p[:, 3])
+        else:
+            center, axes, theta, dtheta = params[kind]
+            angle = theta[segment] + dtheta[segment] * t[:, 0]
+            unit = np.stack([np.cos(angle), np.sin(angle)], axis=1)
+            points[dest] = center[segment] + np.einsum("nij,nj->ni", axes[segment], unit)
+
+    stroke_offsets = np.append(offsets[segments.stroke_starts], len(points)).astype(np.int64)
+    target_offsets = np.append(segments.target_starts, len(segments.stroke_starts)).astype(np.int64)
+    return StrokeSet(points.astype(np.float32), stroke_offsets, target_offsets, list(names))
+
+
+def compile_svgs(
+    paths: list[str | Path], names: list[str] | None = None, tolerance: float = DEFAULT_TOLERANCE_MM
+) -> StrokeSet:
+    """Compile SVG files into a single StrokeSet, one target per file.
+
+    Args:
+        paths: SVG files to compile.
+        names: Target names (default: the file stems).
+        tolerance: Maximum distance between a curve and its polyline, in millimetres.
+    """
+    if tolerance <= 0:
+        raise ValueError(f"`tolerance` must be positive, but {tolerance} is provided.")
+    segments = _Segments()
+    for path in paths:
+        try:
+            parse_svg(path, segments)
+        except (ET.ParseError, ValueError, IndexError) as e:
+            raise ValueError(f"Failed to compile {path}: {e}") from e
+    names = [Path(p).stem for p in paths] if names is None else names
+    return flatten(segments, names, tolerance)
+
+
+def compile_tree(root: str | Path, tolerance: float = DEFAULT_TOLERANCE_MM) -> StrokeSet:
+    """Compile every root/<shape>/*.svg file, named "<shape>/<stem>"."""
+    root = Path(root)
+    paths = sorted(root.glob("*/*.svg"))
+    names = [p.relative_to(root).with_suffix("").as_posix() for p in paths]
+    return compile_svgs(paths, names, tolerance)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("root", help="directory of svg/<shape>/*.svg targets")
+    parser.add_argument("output", help="stroke set directory to write")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE_MM,
+                        help="maximum deviation from the curves, in millimetres (default: %(default)s)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    stroke_set = compile_tree(args.root, args.tolerance)
+    stroke_set.save(args.output)
+    print(f"{len(stroke_set)} targets, {stroke_set.n_strokes} strokes, {len(stroke_set.points)} points "
+          f"compiled in {time.perf_counter() - start:.1f} s -> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
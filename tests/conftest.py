@@ -0,0 +1,7 @@
+import os
+import sys
+
+# The calibration and training scripts import their neighbours by bare name
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for directory in ("callibration_a5", "training", ""):
+    sys.path.insert(0, os.path.join(ROOT, directory))
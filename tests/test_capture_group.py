@@ -0,0 +1,182 @@
+import queue
+import time
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from cameras import capture_group
+from cameras.capture_group import CaptureGroup, GroupedCamera
+
+
+class FakeClock:
+    """Stands for time.perf_counter() in capture_group: frames get the capture time the test sets."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def perf_counter(self):
+        return self.now
+
+
+class FakeCamera:
+    """Camera whose read() blocks until the test feeds a frame, like a device waiting for the next one."""
+
+    def __init__(self, name):
+        self.name = name
+        self.config = SimpleNamespace(fps=30, width=2, height=2, color_mode=None)
+        self.frames = queue.Queue()
+        self.is_connected = False
+        self.connects = self.disconnects = 0
+        self.released = False
+
+    def connect(self):
+        self.is_connected = True
+        self.connects += 1
+
+    def disconnect(self):
+        self.is_connected = False
+        self.disconnects += 1
+
+    def read(self):
+        while True:
+            try:
+                return self.frames.get(timeout=0.005)
+            except queue.Empty:
+                if self.released:
+                    raise RuntimeError("released")
+
+    def async_read(self):
+        return self.read()
+
+
+class StaticTarget(FakeCamera):
+    def async_read(self):
+        return np.full((2, 2, 3), 255, dtype=np.uint8)
+
+
+def frame(value):
+    return np.full((2, 2, 3), value, dtype=np.uint8)
+
+
+@pytest.fixture
+def group(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(capture_group, "time", SimpleNamespace(perf_counter=clock.perf_counter))
+    cameras = {"front": FakeCamera("front"), "top": FakeCamera("top"), "target": StaticTarget("target")}
+    group = CaptureGroup(cameras, static=["target"], stale_after_s=0.1)
+    group.connect(warmup=False)
+    group.clock = clock
+    yield group
+    for camera in cameras.values():
+        camera.released = True
+    group.disconnect()
+
+
+def feed(group, name, t, value):
+    """Deliver a frame captured at time t to a camera, and wait for its capture thread to buffer it."""
+    capture = group._captures[name]
+    count = capture.frame_count
+    group.clock.now = t
+    group.cameras[name].frames.put(frame(value))
+    deadline = time.monotonic() + 5
+    while capture.frame_count == count:
+        assert time.monotonic() < deadline, f"{name} never captured its frame"
+        time.sleep(0.001)
+
+
+def test_frames_are_aligned_on_the_camera_furthest_behind(group):
+    feed(group, "front", 0.000, 0)
+    feed(group, "top", 0.010, 10)
+    feed(group, "front", 0.033, 33)
+    feed(group, "top", 0.043, 43)
+    feed(group, "front", 0.066, 66)
+
+    frame_set = group.read_aligned()
+    # top's latest frame is the oldest: front's frame closest to it is the one of t=0.033, not its latest
+    assert frame_set.reference == pytest.approx(0.043)
+    assert frame_set.frames["top"][0, 0, 0] == 43
+    assert frame_set.frames["front"][0, 0, 0] == 33
+    assert frame_set.timestamps == pytest.approx({"front": 0.033, "top": 0.043})
+    assert frame_set.skew_s == pytest.approx(0.010)
+    assert frame_set.stale == []
+    # Static cameras are read when the set is built, without a capture time
+    assert frame_set.frames["target"][0, 0, 0] == 255
+    assert "target" not in frame_set.timestamps
+
+
+def test_stale_camera_does_not_hold_the_others_back(group):
+    feed(group, "front", 0.000, 0)
+    feed(group, "top", 0.010, 10)
+    # top stalls while front keeps delivering
+    for i, t in enumerate((0.033, 0.066, 0.100, 0.133)):
+        feed(group, "front", t, i + 1)
+
+    frame_set = group.read_aligned()
+    assert frame_set.stale == ["top"]
+    assert frame_set.reference == pytest.approx(0.133)
+    assert frame_set.frames["front"][0, 0, 0] == 4
+    # The stale camera still returns its latest frame
+    assert frame_set.frames["top"][0, 0, 0] == 10
+    assert frame_set.skew_s == 0.0
+
+    feed(group, "top", 0.140, 140)
+    assert group.read_aligned().stale == []
+
+
+def test_grouped_cameras_share_one_set_per_tick(group):
+    robot = SimpleNamespace(cameras=dict(group.cameras))
+    group.install(robot)
+    assert all(isinstance(camera, GroupedCamera) for camera in robot.cameras.values())
+    feed(group, "front", 0.000, 1)
+    feed(group, "top", 0.001, 2)
+
+    assert robot.cameras["front"].async_read()[0, 0, 0] == 1
+    feed(group, "front", 0.033, 3)
+    feed(group, "top", 0.034, 4)
+    # Same tick: top comes from the set built when front was read
+    assert robot.cameras["top"].async_read()[0, 0, 0] == 2
+    # front read again: next tick, new set
+    assert robot.cameras["front"].async_read()[0, 0, 0] == 3
+    assert robot.cameras["top"].async_read()[0, 0, 0] == 4
+
+
+def test_disconnect_stops_the_threads_and_every_camera(group):
+    robot = SimpleNamespace(cameras=dict(group.cameras))
+    cameras = dict(group.cameras)
+    group.install(robot)
+    threads = [capture._thread for capture in group._captures.values()]
+    assert all(thread.is_alive() for thread in threads)
+    assert all(camera.is_connected for camera in robot.cameras.values())
+
+    for camera in cameras.values():
+        camera.released = True
+    # The robot disconnects its cameras one after the other: the first one stops the group
+    for camera in robot.cameras.values():
+        camera.disconnect()
+    assert not group.is_connected
+    assert not any(thread.is_alive() for thread in threads)
+    assert all(camera.disconnects == 1 for camera in cameras.values())
+    assert not any(camera.is_connected for camera in robot.cameras.values())
+    with pytest.raises(RuntimeError, match="not connected"):
+        group.read_aligned()
+
+
+def test_capture_error_is_raised_on_read(group):
+    group.cameras["front"].released = True  # its next read() raises
+    deadline = time.monotonic() + 5
+    while group._captures["front"].error is None:
+        assert time.monotonic() < deadline
+        time.sleep(0.001)
+    with pytest.raises(RuntimeError, match="Capture failed for camera 'front'"):
+        group.read_aligned()
+
+
+def test_connect_times_out_without_frames():
+    cameras = {"front": FakeCamera("front")}
+    group = CaptureGroup(cameras)
+    with pytest.raises(TimeoutError, match="front"):
+        group.connect(timeout_s=0.05)
+    cameras["front"].released = True
+    group.disconnect()
+    assert not cameras["front"].is_connected
@@ -0,0 +1,41 @@
+import copy
+
+import torch
+from lerobot.configs.types import FeatureType, PolicyFeature
+from lerobot.policies.act.configuration_act import ACTConfig
+from lerobot.policies.act.modeling_act import ACTPolicy
+from torch import nn
+
+from cpu_runtime import check_accuracy, optimize_for_cpu
+
+
+def make_policy():
+    torch.manual_seed(0)
+    config = ACTConfig(
+        input_features={"observation.state": PolicyFeature(FeatureType.STATE, (6,)),
+                        "observation.images.target": PolicyFeature(FeatureType.VISUAL, (3, 96, 128))},
+        output_features={"action": PolicyFeature(FeatureType.ACTION, (6,))},
+        device="cpu", pretrained_backbone_weights=None,
+    )
+    stats = {"observation.state": {"mean": torch.zeros(6), "std": torch.ones(6)},
+             "action": {"mean": torch.zeros(6), "std": torch.ones(6)},
+             "observation.images.target": {"mean": torch.zeros(3, 1, 1), "std": torch.ones(3, 1, 1)}}
+    return ACTPolicy(config, dataset_stats=stats).eval()
+
+
+def test_every_transformer_linear_and_the_action_head_are_int8():
+    policy = optimize_for_cpu(make_policy(), threads=1)
+    model = policy.model
+    for name in ("encoder", "decoder", "action_head"):
+        module = getattr(model, name)
+        assert not [n for n, m in module.named_modules() if type(m) is nn.Linear], name
+    assert isinstance(model.action_head, torch.ao.nn.quantized.dynamic.Linear)
+
+
+def test_optimized_actions_stay_within_tolerance():
+    reference = make_policy()
+    optimized = optimize_for_cpu(copy.deepcopy(reference), threads=1)
+    batches = [{"observation.state": torch.randn(1, 6), "observation.images.target": torch.rand(1, 3, 96, 128)}
+               for _ in range(3)]
+    result = check_accuracy(reference, optimized, batches)
+    assert result["ok"], result
@@ -0,0 +1,110 @@
+import filecmp
+import json
+
+import numpy as np
+import pytest
+from lerobot.datasets.lerobot_dataset import LeRobotDataset
+
+import episode_pipeline
+from episode_pipeline import EpisodePipeline, MirrorTarget, UploadQueue
+
+FEATURES = {
+    "observation.state": {"dtype": "float32", "shape": (6,), "names": None},
+    "action": {"dtype": "float32", "shape": (6,), "names": None},
+    "observation.images.front": {"dtype": "video", "shape": (48, 64, 3), "names": ["height", "width", "channels"]},
+}
+FRAMES_PER_EPISODE = 5
+
+
+class FlakyMirror(MirrorTarget):
+    """Mirror recording the uploaded paths, failing once `fail_after` batches went through."""
+
+    def __init__(self, directory, fail_after=None):
+        super().__init__(directory)
+        self.fail_after = fail_after
+        self.paths = []
+        self.finalized = 0
+
+    def upload(self, root, paths):
+        if self.fail_after is not None and len(self.paths) >= self.fail_after:
+            raise ConnectionError("network down")
+        super().upload(root, paths)
+        self.paths += paths
+
+    def finalize(self, root):
+        self.finalized += 1
+
+
+@pytest.fixture
+def dataset(tmp_path):
+    return LeRobotDataset.create("test/pipeline", fps=10, root=tmp_path / "dataset", features=FEATURES)
+
+
+def record_episodes(dataset, pipeline, count):
+    rng = np.random.default_rng(0)
+    for _ in range(count):
+        for _ in range(FRAMES_PER_EPISODE):
+            dataset.add_frame({
+                "observation.state": rng.random(6, dtype=np.float32),
+                "action": rng.random(6, dtype=np.float32),
+                "observation.images.front": rng.integers(0, 255, (48, 64, 3), dtype=np.uint8),
+            }, task="Draw the image")
+        pipeline.save_episode()
+
+
+def dataset_files(root):
+    return sorted(p.relative_to(root).as_posix() for p in root.rglob("*")
+                  if p.is_file() and p.relative_to(root).parts[0] != "images")
+
+
+def assert_mirrored(root, mirror):
+    assert dataset_files(mirror) == dataset_files(root)
+    for rel_path in dataset_files(root):
+        assert filecmp.cmp(root / rel_path, mirror / rel_path, shallow=False), rel_path
+
+
+def test_saved_episodes_are_uploaded_to_the_mirror(dataset, tmp_path):
+    target = FlakyMirror(tmp_path / "mirror")
+    pipeline = EpisodePipeline(dataset, uploads=UploadQueue(dataset.root, target))
+    record_episodes(dataset, pipeline, 2)
+    pipeline.close()
+
+    assert_mirrored(dataset.root, target.directory)
+    assert target.finalized >= 1
+    mirrored = LeRobotDataset("test/pipeline", root=target.directory, video_backend="pyav")
+    assert mirrored.meta.total_episodes == 2
+    assert len(mirrored) == 2 * FRAMES_PER_EPISODE
+
+
+def test_interrupted_upload_resumes_from_the_journal(dataset, tmp_path, monkeypatch):
+    monkeypatch.setattr(episode_pipeline, "BATCH_FILES", 1)
+    monkeypatch.setattr(episode_pipeline, "RETRIES", 1)
+    mirror = tmp_path / "mirror"
+
+    # The connection drops after two files
+    flaky = FlakyMirror(mirror, fail_after=2)
+    pipeline = EpisodePipeline(dataset, uploads=UploadQueue(dataset.root, flaky))
+    record_episodes(dataset, pipeline, 1)
+    pipeline.close()
+    assert isinstance(pipeline.uploads.error, ConnectionError)
+    assert len(flaky.paths) == 2
+    assert not any(p.startswith("meta/") for p in flaky.paths)
+    with open(pipeline.uploads.journal_path) as f:
+        assert [json.loads(line)["path"] for line in f] == flaky.paths
+
+    # Next run: only the files missing from the journal are sent
+    target = FlakyMirror(mirror)
+    uploads = UploadQueue(dataset.root, target)
+    uploads.close()
+    assert uploads.error is None
+    assert set(target.paths).isdisjoint(flaky.paths)
+    assert sorted(target.paths + flaky.paths) == dataset_files(dataset.root)
+    assert_mirrored(dataset.root, mirror)
+
+    # A file changed since its upload is sent again, and only that one
+    target = FlakyMirror(mirror)
+    uploads = UploadQueue(dataset.root, target)
+    info = dataset.root / "meta" / "info.json"
+    info.write_text(info.read_text())
+    uploads.close()
+    assert target.paths == ["meta/info.json"]
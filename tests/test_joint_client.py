@@ -0,0 +1,145 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+import joint_client
+import mock_server
+from joint_client import GRIPPER_JOINT, AsyncJointClient, JointClient
+from mock_server import INIT_ANGLES, start_mock_server
+
+CENTER = [0.0, 1.2, 0.0, -1.0, -1.57, -1.1]
+TOP_RIGHT = [-0.36, 1.8, -1.15, -0.46, -1.57, -1.1]
+
+
+@pytest.fixture
+def mock():
+    server, robot = start_mock_server()
+    client = JointClient(f"http://127.0.0.1:{server.server_port}")
+    yield client, robot
+    client.close()
+    server.shutdown()
+
+
+def test_move_to_waits_for_the_pose(mock):
+    client, robot = mock
+    client.move_to(TOP_RIGHT)
+    assert np.allclose(robot.position(), TOP_RIGHT, atol=0.02)
+
+
+def test_blocked_gripper_does_not_stop_the_move(mock):
+    client, robot = mock
+    # The gripper is closed on the pen and stays where it is
+    write = robot.write
+    robot.write = lambda angles: write(np.where(np.arange(6) == GRIPPER_JOINT, robot.position(), angles))
+    target = list(TOP_RIGHT)
+    target[GRIPPER_JOINT] = 0.5
+    client.move_to(target, timeout=2.0)
+    assert client.reached(target)
+
+
+def test_unreached_pose_is_reported_and_skipped(mock, capsys):
+    client, robot = mock
+    robot.write = lambda angles: None  # the arm does not move
+    client.move_to(TOP_RIGHT, timeout=0.2)
+    assert "Pose non atteinte" in capsys.readouterr().out
+    with pytest.raises(TimeoutError):
+        client.move_to(TOP_RIGHT, timeout=0.2, strict=True)
+
+
+def test_wait_until_settled_after_init(mock):
+    client, robot = mock
+    client.move_to(TOP_RIGHT)
+    client.init()
+    assert client.wait_until_settled()
+    assert np.allclose(robot.position(), INIT_ANGLES)
+
+
+def test_stream_bounds_the_requests_in_flight(mock, monkeypatch):
+    client, robot = mock
+    monkeypatch.setattr(mock_server, "LATENCY_S", 0.02)
+    trajectory = np.linspace(CENTER, TOP_RIGHT, 20)
+    responses = client.stream(trajectory, max_in_flight=3)
+    assert responses == [{"status": "ok"}] * 20
+    assert robot.writes == 20
+    assert 1 < robot.peak_in_flight <= 3
+
+
+def test_server_without_read_falls_back_to_a_fixed_wait(mock, monkeypatch, capsys):
+    client, robot = mock
+    monkeypatch.setattr(joint_client, "FALLBACK_SETTLE_S", 0.01)
+    robot.can_read = False
+    client.move_to(TOP_RIGHT)
+    assert client.can_read is False
+    assert "/joints/read indisponible" in capsys.readouterr().out
+    assert client.wait_until_settled()
+
+
+@pytest.fixture
+def async_mock():
+    server, robot = start_mock_server()
+    client = AsyncJointClient(f"http://127.0.0.1:{server.server_port}")
+    yield client, robot
+    client.client.close()
+    server.shutdown()
+
+
+def test_async_move_to_waits_for_the_pose(async_mock):
+    client, robot = async_mock
+    asyncio.run(client.move_to(TOP_RIGHT))
+    assert np.allclose(robot.position(), TOP_RIGHT, atol=0.02)
+    assert client.client.can_read is True
+
+
+def test_async_unreached_pose_is_reported(async_mock, capsys):
+    client, robot = async_mock
+    robot.write = lambda angles: None
+    assert not asyncio.run(client.wait_until_reached(TOP_RIGHT, timeout=0.2))
+    with pytest.raises(TimeoutError):
+        asyncio.run(client.move_to(TOP_RIGHT, timeout=0.2, strict=True))
+
+
+def test_async_wait_until_settled_does_not_block_the_loop(async_mock):
+    client, robot = async_mock
+
+    async def settle_while_ticking():
+        await client.move_to(TOP_RIGHT)
+        await client.init()
+        ticks = 0
+
+        async def tick():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        ticker = asyncio.create_task(tick())
+        settled = await client.wait_until_settled()
+        ticker.cancel()
+        return settled, ticks
+
+    settled, ticks = asyncio.run(settle_while_ticking())
+    assert settled
+    assert np.allclose(robot.position(), INIT_ANGLES)
+    # The loop kept running during the wait (the arm needs about half a second to get back)
+    assert ticks > 10
+
+
+def test_async_server_without_read_falls_back_to_a_fixed_wait(async_mock, monkeypatch, capsys):
+    client, robot = async_mock
+    monkeypatch.setattr(joint_client, "FALLBACK_SETTLE_S", 0.01)
+    robot.can_read = False
+    assert asyncio.run(client.wait_until_reached(TOP_RIGHT))
+    assert client.client.can_read is False
+    assert "/joints/read indisponible" in capsys.readouterr().out
+    assert asyncio.run(client.wait_until_settled())
+
+
+def test_async_stream_bounds_the_requests_in_flight(async_mock, monkeypatch):
+    client, robot = async_mock
+    monkeypatch.setattr(mock_server, "LATENCY_S", 0.02)
+    trajectory = np.linspace(CENTER, TOP_RIGHT, 20)
+    responses = asyncio.run(client.stream(trajectory, max_in_flight=3))
+    assert responses == [{"status": "ok"}] * 20
+    assert robot.writes == 20
+    assert 1 < robot.peak_in_flight <= 3
@@ -0,0 +1,95 @@
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+import loop_tracer
+from loop_tracer import EVENTS_FILE, META_FILE, LoopTracer, load_trace, summarize
+
+FPS = 30
+
+
+class FileSpy:
+    """events.bin whose writes record the thread they run on."""
+
+    def __init__(self, file):
+        self.file = file
+        self.threads = []
+
+    def write(self, data):
+        self.threads.append(threading.current_thread())
+        return self.file.write(data)
+
+    def __getattr__(self, name):
+        return getattr(self.file, name)
+
+
+def traced_loop(tmp_path):
+    tracer = LoopTracer(tmp_path / "trace", fps=FPS)
+    spy = FileSpy(tracer._file)
+    tracer._file = spy
+    loop = SimpleNamespace(busy_wait=lambda seconds: None, read=lambda: 0)
+    tracer.patch(loop, "busy_wait", "tick")
+    tracer.patch(loop, "read", "camera.front")
+    return tracer, spy, loop
+
+
+def run_ticks(loop, count):
+    for _ in range(count):
+        loop.read()
+        loop.busy_wait(1 / FPS - 0.005)
+
+
+def test_full_buffer_is_written_by_the_writer_thread(tmp_path, monkeypatch):
+    monkeypatch.setattr(loop_tracer, "FLUSH_EVENTS", 8)
+    tracer, spy, loop = traced_loop(tmp_path)
+    tracer.start_episode("circle/0")
+    run_ticks(loop, 10)
+    tracer._pending.join()
+    # Two full buffers of 8 events went to the writer thread, the last 4 events wait in memory
+    assert len(spy.threads) == 2
+    assert all(thread is tracer._writer for thread in spy.threads)
+    assert len(tracer._events) == 4
+    assert (tmp_path / "trace" / EVENTS_FILE).stat().st_size == 16 * loop_tracer.EVENT_DTYPE.itemsize
+
+    tracer.start_episode("circle/1")
+    run_ticks(loop, 3)
+    tracer.close()
+    meta, events = load_trace(tmp_path / "trace")
+    assert meta["episodes"] == ["circle/0", "circle/1"]
+    summary = summarize(meta, events)
+    assert summary["ticks"] == 13
+    assert summary["stages"]["camera.front"]["count"] == 13
+    assert summary["stages"]["tick"]["p50_ms"] == pytest.approx(5, abs=0.1)
+    assert not tracer._writer.is_alive()
+
+
+def test_trace_json_is_only_rewritten_between_episodes(tmp_path, monkeypatch):
+    monkeypatch.setattr(loop_tracer, "FLUSH_EVENTS", 8)
+    tracer, spy, loop = traced_loop(tmp_path)
+    replaced = []
+    monkeypatch.setattr(loop_tracer, "os", SimpleNamespace(replace=lambda src, dst: replaced.append(dst)))
+    tracer.start_episode("circle/0")
+    run_ticks(loop, 20)
+    tracer._pending.join()
+    assert replaced == [tmp_path / "trace" / META_FILE]
+    tracer.start_episode("circle/1")
+    assert len(replaced) == 2
+    monkeypatch.undo()
+    tracer.close()
+
+
+def test_writer_error_is_raised_on_flush(tmp_path, monkeypatch):
+    monkeypatch.setattr(loop_tracer, "FLUSH_EVENTS", 2)
+    tracer, spy, loop = traced_loop(tmp_path)
+
+    def fail(data):
+        raise OSError("disk full")
+
+    spy.write = fail
+    run_ticks(loop, 2)
+    with pytest.raises(OSError, match="disk full"):
+        tracer.flush()
+    with pytest.raises(OSError, match="disk full"):
+        tracer.close()
+    assert not tracer._writer.is_alive()
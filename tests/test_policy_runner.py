@@ -0,0 +1,133 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+import torch
+
+from policy_runner import PipelinedPolicy
+
+N_ACTION_STEPS = 10
+
+
+class StubPolicy:
+    """Action-chunking policy whose chunk for the observation of tick t is t, t+1, ...
+
+    predict_action_chunk() blocks while `gate` is cleared, so that a test decides
+    how many control ticks the forward pass lasts.
+    """
+
+    def __init__(self):
+        self.config = SimpleNamespace(n_action_steps=N_ACTION_STEPS, temporal_ensemble_coeff=None)
+        self.gate = threading.Event()
+        self.gate.set()
+        self.requested_ticks = []
+        self.error = None
+        self.resets = 0
+
+    def predict_action_chunk(self, batch):
+        self.requested_ticks.append(int(batch["tick"]))
+        self.gate.wait(timeout=5)
+        if self.error is not None:
+            raise self.error
+        return batch["tick"].reshape(1, 1, 1).float() + torch.arange(N_ACTION_STEPS)[None, :, None]
+
+    def reset(self):
+        self.resets += 1
+
+
+@pytest.fixture
+def runner():
+    policy = PipelinedPolicy(StubPolicy(), fps=30, margin_ticks=4)
+    # A forward pass measured at one tick: the next chunk is requested with 5 actions left
+    policy._forward_ticks = lambda: 1
+    yield policy
+    policy.policy.gate.set()
+    policy.close()
+
+
+def step(runner, tick):
+    return int(runner.select_action({"tick": torch.tensor([tick])}))
+
+
+def wait_until(condition):
+    deadline = time.monotonic() + 5
+    while not condition():
+        assert time.monotonic() < deadline, "the worker never got there"
+        time.sleep(0.001)
+
+
+def wait_for_result(runner):
+    wait_until(lambda: not runner._results.empty())
+
+
+def test_late_chunk_drops_the_elapsed_ticks(runner):
+    assert step(runner, 0) == 0  # first chunk, awaited
+    runner.policy.gate.clear()
+    for tick in range(1, 8):
+        assert step(runner, tick) == tick
+    # The next chunk was requested at tick 5, with 5 actions left, and is still running
+    wait_until(lambda: len(runner.policy.requested_ticks) == 2)
+    assert runner.policy.requested_ticks == [0, 5]
+
+    runner.policy.gate.set()
+    wait_for_result(runner)
+    # It arrives at tick 8: its actions for ticks 5, 6 and 7 are already past
+    assert step(runner, 8) == 8
+    assert runner.dropped_actions == 3
+    assert runner.misses == 0
+    # Whenever the following chunks arrive, the action returned is the one for the tick
+    for tick in range(9, 40):
+        assert step(runner, tick) == tick
+
+
+def test_tick_waiting_for_the_worker_is_a_miss(runner):
+    assert step(runner, 0) == 0
+    runner.policy.gate.clear()
+    for tick in range(1, 10):
+        assert step(runner, tick) == tick
+    assert runner.misses == 0
+
+    # No action left at tick 10: the tick blocks until the forward pass ends
+    threading.Timer(0.05, runner.policy.gate.set).start()
+    assert step(runner, 10) == 10
+    assert runner.misses == 1
+    assert runner.wait_time >= 0.04
+    assert runner.dropped_actions == 5
+
+
+def test_reset_discards_the_chunk_in_flight(runner):
+    assert step(runner, 0) == 0
+    runner.policy.gate.clear()
+    for tick in range(1, 6):
+        step(runner, tick)
+    wait_until(lambda: len(runner.policy.requested_ticks) == 2)
+    assert runner.policy.requested_ticks == [0, 5]
+
+    runner.reset()
+    assert runner.policy.resets == 1
+    runner.policy.gate.set()
+    wait_for_result(runner)
+    # New episode: the chunk requested before reset() is ignored, a new one is awaited
+    assert step(runner, 100) == 100
+    assert runner.policy.requested_ticks == [0, 5, 100]
+    assert step(runner, 101) == 101
+    assert runner.misses == 0
+
+
+def test_worker_error_is_raised_in_the_control_loop(runner):
+    runner.policy.error = RuntimeError("forward failed")
+    with pytest.raises(RuntimeError, match="forward failed"):
+        step(runner, 0)
+
+
+def test_temporal_ensemble_runs_in_the_loop():
+    stub = StubPolicy()
+    stub.config.temporal_ensemble_coeff = 0.01
+    stub.select_action = lambda batch: batch["tick"] * 2
+    policy = PipelinedPolicy(stub)
+    try:
+        assert step(policy, 21) == 42
+        assert stub.requested_ticks == []
+    finally:
+        policy.close()
@@ -0,0 +1,102 @@
+import numpy as np
+import pytest
+import torch
+from lerobot.datasets.lerobot_dataset import LeRobotDataset
+
+from episode_pipeline import EpisodePipeline
+from static_features import (StaticFeatureDataset, StaticFeatureWriter, load_static_features,
+                             split_static_features)
+
+TARGET = "observation.images.target"
+IMAGE_SHAPE = (48, 64, 3)
+FEATURES = {
+    "observation.state": {"dtype": "float32", "shape": (6,), "names": None},
+    "action": {"dtype": "float32", "shape": (6,), "names": None},
+    "observation.images.front": {"dtype": "video", "shape": IMAGE_SHAPE, "names": ["height", "width", "channels"]},
+    TARGET: {"dtype": "video", "shape": IMAGE_SHAPE, "names": ["height", "width", "channels"]},
+}
+LENGTHS = [4, 3, 5]
+
+
+class FakeCamera:
+    """Target camera showing the image set for the episode (RGB, HWC uint8)."""
+
+    def __init__(self):
+        self.image = None
+
+    def read(self):
+        return self.image
+
+
+def targets():
+    rng = np.random.default_rng(0)
+    first = rng.integers(0, 256, IMAGE_SHAPE, dtype=np.uint8)
+    second = rng.integers(0, 256, IMAGE_SHAPE, dtype=np.uint8)
+    # The third episode shows the first target again
+    return [first, second, first]
+
+
+def add_frames(dataset, length):
+    rng = np.random.default_rng(length)
+    for _ in range(length):
+        dataset.add_frame({
+            "observation.state": rng.random(6, dtype=np.float32),
+            "action": rng.random(6, dtype=np.float32),
+            "observation.images.front": rng.integers(0, 256, IMAGE_SHAPE, dtype=np.uint8),
+        }, task="Draw the image")
+
+
+@pytest.fixture
+def recording(tmp_path):
+    dataset_features, static = split_static_features(FEATURES, [TARGET])
+    assert TARGET not in dataset_features and list(static) == [TARGET]
+    dataset = LeRobotDataset.create("test/static", fps=10, root=tmp_path / "dataset", features=dataset_features)
+    camera = FakeCamera()
+    return dataset, camera, StaticFeatureWriter(dataset, {TARGET: camera}, static)
+
+
+def check_round_trip(root, images):
+    loaded = StaticFeatureDataset(LeRobotDataset("test/static", root=root, video_backend="pyav"))
+    assert tuple(loaded.meta.features[TARGET]["shape"]) == IMAGE_SHAPE
+    assert TARGET in loaded.meta.camera_keys
+    assert loaded.meta.stats[TARGET]["mean"].shape == (3, 1, 1)
+    assert len(loaded) == sum(LENGTHS)
+
+    for idx in range(len(loaded)):
+        item = loaded[idx]
+        episode = int(item["episode_index"])
+        expected = torch.from_numpy(images[episode]).permute(2, 0, 1).float() / 255
+        # Same key and CHW float layout as the decoded video cameras, stored losslessly
+        assert item[TARGET].shape == item["observation.images.front"].shape
+        assert torch.equal(item[TARGET], expected)
+
+
+def test_saved_episodes_serve_the_target_under_its_key(recording):
+    dataset, camera, writer = recording
+    images = targets()
+    digests = []
+    for image, length in zip(images, LENGTHS):
+        camera.image = image
+        add_frames(dataset, length)
+        digests.append(writer.save_episode())
+
+    # The repeated target is stored once
+    assert digests[0] == digests[2] != digests[1]
+    info, index = load_static_features(dataset.root)
+    assert sorted(index) == [0, 1, 2]
+    assert info["sums"][TARGET]["count"] == sum(LENGTHS)
+    check_round_trip(dataset.root, images)
+
+
+def test_background_saves_capture_the_target_of_their_episode(recording):
+    dataset, camera, writer = recording
+    images = targets()
+    pipeline = EpisodePipeline(dataset, static_writer=writer)
+    for image, length in zip(images, LENGTHS):
+        camera.image = image
+        add_frames(dataset, length)
+        pipeline.save_episode()
+        # The next episode's target is shown while this one is still being saved
+        camera.image = np.zeros(IMAGE_SHAPE, dtype=np.uint8)
+    pipeline.close()
+    check_round_trip(dataset.root, images)
@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""Évaluation d'une politique ACT sur toutes les cibles, sans robot.
+
+Chaque cible de jpg/<forme>/ est jouée pendant EPISODE_TIME_SEC à FPS : la caméra
+"target" montre la cible, les caméras "front"/"top" et l'état des articulations
+viennent soit d'un épisode enregistré (--observations <repo_id>), soit d'une
+simulation (--observations synthetic : images vides, état qui part de l'état moyen
+d'entraînement puis suit l'action).
+
+Le modèle est chargé une seule fois ; ses poids sont placés en mémoire partagée
+avant de créer le pool de processus (fork), qui s'en sert sans les copier. Chaque
+cible écrit sa trace d'actions dans <sortie>/<forme>/<cible>.npz, et le résumé des
+temps va dans <sortie>/summary.json.
+
+Exemples :
+    python batch_eval.py --model Heuzef/act_rectangle_v2 --shapes rectangle -j 4
+    python batch_eval.py --model outputs/train/act/checkpoints/last/pretrained_model \\
+        --observations Heuzef/rectangle_v1 --episode 3 --output eval/last
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import numpy as np
+import repo_path  # noqa: F401  (racine du dépôt dans sys.path, pour le paquet cameras/)
+import torch
+from lerobot.cameras.configs import ColorMode
+from lerobot.policies.act.modeling_act import ACTPolicy
+from lerobot.utils.control_utils import predict_action
+from lerobot.utils.utils import get_safe_torch_device
+from target_cache import get_target_cache
+
+# === CONFIGURATION ===
+JPG_ROOT = "../jpg"
+HF_USER = "Heuzef"
+HF_MODEL_ID = f"{HF_USER}/act_rectangle_v2"
+OUTPUT_ROOT = "../eval"
+EPISODE_TIME_SEC = 30
+TASK_DESCRIPTION = "Draw the image"
+FPS = 30
+TARGET_CAMERA = "target"
+# État de départ de la simulation (--observations synthetic), dans les unités du dataset : avec SO100Follower
+# par défaut, -100..100 de la plage calibrée (pince 0..100), en degrés seulement si use_degrees=True.
+# None : état moyen du dataset d'entraînement, lu dans les statistiques de normalisation de la politique
+REST_STATE = None
+
+STATE_KEY = "observation.state"
+IMAGE_PREFIX = "observation.images."
+
+# Renseignés dans le processus parent avant le fork, hérités par les processus du pool
+_policy = None
+_recorded = None
+
+
+def list_targets(jpg_root: str, shapes: list[str] | None) -> list[str]:
+    """Liste les cibles jpg/<forme>/*.jpg, dans un ordre stable."""
+    targets = []
+    for shape in sorted(os.listdir(jpg_root)):
+        shape_dir = os.path.join(jpg_root, shape)
+        if not os.path.isdir(shape_dir) or (shapes and shape not in shapes):
+            continue
+        targets += [os.path.join(shape_dir, f) for f in sorted(os.listdir(shape_dir)) if f.lower().endswith(".jpg")]
+    return targets
+
+
+def load_policy(model_id: str, device: str) -> ACTPolicy:
+    policy = ACTPolicy.from_pretrained(model_id)
+    policy.config.device = device
+    policy.to(device)
+    policy.eval()
+    if device == "cpu":
+        # Les poids vont en mémoire partagée : les processus du pool lisent la même copie
+        policy.share_memory()
+    return policy
+
+
+def load_recorded(repo_id: str, episode: int) -> dict[str, np.ndarray]:
+    """Charge l'état et les images d'un épisode enregistré, au format des observations du robot (HWC uint8)."""
+    from lerobot.datasets.lerobot_dataset import LeRobotDataset
+
+    dataset = LeRobotDataset(repo_id, episodes=[episode])
+    recorded: dict[str, list] = {}
+    for i in range(len(dataset)):
+        frame = dataset[i]
+        for key, value in frame.items():
+            if key == STATE_KEY:
+                recorded.setdefault(key, []).append(value.numpy().astype(np.float32))
+            elif key.startswith(IMAGE_PREFIX):
+                # CHW float [0, 1] -> HWC uint8, comme la sortie des caméras
+                image = (value.permute(1, 2, 0).numpy() * 255).round().astype(np.uint8)
+                recorded.setdefault(key, []).append(image)
+    return {key: np.stack(values) for key, values in recorded.items()}
+
+
+def rest_state(policy: ACTPolicy) -> np.ndarray:
+    """État de départ de la simulation : REST_STATE, sinon l'état moyen vu à l'entraînement."""
+    if REST_STATE is not None:
+        return np.asarray(REST_STATE, dtype=np.float32)
+    # Les statistiques sont dans les unités du dataset, donc dans celles du robot qui l'a enregistré
+    stats = getattr(policy.normalize_inputs, "buffer_" + STATE_KEY.replace(".", "_"), None)
+    if stats is None:
+        raise ValueError(f"La politique ne normalise pas {STATE_KEY} : renseignez REST_STATE ou --observations <repo_id>")
+    state = stats["mean"] if "mean" in stats else (stats["min"] + stats["max"]) / 2
+    state = state.detach().cpu().numpy().astype(np.float32)
+    if not np.isfinite(state).all():
+        raise ValueError(f"Statistiques de {STATE_KEY} absentes de la politique : renseignez REST_STATE")
+    return state
+
+
+def init_worker(threads: int) -> None:
+    torch.set_num_threads(threads)
+
+
+def evaluate_target(jpg_path: str, output_path: str, n_ticks: int) -> dict:
+    """Joue une cible avec la politique du processus et écrit sa trace (exécuté dans un processus du pool)."""
+    policy = _policy
+    device = get_safe_torch_device(policy.config.device)
+    visual_keys = [key for key in policy.config.input_features if key.startswith(IMAGE_PREFIX)]
+    shapes = {key: policy.config.input_features[key].shape for key in visual_keys}
+
+    target_key = IMAGE_PREFIX + TARGET_CAMERA
+    if target_key not in shapes:
+        raise ValueError(f"La politique n'a pas de caméra '{TARGET_CAMERA}' en entrée : {visual_keys}")
+    _, h, w = shapes[target_key]
+    target = get_target_cache().get(jpg_path, w, h, ColorMode.RGB)
+    blank = {key: np.full((shape[1], shape[2], shape[0]), 255, dtype=np.uint8) for key, shape in shapes.items()}
+
+    start = time.perf_counter()
+    policy.reset()
+    state = rest_state(policy)
+    actions = []
+    tick_times = np.empty(n_ticks, dtype=np.float32)
+    for tick in range(n_ticks):
+        observation = {}
+        if _recorded is not None:
+            frame = tick % len(_recorded[STATE_KEY])
+            observation[STATE_KEY] = _recorded[STATE_KEY][frame]
+            for key in visual_keys:
+                if key != target_key:
+                    observation[key] = _recorded[key][frame]
+        else:
+            observation[STATE_KEY] = state
+            for key in visual_keys:
+                if key != target_key:
+                    observation[key] = blank[key]
+        observation[target_key] = target
+
+        tick_start = time.perf_counter()
+        action = predict_action(observation, policy, device, policy.config.use_amp, task=TASK_DESCRIPTION)
+        tick_times[tick] = time.perf_counter() - tick_start
+        action = action.cpu().numpy().astype(np.float32)
+        actions.append(action)
+        # Sans robot, les articulations suivent parfaitement la consigne
+        state = action
+
+    elapsed = time.perf_counter() - start
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    np.savez_compressed(output_path, actions=np.stack(actions), tick_s=tick_times)
+
+    tick_ms = tick_times * 1000
+    return {
+        "target": jpg_path,
+        "ticks": n_ticks,
+        "wall_s": elapsed,
+        "tick_ms_p50": float(np.percentile(tick_ms, 50)),
+        "tick_ms_p99": float(np.percentile(tick_ms, 99)),
+        "tick_ms_max": float(tick_ms.max()),
+        "ticks_over_budget": int((tick_times > 1 / FPS).sum()),
+    }
+
+
+def main():
+    global _policy, _recorded
+
+    parser = argparse.ArgumentParser(description="Évalue une politique ACT sur toutes les cibles, sans robot.")
+    parser.add_argument("--model", default=HF_MODEL_ID, help="dépôt Hugging Face ou dossier du modèle")
+    parser.add_argument("--shapes", nargs="+", help="formes à évaluer (défaut : toutes)")
+    parser.add_argument("--observations", default="synthetic",
+                        help="'synthetic' ou repo_id d'un dataset dont un épisode fournit état et caméras")
+    parser.add_argument("--episode", type=int, default=0, help="épisode du dataset d'observations")
+    parser.add_argument("--output", default=None, help="dossier de sortie (défaut : ../eval/<modèle>)")
+    parser.add_argument("--jobs", "-j", type=int, default=os.cpu_count(), help="nombre de processus")
+    parser.add_argument("--device", default="cpu")
+    parser.add_argument("--seconds", type=float, default=EPISODE_TIME_SEC, help="durée jouée par cible")
+    args = parser.parse_args()
+
+    targets = list_targets(JPG_ROOT, args.shapes)
+    if not targets:
+        print(f"❌ Aucune cible trouvée dans {JPG_ROOT}")
+        return
+    output_root = args.output or os.path.join(OUTPUT_ROOT, args.model.strip("/").replace("/", "_"))
+    n_ticks = int(args.seconds * FPS)
+
+    start = time.perf_counter()
+    _policy = load_policy(args.model, args.device)
+    if args.observations != "synthetic":
+        _recorded = load_recorded(args.observations, args.episode)
+    print(f"🧠 Modèle chargé en {time.perf_counter() - start:.1f} s, {len(targets)} cible(s), "
+          f"{n_ticks} ticks par cible, {args.jobs} processus")
+
+    results = []
+    pool = None
+    try:
+        jobs = [(jpg_path, os.path.join(output_root, os.path.splitext(os.path.relpath(jpg_path, JPG_ROOT))[0] + ".npz"))
+                for jpg_path in targets]
+        if args.jobs <= 1 or args.device != "cpu":
+            outcomes = (evaluate_target(jpg_path, npz_path, n_ticks) for jpg_path, npz_path in jobs)
+        else:
+            threads = max(1, (os.cpu_count() or 1) // args.jobs)
+            pool = ProcessPoolExecutor(max_workers=args.jobs, mp_context=multiprocessing.get_context("fork"),
+                                       initializer=init_worker, initargs=(threads,))
+            futures = [pool.submit(evaluate_target, jpg_path, npz_path, n_ticks) for jpg_path, npz_path in jobs]
+            outcomes = (future.result() for future in as_completed(futures))
+
+        for done, result in enumerate(outcomes, start=1):
+            results.append(result)
+            if done % 20 == 0 or done == len(jobs):
+                print(f"   {done}/{len(jobs)}")
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+
+    elapsed = time.perf_counter() - start
+    results.sort(key=lambda r: r["target"])
+    summary = {
+        "model": args.model,
+        "observations": args.observations,
+        "episode": args.episode if args.observations != "synthetic" else None,
+        "fps": FPS,
+        "ticks_per_target": n_ticks,
+        "jobs": args.jobs,
+        "wall_s": elapsed,
+        "targets": results,
+    }
+    Path(output_root).mkdir(parents=True, exist_ok=True)
+    with open(os.path.join(output_root, "summary.json"), "w") as f:
+        json.dump(summary, f, indent=1)
+
+    ticks = sum(r["ticks"] for r in results)
+    over = sum(r["ticks_over_budget"] for r in results)
+    print(f"\n📊 {len(results)} cible(s) évaluée(s) en {elapsed:.1f} s ({ticks / elapsed:.0f} ticks/s), "
+          f"{over} tick(s) au-delà de {1000 / FPS:.0f} ms -> {output_root}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,314 @@
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import torch
+import torch.nn.functional as F
+from torch import nn
+
+# Largest difference tolerated between the actions of the float and the optimized
+# policy, in action units. With the default SO100Follower (use_degrees=False) these
+# are -100..100 of each joint's calibrated range (0..100 for the gripper): 1.5 is
+# 0.75 % of the range, about 2 degrees for a joint calibrated over 270 degrees.
+ACCURACY_TOLERANCE = 1.5
+DEFAULT_SAMPLES = 32
+LATENCY_RUNS = 20
+TARGET_FEATURE = "observation.images.target"
+
+
+def available_cpus() -> int:
+    """CPUs this process may run on (the affinity mask, not the machine's count)."""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def configure_threads(threads: int | None = None) -> int:
+    """Pin torch's intra-op thread count, with a single inter-op thread.
+
+    Args:
+        threads: Intra-op threads (default: every CPU available to the process).
+
+    Returns:
+        The intra-op thread count in use.
+    """
+    threads = threads or available_cpus()
+    torch.set_num_threads(threads)
+    try:
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        pass  # can only be set before the first inter-op parallel work
+    return torch.get_num_threads()
+
+
+class SplitAttention(nn.Module):
+    """nn.MultiheadAttention with separate q/k/v/out nn.Linear projections.
+
+    nn.MultiheadAttention keeps its input projections in one fused parameter
+    and its output projection in a Linear subclass that quantize_dynamic()
+    skips, so none of the attention matmuls get quantized. This module holds
+    the same weights as four plain Linear layers that do, and computes the
+    attention with scaled_dot_product_attention. It supports what ACT uses:
+    sequence-first inputs, key_padding_mask, no attention weights.
+    """
+
+    def __init__(self, attention: nn.MultiheadAttention):
+        super().__init__()
+        if not attention._qkv_same_embed_dim or attention.batch_first:
+            raise ValueError("Only sequence-first attention with equal q/k/v dimensions is supported")
+        dim = attention.embed_dim
+        self.num_heads = attention.num_heads
+        self.head_dim = dim // attention.num_heads
+        self.q_proj, self.k_proj, self.v_proj = (nn.Linear(dim, dim) for _ in range(3))
+        self.out_proj = nn.Linear(dim, dim)
+        with torch.no_grad():
+            for i, proj in enumerate((self.q_proj, self.k_proj, self.v_proj)):
+                proj.weight.copy_(attention.in_proj_weight[i * dim:(i + 1) * dim])
+                proj.bias.copy_(attention.in_proj_bias[i * dim:(i + 1) * dim])
+            self.out_proj.weight.copy_(attention.out_proj.weight)
+            self.out_proj.bias.copy_(attention.out_proj.bias)
+
+    def _heads(self, x: torch.Tensor) -> torch.Tensor:
+        # (sequence, batch, dim) -> (batch, heads, sequence, head_dim)
+        return x.reshape(x.shape[0], x.shape[1], self.num_heads, self.head_dim).permute(1, 2, 0, 3)
+
+    def forward(self, query, key, value, key_padding_mask=None, need_weights=False, attn_mask=None):
+        if attn_mask is not None:
+            raise ValueError("attn_mask is not supported")
+        length, batch, dim = query.shape
+        mask = None
+        if key_padding_mask is not None:
+            # True marks padding in key_padding_mask, and keys to attend to in SDPA boolean masks
+            mask = ~key_padding_mask.bool()[:, None, None, :]
+        out = F.scaled_dot_product_attention(
+            self._heads(self.q_proj(query)), self._heads(self.k_proj(key)), self._heads(self.v_proj(value)),
+            attn_mask=mask,
+        )
+        out = out.permute(2, 0, 1, 3).reshape(length, batch, dim)
+        return self.out_proj(out), None
+
+
+def split_attention(module: nn.Module) -> int:
+    """Replace every nn.MultiheadAttention under module by a SplitAttention. Returns the count."""
+    count = 0
+    for name, child in module.named_children():
+        if isinstance(child, nn.MultiheadAttention):
+            setattr(module, name, SplitAttention(child))
+            count += 1
+        else:
+            count += split_attention(child)
+    return count
+
+
+class StaticImageCache(nn.Module):
+    """Wraps ACT's vision backbone to reuse the features of an image that did not change.
+
+    The target camera shows the same image for a whole episode, yet its
+    backbone features are computed again for every chunk. Each camera (by its
+    position in the model's image list) keeps its last input and features: an
+    identical input, checked with torch.equal(), returns the same features.
+    """
+
+    def __init__(self, backbone: nn.Module):
+        super().__init__()
+        self.backbone = backbone
+        self._last: dict[int, tuple[torch.Tensor, dict]] = {}
+        self._index = 0
+        self.hits = 0
+
+    def start(self, *_) -> None:
+        """Forward pre-hook of the model: the next image is the first camera's."""
+        self._index = 0
+
+    def forward(self, x: torch.Tensor) -> dict:
+        index = self._index
+        self._index += 1
+        last = self._last.get(index)
+        if last is not None and last[0].shape == x.shape and torch.equal(last[0], x):
+            self.hits += 1
+            return last[1]
+        features = self.backbone(x)
+        self._last[index] = (x, features)
+        return features
+
+
+def _to_channels_last(module, args):
+    return tuple(a.contiguous(memory_format=torch.channels_last) if torch.is_tensor(a) and a.dim() == 4 else a
+                 for a in args)
+
+
+def optimize_for_cpu(policy, quantize: bool = True, channels_last: bool = True, threads: int | None = None,
+                     cache_static_images: bool = True):
+    """Prepare an ACT policy for CPU inference, in place.
+
+    - threads: pins torch's intra-op threads (see configure_threads).
+    - quantize: the attention layers are split into plain Linear projections
+      (see SplitAttention), then every Linear of the transformer encoder and
+      decoder, and the action head, gets dynamic int8 quantization: int8
+      weights, activations quantized on the fly. The convolutional vision
+      backbone and the input projections stay in float32.
+    - channels_last: the backbone weights and its input images use the
+      channels-last memory layout, which oneDNN convolutions run faster.
+    - cache_static_images: the backbone features of an unchanged image (the
+      target) are reused from one chunk to the next (see StaticImageCache).
+
+    Check the result with check_accuracy() on recorded observations (or run
+    this file as a script) before using it on the robot.
+
+    Returns:
+        The same policy, on CPU and in eval mode.
+    """
+    configure_threads(threads)
+    policy.config.device = "cpu"
+    policy.to("cpu")
+    policy.eval()
+    model = policy.model
+    if channels_last and getattr(model, "backbone", None) is not None:
+        model.backbone.to(memory_format=torch.channels_last)
+        model.backbone.register_forward_pre_hook(_to_channels_last)
+        if hasattr(model, "encoder_img_feat_input_proj"):
+            model.encoder_img_feat_input_proj.to(memory_format=torch.channels_last)
+    if cache_static_images and getattr(model, "backbone", None) is not None:
+        model.backbone = StaticImageCache(model.backbone)
+        model.register_forward_pre_hook(model.backbone.start)
+    if quantize:
+        if "x86" in torch.backends.quantized.supported_engines:
+            torch.backends.quantized.engine = "x86"
+        split_attention(model)
+        # Submodule names, not types: quantize_dynamic() only swaps children, so
+        # quantizing model.action_head (a bare Linear) by itself would leave it as is
+        names = {name for name in ("encoder", "decoder", "action_head") if hasattr(model, name)}
+        torch.ao.quantization.quantize_dynamic(model, names, dtype=torch.qint8, inplace=True)
+    return policy
+
+
+def check_accuracy(reference, optimized, batches: list[dict], tolerance: float = ACCURACY_TOLERANCE) -> dict:
+    """Compare the action chunks of the float policy and the optimized one on the same observations.
+
+    Args:
+        reference: Float policy.
+        optimized: Policy returned by optimize_for_cpu().
+        batches: Observation batches, as given to predict_action_chunk().
+        tolerance: Largest action difference accepted, in action units.
+
+    Returns:
+        Mean, p99 and max absolute difference, per action dimension and overall, and "ok".
+    """
+    errors = []
+    with torch.inference_mode():
+        for batch in batches:
+            expected = reference.predict_action_chunk(batch)
+            actual = optimized.predict_action_chunk(batch)
+            errors.append((actual - expected).abs().reshape(-1, expected.shape[-1]).numpy())
+    errors = np.concatenate(errors)
+    return {
+        "samples": len(batches),
+        "mean": float(errors.mean()),
+        "p99": float(np.percentile(errors, 99)),
+        "max": float(errors.max()),
+        "max_per_dim": errors.max(axis=0).tolist(),
+        "tolerance": tolerance,
+        "ok": bool(errors.max() <= tolerance),
+    }
+
+
+def measure_latency(policy, batches: list[dict], runs: int = LATENCY_RUNS) -> dict:
+    """Time predict_action_chunk() over the batches in turn (after a warmup run), in milliseconds."""
+    times = []
+    with torch.inference_mode():
+        policy.predict_action_chunk(batches[0])
+        for i in range(runs):
+            start = time.perf_counter()
+            policy.predict_action_chunk(batches[(i + 1) % len(batches)])
+            times.append((time.perf_counter() - start) * 1000)
+    return {"p50_ms": float(np.percentile(times, 50)), "p90_ms": float(np.percentile(times, 90)),
+            "max_ms": float(max(times))}
+
+
+def recorded_batches(repo_id: str, episode: int, samples: int, policy) -> list[dict]:
+    """Observation batches taken evenly from a recorded episode, with the policy's input features."""
+    from lerobot.datasets.lerobot_dataset import LeRobotDataset
+    from static_features import INFO_FILE, StaticFeatureDataset
+
+    dataset = LeRobotDataset(repo_id, episodes=[episode])
+    if (dataset.root / "meta" / INFO_FILE).exists():
+        # The target was stored once per episode (STATIC_TARGET)
+        dataset = StaticFeatureDataset(dataset)
+    keys = list(policy.config.input_features)
+    batches = []
+    for i in np.linspace(0, len(dataset) - 1, min(samples, len(dataset))).astype(int):
+        item = dataset[int(i)]
+        batches.append({key: item[key].unsqueeze(0) for key in keys})
+    return batches
+
+
+def synthetic_batches(samples: int, policy, seed: int = 0) -> list[dict]:
+    """Random observations with the policy's input shapes, for a check without a recorded dataset.
+
+    As during an episode, the target image is the same in every batch.
+    """
+    generator = torch.Generator().manual_seed(seed)
+    features = policy.config.input_features
+    target = torch.rand((1, *features[TARGET_FEATURE].shape), generator=generator) if TARGET_FEATURE in features else None
+    batches = []
+    for _ in range(samples):
+        batches.append({key: target if key == TARGET_FEATURE else torch.rand((1, *feature.shape), generator=generator)
+                        for key, feature in features.items()})
+    return batches
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Optimise une politique ACT pour le CPU et vérifie ses actions.")
+    parser.add_argument("--model", default="Heuzef/act_rectangle_v2", help="dépôt Hugging Face ou dossier du modèle")
+    parser.add_argument("--dataset", help="épisodes enregistrés pour la comparaison (défaut : observations aléatoires)")
+    parser.add_argument("--episode", type=int, default=0, help="épisode du dataset")
+    parser.add_argument("--samples", type=int, default=DEFAULT_SAMPLES, help="observations comparées")
+    parser.add_argument("--threads", type=int, help="threads intra-op (défaut : tous les CPU disponibles)")
+    parser.add_argument("--tolerance", type=float, default=ACCURACY_TOLERANCE, help="écart max toléré sur les actions")
+    parser.add_argument("--no-quantize", action="store_true", help="sans quantification int8")
+    parser.add_argument("--no-channels-last", action="store_true", help="sans format channels-last")
+    parser.add_argument("--no-static-cache", action="store_true",
+                        help="recalcule les caractéristiques des images inchangées (la cible)")
+    args = parser.parse_args()
+
+    from lerobot.policies.act.modeling_act import ACTPolicy
+    from policy_snapshot import resolve_policy
+
+    model = resolve_policy(args.model)
+    threads = configure_threads(args.threads)
+    reference = ACTPolicy.from_pretrained(model)
+    reference.config.device = "cpu"
+    reference.to("cpu").eval()
+    optimized = optimize_for_cpu(ACTPolicy.from_pretrained(model), quantize=not args.no_quantize,
+                                 channels_last=not args.no_channels_last, threads=threads,
+                                 cache_static_images=not args.no_static_cache)
+
+    if args.dataset:
+        batches = recorded_batches(args.dataset, args.episode, args.samples, reference)
+    else:
+        batches = synthetic_batches(args.samples, reference)
+
+    before = measure_latency(reference, batches)
+    after = measure_latency(optimized, batches)
+    print(f"🧵 {threads} thread(s), moteur de quantification {torch.backends.quantized.engine}")
+    print(f"⏱️ Chunk float32 : {before['p50_ms']:.1f} ms médiane, {before['p90_ms']:.1f} ms p90")
+    print(f"⚡ Chunk optimisé : {after['p50_ms']:.1f} ms médiane, {after['p90_ms']:.1f} ms p90 "
+          f"(x{before['p50_ms'] / after['p50_ms']:.2f})")
+
+    report = check_accuracy(reference, optimized, batches, args.tolerance)
+    source = f"{args.dataset} épisode {args.episode}" if args.dataset else "observations aléatoires"
+    print(f"🎯 Écart sur {report['samples']} observation(s) ({source}) : moyen {report['mean']:.3f}, "
+          f"p99 {report['p99']:.3f}, max {report['max']:.3f}")
+    print("   max par dimension : " + ", ".join(f"{e:.3f}" for e in report["max_per_dim"]))
+    if report["ok"]:
+        print(f"✅ Dans la tolérance ({args.tolerance})")
+    else:
+        print(f"❌ Hors tolérance ({args.tolerance})")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,10 +3,19 @@ import os
 import subprocess
 import sys
 import termios
+import time
 import tty
+import repo_path  # noqa: F401  (racine du dépôt dans sys.path, pour le paquet cameras/)
 from static_image_camera import StaticImageCamera
 from lerobot.cameras.opencv.configuration_opencv import OpenCVCameraConfig
 from static_image_camera_config import StaticImageCameraConfig
+from target_cache import open_target_atlas, prefetch_target
+from episode_session import EpisodeSession
+from loop_tracer import LoopTracer
+from visualization import ThrottledRerunLogger
+from static_features import StaticFeatureWriter, split_static_features
+from episode_pipeline import EpisodePipeline, UploadQueue, make_target
+from cameras.capture_group import CaptureGroup
 from lerobot.datasets.lerobot_dataset import LeRobotDataset
 from lerobot.datasets.utils import hw_to_dataset_features
 from lerobot.robots.so100_follower import SO100Follower, SO100FollowerConfig
@@ -26,6 +35,16 @@ EPISODE_TIME_SEC = 10
 RESET_TIME_SEC = 0
 TASK_DESCRIPTION = "Draw the image"
 FPS=30
+ATLAS_PATH = None  # ex. "../atlas/jpg_640x480" : cibles lues dans l'atlas, sans décodage
+PERSISTENT_SESSION = True  # connecte robot, téléopérateur, clavier et rerun une seule fois par forme
+CAPTURE_GROUP = False  # une caméra par thread, images alignées dans le temps au lieu de lectures successives (à valider sur le robot : change les images enregistrées et données à la politique)
+STATIC_TARGET = False  # la cible, fixe pendant un épisode, est stockée une fois dans meta/ au lieu d'une vidéo (l'entraînement doit alors lire le dataset avec StaticFeatureDataset)
+TARGET_FEATURE = "observation.images.target"
+DISPLAY_IMAGE_FPS = 5  # images envoyées à rerun par seconde, par un thread hors de la boucle (None : toutes)
+DISPLAY_SCALE = 0.5  # réduction des images envoyées à rerun
+TRACE_DIR = "../traces"  # temps de chaque étape de la boucle (python loop_tracer.py <trace>), None pour désactiver
+BACKGROUND_SAVE = True  # sauvegarde (images, vidéos, stats) d'un épisode pendant l'enregistrement du suivant
+UPLOAD_TARGET = None  # avec BACKGROUND_SAVE : envoi après chaque épisode vers "hub" ou un dossier miroir local (None : un seul push_to_hub à la fin)
 
 
 def wait_for_space_or_enter():
@@ -52,16 +71,25 @@ def wait_for_space_or_enter():
 
 
 def record_single_episode(dataset, shape, episode_id, total_episodes,
-                          robot, teleop):
-    """Lance un enregistrement pour un épisode unique."""
+                          robot, teleop, events=None, tracer=None, static_writer=None, pipeline=None):
+    """Lance un enregistrement pour un épisode unique.
+
+    Sans `events` (ceux d'une EpisodeSession), le clavier et rerun sont initialisés ici.
+    Avec `tracer` (LoopTracer), les ticks de l'épisode et du reset sont tracés séparément.
+    Avec `static_writer` (StaticFeatureWriter), la cible est sauvegardée avec l'épisode.
+    Avec `pipeline` (EpisodePipeline), l'épisode est sauvegardé en arrière-plan.
+    """
     print(f" {shape} | Épisode {episode_id + 1}/{total_episodes}")
 
 # Initialize the keyboard listener and rerun visualization
-    _, events = init_keyboard_listener()
-    init_rerun(session_name="recording")
+    if events is None:
+        _, events = init_keyboard_listener()
+        init_rerun(session_name="recording")
 
     log_say(f"Recording episode {episode_id + 1} of {total_episodes}")
 
+    if tracer is not None:
+        tracer.start_episode(f"{shape}/{episode_id}")
     record_loop(
         robot=robot,
         events=events,
@@ -76,6 +104,8 @@ def record_single_episode(dataset, shape, episode_id, total_episodes,
     # Reset the environment if not stopping or re-recording
     if not events["stop_recording"] and (episode_id < total_episodes - 1 or events["rerecord_episode"]):
         log_say("Reset the environment")
+        if tracer is not None:
+            tracer.start_episode(f"{shape}/{episode_id}/reset")
         record_loop(
             robot=robot,
             events=events,
@@ -90,10 +120,18 @@ def record_single_episode(dataset, shape, episode_id, total_episodes,
         log_say("Re-recording episode")
         events["rerecord_episode"] = False
         events["exit_early"] = False
-        dataset.clear_episode_buffer()
+        if pipeline is not None:
+            pipeline.clear_episode()
+        else:
+            dataset.clear_episode_buffer()
         return
 
-    dataset.save_episode()
+    if pipeline is not None:
+        pipeline.save_episode()
+    elif static_writer is not None:
+        static_writer.save_episode()
+    else:
+        dataset.save_episode()
 
 # Clean up
     log_say("Stop recording")
@@ -101,6 +139,15 @@ def record_single_episode(dataset, shape, episode_id, total_episodes,
     print(f" Épisode {episode_id + 1}/{total_episodes} terminé.\n")
 
 
+def push_dataset(dataset, pipeline):
+    """Pousse le dataset, sauf s'il est envoyé en arrière-plan (UPLOAD_TARGET) après chaque épisode."""
+    if pipeline is None:
+        dataset.push_to_hub()
+    elif pipeline.uploads is None:
+        pipeline.wait()
+        dataset.push_to_hub()
+
+
 def record_shape(shape):
     """Crée un dataset Hugging Face pour une forme donnée."""
     jpg_dir = os.path.join(JPG_ROOT, shape)
@@ -124,7 +171,12 @@ def record_shape(shape):
     robot = SO100Follower(robot_config)
     static_image_conf = StaticImageCameraConfig(path=None, width=640, height=480, fps=FPS)
     robot_config.cameras["target"] = static_image_conf
-    robot.cameras["target"] = StaticImageCamera(static_image_conf)
+    atlas = open_target_atlas(ATLAS_PATH)
+    robot.cameras["target"] = StaticImageCamera(static_image_conf, atlas=atlas)
+    target_camera = robot.cameras["target"]
+    if CAPTURE_GROUP:
+        # get_observation() lit alors un jeu d'images aligné par tick, sans attendre chaque caméra
+        CaptureGroup(robot.cameras, static=["target"]).install(robot)
 
     teleop_config = SO100LeaderConfig(port=PORT_LEADER, id="leader")
 
@@ -134,6 +186,9 @@ def record_shape(shape):
     action_features = hw_to_dataset_features(robot.action_features, "action")
     obs_features = hw_to_dataset_features(robot.observation_features, "observation")
     dataset_features = {**action_features, **obs_features}
+    static_features = {}
+    if STATIC_TARGET:
+        dataset_features, static_features = split_static_features(dataset_features, [TARGET_FEATURE])
 
     # Create the dataset
     dataset = LeRobotDataset.create(
@@ -145,41 +200,93 @@ def record_shape(shape):
         image_writer_threads=4
     )
 
+    static_writer = None
+    if static_features:
+        static_writer = StaticFeatureWriter(dataset, {TARGET_FEATURE: target_camera}, static_features)
+
+    pipeline = None
+    if BACKGROUND_SAVE:
+        uploads = None
+        if UPLOAD_TARGET is not None:
+            uploads = UploadQueue(dataset.root, make_target(UPLOAD_TARGET, dataset.repo_id))
+        pipeline = EpisodePipeline(dataset, static_writer, uploads)
+
     # ==================== ATTENTION =======================
     # total=10
 
     print(f"\n===  Création du dataset '{shape}' ({total} épisodes) ===")
 
-    for i, jpg_file in enumerate(jpg_files):
-        print(f"\n\nFor loop iteration {i} file {jpg_file}")
-        print(f"START")
-        action = wait_for_space_or_enter()
-        if action == "push_quit":
-            dataset.push_to_hub()
-            return "quit"
-        jpg_path = os.path.join(jpg_dir, jpg_file)
-
-        if not os.path.exists(jpg_path):
-            print(f" JPG manquant pour {jpg_file}, saut de cet épisode.")
-            continue
-
-        print(f"  Image targer : {jpg_path}")
-        static_image_conf.path = jpg_path
-
-        # Détermine si on push à la fin de l'épisode
-        push = (i == total - 1)
-
-        # Connect the robot and teleoperator
-        robot.connect()
-        teleop.connect()
-
-        record_single_episode(dataset, shape, i, total, robot, teleop) # TO UNCOMMENT
-
-        robot.disconnect()
-        teleop.disconnect()
-
-        if push:
-            dataset.push_to_hub()
+    # Décode la première cible pendant que l'opérateur se prépare
+    if jpg_files and atlas is None:
+        prefetch_target(os.path.join(jpg_dir, jpg_files[0]), static_image_conf.width, static_image_conf.height)
+
+    session = EpisodeSession(robot, target_camera, teleop) if PERSISTENT_SESSION else None
+    # Installé avant le traceur, qui mesure alors le seul coût laissé dans la boucle
+    display = None
+    if DISPLAY_IMAGE_FPS is not None:
+        display = ThrottledRerunLogger(image_fps=DISPLAY_IMAGE_FPS, scale=DISPLAY_SCALE)
+        display.install()
+    tracer = None
+    if TRACE_DIR is not None:
+        tracer = LoopTracer(os.path.join(TRACE_DIR, f"{shape}_{time.strftime('%Y%m%d_%H%M%S')}"), fps=FPS)
+        tracer.attach(robot, teleop=teleop, dataset=dataset)
+    try:
+        for i, jpg_file in enumerate(jpg_files):
+            print(f"\n\nFor loop iteration {i} file {jpg_file}")
+            print(f"START")
+            action = wait_for_space_or_enter()
+            if action == "push_quit":
+                push_dataset(dataset, pipeline)
+                return "quit"
+            jpg_path = os.path.join(jpg_dir, jpg_file)
+
+            if not os.path.exists(jpg_path):
+                print(f" JPG manquant pour {jpg_file}, saut de cet épisode.")
+                continue
+
+            print(f"  Image targer : {jpg_path}")
+            atlas_name = f"{shape}/{os.path.splitext(jpg_file)[0]}"
+            atlas_target = atlas_name if atlas is not None and atlas_name in atlas else None
+
+            # Détermine si on push à la fin de l'épisode
+            push = (i == total - 1)
+
+            if session is not None:
+                # Seule l'image cible change entre deux épisodes
+                switch_time = session.set_target(jpg_path, atlas_target)
+                print(f"  Cible changée en {switch_time * 1000:.0f} ms")
+            else:
+                static_image_conf.path = jpg_path
+                static_image_conf.atlas_target = atlas_target
+                # Connect the robot and teleoperator
+                robot.connect()
+                teleop.connect()
+
+            # Décode la cible suivante en arrière-plan pendant l'enregistrement
+            if i + 1 < len(jpg_files) and atlas is None:
+                next_path = os.path.join(jpg_dir, jpg_files[i + 1])
+                prefetch_target(next_path, static_image_conf.width, static_image_conf.height)
+
+            events = session.events if session is not None else None
+            record_single_episode(dataset, shape, i, total, robot, teleop, events, tracer, static_writer, pipeline) # TO UNCOMMENT
+
+            if session is None:
+                robot.disconnect()
+                teleop.disconnect()
+
+            if push:
+                push_dataset(dataset, pipeline)
+    finally:
+        if session is not None:
+            session.close()
+        if pipeline is not None:
+            # Attend les sauvegardes et l'envoi des derniers épisodes
+            pipeline.close()
+        if tracer is not None:
+            tracer.close()
+            print(f"⏱️ Trace de la boucle : python loop_tracer.py {tracer.trace_dir}")
+        if display is not None:
+            display.close()
 
     print(f"🚀 Dataset '{shape}' poussé sur Hugging Face !\n")
     return "continue"
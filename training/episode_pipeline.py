@@ -0,0 +1,348 @@
+import argparse
+import json
+import os
+import shutil
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+
+# Files uploaded per Hub commit
+BATCH_FILES = 64
+# Temporary images, deleted by lerobot once encoded: never uploaded
+IGNORED_DIRS = ("images",)
+# Uploaded last, so that the metadata never points to files not uploaded yet
+META_DIR = "meta"
+RETRIES = 3
+RETRY_DELAY_S = 5
+
+
+class _EpisodeView:
+    """The dataset as save_episode() sees it, with a detached episode buffer.
+
+    LeRobotDataset.save_episode() only saves self.episode_buffer (its
+    episode_data argument is broken in lerobot 0.3), which the control loop
+    keeps filling with the next episode. Reads go to the dataset, except for
+    episode_buffer; writes go to the dataset too.
+    """
+
+    def __init__(self, dataset, episode_buffer: dict):
+        object.__setattr__(self, "_dataset", dataset)
+        object.__setattr__(self, "episode_buffer", episode_buffer)
+
+    def __getattr__(self, name):
+        return getattr(self._dataset, name)
+
+    def __setattr__(self, name, value):
+        if name == "episode_buffer":
+            object.__setattr__(self, name, value)
+        else:
+            setattr(self._dataset, name, value)
+
+
+class EpisodePipeline:
+    """Saves episodes in the background while the next one is recorded.
+
+    save_episode() hands the recorded buffer to a worker thread and gives the
+    dataset a fresh buffer for the next episode, so the operator does not wait
+    for the image writer, the parquet file, the stats and the video encoding.
+    lerobot requires episodes to be saved in order (episode_index must equal
+    meta.total_episodes), so a single worker saves them one after the other;
+    ffmpeg already uses several threads for each video.
+
+    With an UploadQueue, every saved episode is followed by an upload of the
+    files that changed, in the background too.
+
+    Example:
+        pipeline = EpisodePipeline(dataset, uploads=UploadQueue(dataset.root, MirrorTarget("/tmp/mirror")))
+        for episode in ...:
+            record_loop(robot=robot, dataset=dataset, ...)
+            pipeline.save_episode()
+        pipeline.close()  # waits for the saves and uploads
+    """
+
+    def __init__(self, dataset, static_writer=None, uploads: "UploadQueue | None" = None):
+        """
+        Args:
+            dataset: LeRobotDataset being recorded.
+            static_writer: Optional StaticFeatureWriter, whose frames are
+                captured when the episode ends and written with it.
+            uploads: Optional UploadQueue pushed after each saved episode.
+        """
+        self.dataset = dataset
+        self.static_writer = static_writer
+        self.uploads = uploads
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="episode-save")
+        self._futures: list[Future] = []
+        if dataset.episode_buffer is None:
+            dataset.episode_buffer = dataset.create_episode_buffer()
+        self.save_time = 0.0
+
+    def _check(self) -> None:
+        """Raise the error of a failed save, if any."""
+        for future in [f for f in self._futures if f.done()]:
+            self._futures.remove(future)
+            future.result()
+
+    def save_episode(self) -> Future:
+        """Save the recorded episode in the background and start a new episode buffer."""
+        self._check()
+        buffer = self.dataset.episode_buffer
+        frames = self.static_writer.capture() if self.static_writer is not None else None
+        # meta.total_episodes is only incremented once the save is done
+        self.dataset.episode_buffer = self.dataset.create_episode_buffer(episode_index=buffer["episode_index"] + 1)
+        future = self._executor.submit(self._save, buffer, frames)
+        self._futures.append(future)
+        return future
+
+    def _save(self, buffer: dict, frames: dict | None) -> None:
+        start = time.perf_counter()
+        episode_index = int(buffer["episode_index"])
+        length = int(buffer["size"])
+        type(self.dataset).save_episode(_EpisodeView(self.dataset, buffer))
+        if frames is not None:
+            self.static_writer.write(episode_index, length, frames)
+        self.save_time += time.perf_counter() - start
+        if self.uploads is not None:
+            self.uploads.push()
+
+    def clear_episode(self) -> None:
+        """Drop the episode being recorded (to record it again)."""
+        episode_index = self.dataset.episode_buffer["episode_index"]
+        self.dataset.clear_episode_buffer()
+        # clear_episode_buffer() numbers the new buffer from the episodes already saved
+        self.dataset.episode_buffer = self.dataset.create_episode_buffer(episode_index=episode_index)
+
+    @property
+    def pending(self) -> int:
+        return sum(not f.done() for f in self._futures)
+
+    def wait(self) -> None:
+        """Wait for the episodes saved so far."""
+        for future in list(self._futures):
+            future.result()
+        self._check()
+
+    def close(self) -> None:
+        """Wait for the saves, then for the uploads."""
+        try:
+            if self.pending:
+                print(f"⏳ {self.pending} épisode(s) en cours de sauvegarde...")
+            self.wait()
+        finally:
+            self._executor.shutdown(wait=True)
+            if self.uploads is not None:
+                self.uploads.close()
+
+
+class MirrorTarget:
+    """Upload target copying the files to a local directory, e.g. to test the queue without network."""
+
+    def __init__(self, directory: str | Path):
+        self.directory = Path(directory)
+
+    def __str__(self) -> str:
+        return str(self.directory)
+
+    def upload(self, root: Path, paths: list[str]) -> None:
+        for rel_path in paths:
+            dest = self.directory / rel_path
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = dest.with_name(dest.name + ".tmp")
+            shutil.copy2(root / rel_path, tmp_path)
+            os.replace(tmp_path, dest)
+
+    def finalize(self, root: Path) -> None:
+        pass
+
+
+class HubTarget:
+    """Upload target pushing the files to a Hugging Face dataset repository, like push_to_hub()."""
+
+    def __init__(self, repo_id: str, private: bool = False):
+        from huggingface_hub import HfApi
+
+        self.repo_id = repo_id
+        self.private = private
+        self.api = HfApi()
+        self._created = False
+
+    def __str__(self) -> str:
+        return f"hub:{self.repo_id}"
+
+    def upload(self, root: Path, paths: list[str]) -> None:
+        from huggingface_hub import CommitOperationAdd
+
+        if not self._created:
+            self.api.create_repo(repo_id=self.repo_id, private=self.private, repo_type="dataset", exist_ok=True)
+            self._created = True
+        operations = [CommitOperationAdd(path_in_repo=p, path_or_fileobj=str(root / p)) for p in paths]
+        self.api.create_commit(repo_id=self.repo_id, repo_type="dataset", operations=operations,
+                               commit_message=f"Upload {len(paths)} file(s)")
+
+    def finalize(self, root: Path) -> None:
+        """Add the dataset card if missing and move the version tag to the last commit."""
+        from huggingface_hub.constants import REPOCARD_NAME
+        from huggingface_hub.errors import RevisionNotFoundError
+        from lerobot.datasets.lerobot_dataset import CODEBASE_VERSION
+        from lerobot.datasets.utils import create_lerobot_dataset_card
+
+        if not self.api.file_exists(self.repo_id, REPOCARD_NAME, repo_type="dataset"):
+            with open(root / META_DIR / "info.json") as f:
+                info = json.load(f)
+            card = create_lerobot_dataset_card(dataset_info=info, license="apache-2.0")
+            card.push_to_hub(repo_id=self.repo_id, repo_type="dataset")
+        try:
+            self.api.delete_tag(self.repo_id, tag=CODEBASE_VERSION, repo_type="dataset")
+        except RevisionNotFoundError:
+            pass
+        self.api.create_tag(self.repo_id, tag=CODEBASE_VERSION, repo_type="dataset")
+
+
+def make_target(spec: str, repo_id: str):
+    """Upload target from a configuration value: "hub" for the dataset repository, or a directory."""
+    return HubTarget(repo_id) if spec == "hub" else MirrorTarget(spec)
+
+
+class UploadQueue:
+    """Uploads the files of a dataset directory in the background, resuming where it stopped.
+
+    push() asks for an upload of everything that changed since the last one;
+    pushes requested while an upload runs are merged into one. Uploaded files
+    are recorded (size and modification time) in a journal next to the
+    dataset, so an upload interrupted by a crash or Ctrl+C goes on from there
+    at the next push, in this run or the next one (python episode_pipeline.py).
+    Data and videos are uploaded before meta/, in batches of BATCH_FILES.
+    """
+
+    def __init__(self, root: str | Path, target, journal_path: str | Path | None = None):
+        """
+        Args:
+            root: Dataset directory.
+            target: MirrorTarget or HubTarget.
+            journal_path: Journal of the uploaded files, by default
+                <root>.upload.jsonl next to the dataset directory.
+        """
+        self.root = Path(root)
+        self.target = target
+        self.journal_path = Path(journal_path) if journal_path else self.root.with_name(self.root.name + ".upload.jsonl")
+        self.uploaded = self._load_journal()
+        self.uploaded_files = 0
+        self.uploaded_bytes = 0
+        self.error: Exception | None = None
+
+        self._changed = threading.Condition()
+        self._requested = 0
+        self._done = 0
+        self._closed = False
+        self._worker = threading.Thread(target=self._run, name="dataset-upload", daemon=True)
+        self._worker.start()
+
+    def _load_journal(self) -> dict[str, list[int]]:
+        uploaded = {}
+        if self.journal_path.exists():
+            with open(self.journal_path) as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        uploaded[entry["path"]] = [entry["size"], entry["mtime_ns"]]
+        return uploaded
+
+    def changed_files(self) -> dict[str, list[int]]:
+        """Files of the dataset not uploaded yet in their current version, meta/ last."""
+        changed = {}
+        for dirpath, dirnames, filenames in os.walk(self.root):
+            if Path(dirpath) == self.root:
+                dirnames[:] = [d for d in dirnames if d not in IGNORED_DIRS and not d.startswith(".")]
+            for name in filenames:
+                if name.endswith(".tmp"):
+                    continue
+                path = Path(dirpath) / name
+                st = path.stat()
+                rel_path = path.relative_to(self.root).as_posix()
+                if self.uploaded.get(rel_path) != [st.st_size, st.st_mtime_ns]:
+                    changed[rel_path] = [st.st_size, st.st_mtime_ns]
+        return dict(sorted(changed.items(), key=lambda item: (item[0].startswith(META_DIR + "/"), item[0])))
+
+    def push(self) -> None:
+        """Ask for an upload of the changed files."""
+        with self._changed:
+            self._requested += 1
+            self._changed.notify_all()
+
+    def _run(self) -> None:
+        while True:
+            with self._changed:
+                self._changed.wait_for(lambda: self._requested > self._done or self._closed)
+                if self._requested == self._done:
+                    return
+                requested = self._requested
+            try:
+                self._upload_changed()
+                self.error = None
+            except Exception as e:
+                self.error = e
+                print(f"⚠️ Envoi vers {self.target} interrompu : {e}")
+            with self._changed:
+                self._done = requested
+                self._changed.notify_all()
+
+    def _upload_changed(self) -> None:
+        changed = self.changed_files()
+        if not changed:
+            return
+        paths = list(changed)
+        for i in range(0, len(paths), BATCH_FILES):
+            batch = paths[i:i + BATCH_FILES]
+            for attempt in range(RETRIES):
+                try:
+                    self.target.upload(self.root, batch)
+                    break
+                except Exception:
+                    if attempt == RETRIES - 1:
+                        raise
+                    time.sleep(RETRY_DELAY_S * (attempt + 1))
+            with open(self.journal_path, "a") as f:
+                for rel_path in batch:
+                    size, mtime_ns = changed[rel_path]
+                    f.write(json.dumps({"path": rel_path, "size": size, "mtime_ns": mtime_ns}) + "\n")
+                    self.uploaded[rel_path] = [size, mtime_ns]
+                    self.uploaded_files += 1
+                    self.uploaded_bytes += size
+        self.target.finalize(self.root)
+
+    def wait(self, timeout: float | None = None) -> bool:
+        """Wait until every requested upload is done. Returns False on timeout."""
+        with self._changed:
+            requested = self._requested
+            return self._changed.wait_for(lambda: self._done >= requested, timeout)
+
+    def close(self) -> None:
+        """Upload what changed, then stop the worker."""
+        self.push()
+        print(f"⏳ Envoi vers {self.target}...")
+        self.wait()
+        with self._changed:
+            self._closed = True
+            self._changed.notify_all()
+        self._worker.join(timeout=5)
+        if self.error is None:
+            print(f"🚀 {self.uploaded_files} fichier(s) envoyé(s) ({self.uploaded_bytes / 1e6:.1f} Mo) vers {self.target}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Reprend l'envoi d'un dataset local là où il s'est arrêté.")
+    parser.add_argument("root", help="dossier du dataset, ex. ~/.cache/huggingface/lerobot/Heuzef/rectangle_v1")
+    parser.add_argument("target", help="'hub' ou dossier miroir local")
+    parser.add_argument("--repo-id", help="dépôt Hugging Face (défaut : <utilisateur>/<dossier> d'après root)")
+    args = parser.parse_args()
+
+    root = Path(args.root).expanduser()
+    repo_id = args.repo_id or f"{root.parent.name}/{root.name}"
+    uploads = UploadQueue(root, make_target(args.target, repo_id))
+    print(f"{len(uploads.changed_files())} fichier(s) à envoyer")
+    uploads.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+import time
+
+
+class EpisodeSession:
+    """Keeps the robot, teleoperator, keyboard listener and rerun stream open across episodes.
+
+    Connecting the SO-100 opens the serial bus and warms up every OpenCV camera,
+    and rerun spawns a viewer: doing this once instead of once per episode removes
+    seconds between episodes. Between episodes only the target image of the
+    static camera changes (see set_target).
+
+    Example:
+        with EpisodeSession(robot, target_camera, teleop) as session:
+            for path in targets:
+                session.set_target(path)
+                record_loop(robot=robot, events=session.events, ...)
+    """
+
+    def __init__(self, robot, target_camera, teleop=None, session_name: str = "recording",
+                 display_data: bool = True):
+        """
+        Args:
+            robot: Robot to connect once. Its cameras include target_camera.
+            target_camera: StaticImageCamera showing the target.
+            teleop: Optional teleoperator to connect once.
+            session_name: Name of the rerun recording.
+            display_data: Start the rerun stream.
+        """
+        self.robot = robot
+        self.target_camera = target_camera
+        self.teleop = teleop
+        self.session_name = session_name
+        self.display_data = display_data
+        self.listener = None
+        self.events = None
+        self.is_open = False
+
+    def __enter__(self) -> "EpisodeSession":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def open(self) -> None:
+        """Connect everything. Called by the first set_target() if needed."""
+        if self.is_open:
+            return
+        # Imported here: control_utils pulls in the whole lerobot stack (datasets, policies)
+        from lerobot.utils.control_utils import init_keyboard_listener
+        from lerobot.utils.visualization_utils import _init_rerun as init_rerun
+
+        start = time.perf_counter()
+        if not self.robot.is_connected:
+            self.robot.connect()
+        if self.teleop is not None and not self.teleop.is_connected:
+            self.teleop.connect()
+        self.listener, self.events = init_keyboard_listener()
+        if self.display_data:
+            init_rerun(session_name=self.session_name)
+        self.is_open = True
+        print(f"Session ouverte en {time.perf_counter() - start:.1f} s")
+
+    def set_target(self, path, atlas_target: int | str | None = None) -> float:
+        """Show another target, opening the session first if needed.
+
+        Args:
+            path: Target image file.
+            atlas_target: Name or index of the target in the camera atlas, used
+                instead of path when set.
+
+        Returns:
+            The time spent switching, in seconds.
+        """
+        start = time.perf_counter()
+        config = self.target_camera.config
+        if not self.is_open:
+            config.path = str(path)
+            config.atlas_target = atlas_target
+            self.open()
+        elif atlas_target is not None:
+            self.target_camera.select_target(atlas_target)
+        else:
+            self.target_camera.select_image(path)
+        self.reset_events()
+        return time.perf_counter() - start
+
+    def reset_events(self) -> None:
+        """Clear the per-episode keyboard events left over from the previous episode."""
+        if self.events is not None:
+            self.events["exit_early"] = False
+            self.events["rerecord_episode"] = False
+            self.events["stop_recording"] = False
+
+    def close(self) -> None:
+        """Disconnect everything that was opened."""
+        if self.robot.is_connected:
+            self.robot.disconnect()
+        if self.teleop is not None and self.teleop.is_connected:
+            self.teleop.disconnect()
+        if self.listener is not None:
+            self.listener.stop()
+            self.listener = None
+        self.is_open = False
@@ -1 +1,2 @@
-rm -r /home/heuzef/.cache/huggingface/lerobot/Heuzef/eval_v1; git pull; python inference.py
+# FAST_START=1 sh executor.sh : redémarrage rapide (après un crash), sans git pull
+rm -rf /home/heuzef/.cache/huggingface/lerobot/Heuzef/eval_v1; [ -n "$FAST_START" ] || git pull; python inference.py
@@ -3,19 +3,22 @@ import os
 import subprocess
 import sys
 import termios
+import time
 import tty
+import repo_path  # noqa: F401  (racine du dépôt dans sys.path, pour le paquet cameras/)
 from pathlib import Path
+from startup_timer import StartupTimer
 from static_image_camera import StaticImageCamera
 from lerobot.cameras.opencv.configuration_opencv import OpenCVCameraConfig
 from static_image_camera_config import StaticImageCameraConfig
-from lerobot.datasets.lerobot_dataset import LeRobotDataset
-from lerobot.datasets.utils import hw_to_dataset_features
-from lerobot.robots.so100_follower import SO100Follower, SO100FollowerConfig
-from lerobot.policies.act.modeling_act import ACTPolicy
-from lerobot.utils.control_utils import init_keyboard_listener
-from lerobot.utils.utils import log_say
-from lerobot.utils.visualization_utils import _init_rerun as init_rerun
-from lerobot.record import record_loop
+from target_cache import open_target_atlas, prefetch_target
+from episode_session import EpisodeSession
+from loop_tracer import LoopTracer
+from policy_snapshot import resolve_policy
+from cameras.capture_group import CaptureGroup
+# Le reste de lerobot (robots, datasets, politiques, rerun) est importé au moment où il sert
+
+STARTUP = StartupTimer()
 
 # === CONFIGURATION ===
 JPG_ROOT = "../jpg"
@@ -28,6 +31,18 @@ EPISODE_TIME_SEC = 30
 RESET_TIME_SEC = 0
 TASK_DESCRIPTION = "Draw the image"
 FPS=30
+ATLAS_PATH = None  # ex. "../atlas/jpg_640x480" : cibles lues dans l'atlas, sans décodage
+PERSISTENT_SESSION = True  # connecte robot, clavier et rerun une seule fois
+CAPTURE_GROUP = False  # une caméra par thread, images alignées dans le temps au lieu de lectures successives (à valider sur le robot : change les images enregistrées et données à la politique)
+PIPELINED_POLICY = False  # calcule le chunk d'actions suivant dans un thread, hors de la boucle à FPS (à valider sur le robot : re-planifie avant la fin du chunk)
+DISPLAY_IMAGE_FPS = 5  # images envoyées à rerun par seconde, par un thread hors de la boucle (None : toutes)
+DISPLAY_SCALE = 0.5  # réduction des images envoyées à rerun
+TRACE_DIR = "../traces"  # temps de chaque étape de la boucle (python loop_tracer.py <trace>), None pour désactiver
+FAST_START = True  # charge la politique dans un thread pendant la connexion du robot, connecté avant le premier épisode
+POLICY_SNAPSHOT_ROOT = "../policies"  # copie locale vérifiée des poids, lue sans réseau (None : résolution par le Hub)
+REFRESH_POLICY = False  # demande au Hub s'il existe une révision plus récente que la copie locale
+CPU_RUNTIME = False  # sans GPU : attention et têtes en int8, backbone en channels-last, cible encodée une fois (python cpu_runtime.py pour valider)
+CPU_THREADS = None  # threads torch pour l'inférence (None : tous les cœurs disponibles)
 
 
 def wait_for_space_or_enter():
@@ -53,12 +68,18 @@ def wait_for_space_or_enter():
         termios.tcsetattr(fd, termios.TCSADRAIN, old_settings)
 
 
-def infer_one_episode(dataset, episode_id, total_episodes, robot, policy):
+def infer_one_episode(dataset, episode_id, total_episodes, robot, policy, events=None, tracer=None):
     print(f" Épisode {episode_id + 1}/{total_episodes}")
 
 # Initialize the keyboard listener and rerun visualization
-    _, events = init_keyboard_listener()
-    init_rerun(session_name="recording")
+    from lerobot.record import record_loop
+
+    if events is None:
+        from lerobot.utils.control_utils import init_keyboard_listener
+        from lerobot.utils.visualization_utils import _init_rerun as init_rerun
+
+        _, events = init_keyboard_listener()
+        init_rerun(session_name="recording")
 
     print(f"Infer episode {episode_id + 1} of {total_episodes}")
 
@@ -68,6 +89,8 @@ def infer_one_episode(dataset, episode_id, total_episodes, robot, policy):
 #       dataset_stats=dataset.meta.stats,
 #   )
 
+    if tracer is not None:
+        tracer.start_episode(f"inference/{episode_id}")
     record_loop(
         robot=robot,
         events=events,
@@ -81,11 +104,43 @@ def infer_one_episode(dataset, episode_id, total_episodes, robot, policy):
         display_data=True
     )
 
+    if hasattr(policy, "format_stats"):  # PipelinedPolicy
+        print(f"  Politique : {policy.format_stats()}")
     print(f" Épisode {episode_id + 1}/{total_episodes} terminé.\n")
 
 
+def load_policy():
+    """Charge la politique, depuis sa copie locale vérifiée si POLICY_SNAPSHOT_ROOT est défini."""
+    from lerobot.policies.act.modeling_act import ACTPolicy
+
+    model = HF_MODEL_ID
+    if POLICY_SNAPSHOT_ROOT is not None:
+        model = resolve_policy(HF_MODEL_ID, POLICY_SNAPSHOT_ROOT, refresh=REFRESH_POLICY)
+    policy = ACTPolicy.from_pretrained(model)
+    if CPU_RUNTIME:
+        from cpu_runtime import optimize_for_cpu
+
+        policy = optimize_for_cpu(policy, threads=CPU_THREADS)
+    if PIPELINED_POLICY:
+        from policy_runner import PipelinedPolicy
+
+        policy = PipelinedPolicy(policy, fps=FPS)
+    return policy
+
+
+def atlas_target_for(jpg_file, atlas):
+    """Nom de la cible dans l'atlas, ou None si elle n'y est pas."""
+    atlas_name = os.path.splitext(os.path.relpath(jpg_file, JPG_ROOT))[0]
+    return atlas_name if atlas is not None and atlas_name in atlas else None
+
+
 def infer(jpg_files):
     """Crée un dataset Hugging Face pour une forme donnée."""
+    # Import de torch et chargement des poids pendant la connexion du robot
+    policy_future = STARTUP.background("politique", load_policy) if FAST_START else None
+    with STARTUP.phase("imports robot"):
+        from lerobot.robots.so100_follower import SO100Follower, SO100FollowerConfig
+
     camera_config = {
         "front": OpenCVCameraConfig(index_or_path="/dev/video0", width=640, height=480, fps=FPS),
         "top": OpenCVCameraConfig(index_or_path="/dev/video2", width=640, height=480, fps=FPS)
@@ -96,47 +151,112 @@ def infer(jpg_files):
     robot = SO100Follower(robot_config)
     static_image_conf = StaticImageCameraConfig(path=None, width=640, height=480, fps=FPS)
     robot_config.cameras["target"] = static_image_conf
-    robot.cameras["target"] = StaticImageCamera(static_image_conf)
+    atlas = open_target_atlas(ATLAS_PATH)
+    robot.cameras["target"] = StaticImageCamera(static_image_conf, atlas=atlas)
+    target_camera = robot.cameras["target"]
+    if CAPTURE_GROUP:
+        # get_observation() lit alors un jeu d'images aligné par tick, sans attendre chaque caméra
+        CaptureGroup(robot.cameras, static=["target"]).install(robot)
 
-    policy = ACTPolicy.from_pretrained(HF_MODEL_ID)
+    # Décode la première cible pendant le chargement
+    if jpg_files and atlas is None:
+        prefetch_target(jpg_files[0], static_image_conf.width, static_image_conf.height)
 
-    # Configure the dataset features
-    action_features = hw_to_dataset_features(robot.action_features, "action")
-    obs_features = hw_to_dataset_features(robot.observation_features, "observation")
-    dataset_features = {**action_features, **obs_features}
+    session = EpisodeSession(robot, target_camera) if PERSISTENT_SESSION else None
+    if FAST_START and session is not None and jpg_files:
+        # Robot, caméras, clavier et rerun prêts avant le premier [ESPACE]
+        with STARTUP.phase("connexion robot"):
+            session.set_target(jpg_files[0], atlas_target_for(jpg_files[0], atlas))
 
-    # Create the dataset
-    dataset = LeRobotDataset.create(
-        repo_id=f"{HF_USER}/eval_v1",
-        fps=FPS,
-        features=dataset_features,
-        robot_type=robot.name,
-        use_videos=True,
-        image_writer_threads=4
-    )
+    with STARTUP.phase("dataset"):
+        from lerobot.datasets.lerobot_dataset import LeRobotDataset
+        from lerobot.datasets.utils import hw_to_dataset_features
+
+        # Configure the dataset features
+        action_features = hw_to_dataset_features(robot.action_features, "action")
+        obs_features = hw_to_dataset_features(robot.observation_features, "observation")
+        dataset_features = {**action_features, **obs_features}
+
+        # Create the dataset
+        dataset = LeRobotDataset.create(
+            repo_id=f"{HF_USER}/eval_v1",
+            fps=FPS,
+            features=dataset_features,
+            robot_type=robot.name,
+            use_videos=True,
+            image_writer_threads=4
+        )
+
+    if policy_future is not None:
+        with STARTUP.phase("attente politique"):
+            policy = policy_future.result()
+    else:
+        with STARTUP.phase("politique"):
+            policy = load_policy()
 
     # ==================== ATTENTION =======================
     total=len(jpg_files)
 
-    for i, jpg_file in enumerate(jpg_files):
-        if not os.path.exists(jpg_file):
-            print(f"  Fichier '{jpg_file}' introuvable.")
-            continue
+    # Installé avant le traceur, qui mesure alors le seul coût laissé dans la boucle
+    display = None
+    if DISPLAY_IMAGE_FPS is not None:
+        from visualization import ThrottledRerunLogger
 
-        print(f"\n\nFor loop iteration {i} file {jpg_file}")
-        print(f"START")
-        action = wait_for_space_or_enter()
-        if action == "quit":
-            return "quit"
+        display = ThrottledRerunLogger(image_fps=DISPLAY_IMAGE_FPS, scale=DISPLAY_SCALE)
+        display.install()
+    tracer = None
+    if TRACE_DIR is not None:
+        tracer = LoopTracer(os.path.join(TRACE_DIR, f"inference_{time.strftime('%Y%m%d_%H%M%S')}"), fps=FPS)
+        tracer.attach(robot, dataset=dataset)
+    print(f"🚀 Prêt en {STARTUP.elapsed():.1f} s :\n{STARTUP.format()}")
+    try:
+        for i, jpg_file in enumerate(jpg_files):
+            if not os.path.exists(jpg_file):
+                print(f"  Fichier '{jpg_file}' introuvable.")
+                continue
+
+            print(f"\n\nFor loop iteration {i} file {jpg_file}")
+            print(f"START")
+            action = wait_for_space_or_enter()
+            if action == "quit":
+                return "quit"
 
-        print(f"  Image target : {jpg_file}")
-        static_image_conf.path = jpg_file
+            print(f"  Image target : {jpg_file}")
+            atlas_target = atlas_target_for(jpg_file, atlas)
 
-        robot.connect()
+            if session is not None:
+                # Seule l'image cible change entre deux épisodes
+                switch_time = session.set_target(jpg_file, atlas_target)
+                print(f"  Cible changée en {switch_time * 1000:.0f} ms")
+            else:
+                static_image_conf.path = jpg_file
+                static_image_conf.atlas_target = atlas_target
+                robot.connect()
 
-        infer_one_episode(dataset, i, total, robot, policy) # TO UNCOMMENT
+            # Décode la cible suivante en arrière-plan pendant l'inférence
+            if i + 1 < len(jpg_files) and atlas is None:
+                prefetch_target(jpg_files[i + 1], static_image_conf.width, static_image_conf.height)
 
-        robot.disconnect()
+            events = session.events if session is not None else None
+            first_episode = "première action" not in STARTUP.phases
+            if first_episode:
+                STARTUP.first_call(robot, "send_action", "première action")
+            infer_one_episode(dataset, i, total, robot, policy, events, tracer) # TO UNCOMMENT
+            if first_episode and STARTUP.duration("première action") is not None:
+                print(f"⏱️ Première action {STARTUP.duration('première action'):.2f} s après le début de l'épisode")
+
+            if session is None:
+                robot.disconnect()
+    finally:
+        if session is not None:
+            session.close()
+        if hasattr(policy, "close"):  # PipelinedPolicy
+            policy.close()
+        if tracer is not None:
+            tracer.close()
+            print(f"⏱️ Trace de la boucle : python loop_tracer.py {tracer.trace_dir}")
+        if display is not None:
+            display.close()
 
     return "continue"
 
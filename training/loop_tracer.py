@@ -0,0 +1,328 @@
+import argparse
+import json
+import os
+import queue
+import sys
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+# One record per traced call, 19 bytes on disk. start_ns is relative to the tracer creation.
+EVENT_DTYPE = np.dtype([
+    ("episode", "<u2"),
+    ("tick", "<u4"),
+    ("stage", "u1"),
+    ("start_ns", "<i8"),
+    ("duration_ns", "<u4"),
+])
+EVENTS_FILE = "events.bin"
+META_FILE = "trace.json"
+
+# Stage 0: busy part of a loop tick, from its start to the wait for the next one
+TICK_STAGE = "tick"
+# Events kept in memory before being handed to the writer thread (~20 minutes of a 30 FPS loop with 3 cameras)
+FLUSH_EVENTS = 1 << 18
+MAX_STAGES = 256
+
+# Histogram bucket upper bounds for the summary, in milliseconds
+HISTOGRAM_EDGES_MS = [0.1, 0.3, 1, 3, 10, 33, 100, 300]
+
+
+class LoopTracer:
+    """Times every stage of lerobot's record_loop, tick by tick.
+
+    attach() wraps, on the given instances only, the calls made by one loop tick:
+    each camera read, the motor bus read, robot.send_action, teleop.get_action,
+    dataset.add_frame, and the predict_action, log_rerun_data and busy_wait
+    functions of lerobot.record. A traced call costs two perf_counter_ns() and
+    a list.append; events are kept in memory and written by a background
+    thread, when FLUSH_EVENTS of them are buffered and on flush(), which
+    start_episode() calls between episodes, so the loop itself never touches
+    the disk.
+
+    Stages nest: "robot.observation" contains "robot.read" and the
+    "camera.<name>" stages. The "tick" stage is the busy part of each tick, so a
+    tick longer than 1/fps is a dropped tick.
+
+    The trace is a directory holding events.bin (EVENT_DTYPE records) and
+    trace.json (fps, stage and episode names). Summarize it with:
+        python loop_tracer.py ../traces/<run>
+
+    Example:
+        with LoopTracer("../traces/run", fps=FPS) as tracer:
+            tracer.attach(robot, teleop=teleop, dataset=dataset)
+            tracer.start_episode("circle/0")
+            record_loop(robot=robot, ...)
+    """
+
+    def __init__(self, trace_dir: str | Path, fps: int):
+        """
+        Args:
+            trace_dir: Directory of the trace, created if needed. An existing
+                trace in it is overwritten.
+            fps: Frequency of the traced loop, which sets the tick budget.
+        """
+        self.trace_dir = Path(trace_dir)
+        self.fps = fps
+        self.stages = [TICK_STAGE]
+        self.episodes: list[str] = []
+        self._stage_ids = {TICK_STAGE: 0}
+        self._events: list[tuple] = []
+        self._patches: list[tuple] = []
+        self._episode = 0
+        self._tick = 0
+        self._origin_ns = time.perf_counter_ns()
+        self.trace_dir.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.trace_dir / EVENTS_FILE, "wb")
+        self._pending: queue.Queue[list | None] = queue.Queue()
+        self._error: BaseException | None = None
+        self._writer = threading.Thread(target=self._write_loop, name="loop-tracer", daemon=True)
+        self._writer.start()
+
+    def __enter__(self) -> "LoopTracer":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _stage_id(self, stage: str) -> int:
+        if stage not in self._stage_ids:
+            if len(self.stages) == MAX_STAGES:
+                raise ValueError(f"Too many traced stages (max {MAX_STAGES})")
+            self._stage_ids[stage] = len(self.stages)
+            self.stages.append(stage)
+        return self._stage_ids[stage]
+
+    def _traced(self, stage: str, func):
+        stage_id = self._stage_id(stage)
+        clock = time.perf_counter_ns
+
+        def traced(*args, **kwargs):
+            start = clock()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self._events.append((self._episode, self._tick, stage_id, start, clock() - start))
+
+        return traced
+
+    def _traced_busy_wait(self, busy_wait):
+        clock = time.perf_counter_ns
+        period = 1 / self.fps
+
+        def traced(seconds):
+            # record_loop calls busy_wait(1 / fps - dt_s), dt_s being the busy part of the tick
+            work_ns = int((period - seconds) * 1e9)
+            self._events.append((self._episode, self._tick, 0, clock() - work_ns, work_ns))
+            if len(self._events) >= FLUSH_EVENTS:
+                self._hand_off()
+            busy_wait(seconds)
+            self._tick += 1
+
+        return traced
+
+    def patch(self, owner, name: str, stage: str) -> None:
+        """Trace the calls to owner.<name> (an instance or a module) as `stage`, until close()."""
+        original = getattr(owner, name)
+        own = name in vars(owner)
+        wrapper = self._traced_busy_wait(original) if stage == TICK_STAGE else self._traced(stage, original)
+        setattr(owner, name, wrapper)
+        self._patches.append((owner, name, original, own))
+
+    def attach(self, robot, teleop=None, dataset=None) -> None:
+        """Trace the stages of record_loop for this robot, teleoperator and dataset.
+
+        Args:
+            robot: Robot passed to record_loop, with its cameras in robot.cameras.
+            teleop: Optional teleoperator passed to record_loop.
+            dataset: Optional LeRobotDataset passed to record_loop.
+        """
+        from lerobot import record
+
+        self.patch(robot, "get_observation", "robot.observation")
+        if hasattr(robot, "bus"):
+            self.patch(robot.bus, "sync_read", "robot.read")
+        for name, camera in robot.cameras.items():
+            self.patch(camera, "async_read", f"camera.{name}")
+        self.patch(robot, "send_action", "robot.send")
+        if teleop is not None:
+            self.patch(teleop, "get_action", "teleop")
+        if dataset is not None:
+            self.patch(dataset, "add_frame", "dataset.add_frame")
+            self.patch(dataset, "save_episode", "dataset.save_episode")
+        self.patch(record, "predict_action", "policy")
+        self.patch(record, "log_rerun_data", "rerun")
+        self.patch(record, "busy_wait", TICK_STAGE)
+
+    def start_episode(self, label: str) -> None:
+        """Write the events traced so far and number the next ticks from 0 under `label`."""
+        self.flush()
+        self.episodes.append(label)
+        self._episode = len(self.episodes) - 1
+        self._tick = 0
+
+    def _hand_off(self) -> None:
+        # The traced calls append to the new list while the writer thread converts the full one
+        if self._events:
+            self._pending.put(self._events)
+            self._events = []
+
+    def _write_loop(self) -> None:
+        while True:
+            events = self._pending.get()
+            try:
+                if events is None:
+                    return
+                if self._error is None:
+                    self._write_events(events)
+            except BaseException as e:
+                self._error = e
+            finally:
+                self._pending.task_done()
+
+    def _write_events(self, events: list[tuple]) -> None:
+        raw = np.array(events, dtype=np.int64)
+        records = np.empty(len(raw), dtype=EVENT_DTYPE)
+        records["episode"] = raw[:, 0]
+        records["tick"] = raw[:, 1]
+        records["stage"] = raw[:, 2]
+        records["start_ns"] = raw[:, 3] - self._origin_ns
+        records["duration_ns"] = np.clip(raw[:, 4], 0, np.iinfo(np.uint32).max)
+        self._file.write(records.tobytes())
+        self._file.flush()
+
+    def flush(self) -> None:
+        """Append the buffered events to events.bin, wait until they are written and rewrite trace.json.
+
+        Raises:
+            The error of the writer thread, if writing events failed.
+        """
+        self._hand_off()
+        self._pending.join()
+        if self._error is not None:
+            raise self._error
+
+        meta = {"fps": self.fps, "stages": self.stages, "episodes": self.episodes}
+        tmp_path = self.trace_dir / (META_FILE + ".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(meta, f, indent=1)
+        os.replace(tmp_path, self.trace_dir / META_FILE)
+
+    def close(self) -> None:
+        """Write the remaining events and restore every traced call."""
+        for owner, name, original, own in reversed(self._patches):
+            if own:
+                setattr(owner, name, original)
+            else:
+                delattr(owner, name)
+        self._patches.clear()
+        if not self._file.closed:
+            try:
+                self.flush()
+            finally:
+                self._pending.put(None)
+                self._writer.join()
+                self._file.close()
+
+
+def load_trace(trace_dir: str | Path) -> tuple[dict, np.ndarray]:
+    """Read trace.json and the events of a trace directory."""
+    trace_dir = Path(trace_dir)
+    with open(trace_dir / META_FILE) as f:
+        meta = json.load(f)
+    events = np.fromfile(trace_dir / EVENTS_FILE, dtype=EVENT_DTYPE)
+    return meta, events
+
+
+def summarize(meta: dict, events: np.ndarray) -> dict:
+    """Latency percentiles and histogram per stage, and dropped ticks."""
+    stages = {}
+    for stage_id, stage in enumerate(meta["stages"]):
+        ms = events["duration_ns"][events["stage"] == stage_id] / 1e6
+        if not len(ms):
+            continue
+        stages[stage] = {
+            "count": len(ms),
+            "p50_ms": float(np.percentile(ms, 50)),
+            "p99_ms": float(np.percentile(ms, 99)),
+            "max_ms": float(ms.max()),
+            "histogram": np.bincount(np.searchsorted(HISTOGRAM_EDGES_MS, ms),
+                                     minlength=len(HISTOGRAM_EDGES_MS) + 1).tolist(),
+        }
+
+    ticks = events[events["stage"] == 0]
+    budget_ns = 1e9 / meta["fps"]
+    dropped = int((ticks["duration_ns"] > budget_ns).sum())
+    return {
+        "fps": meta["fps"],
+        "episodes": len(np.unique(events["episode"])),
+        "ticks": len(ticks),
+        "dropped_ticks": dropped,
+        "dropped_rate": dropped / len(ticks) if len(ticks) else 0.0,
+        "stages": stages,
+    }
+
+
+def slowest_ticks(meta: dict, events: np.ndarray, count: int) -> list[dict]:
+    """Timeline of the `count` slowest ticks: when each stage started and how long it took."""
+    ticks = events[events["stage"] == 0]
+    timelines = []
+    for tick in ticks[np.argsort(ticks["duration_ns"])[::-1][:count]]:
+        same_tick = events[(events["episode"] == tick["episode"]) & (events["tick"] == tick["tick"])
+                           & (events["stage"] != 0)]
+        same_tick = same_tick[np.argsort(same_tick["start_ns"], kind="stable")]
+        timelines.append({
+            "episode": meta["episodes"][tick["episode"]] if tick["episode"] < len(meta["episodes"]) else "",
+            "tick": int(tick["tick"]),
+            "duration_ms": tick["duration_ns"] / 1e6,
+            "stages": [(meta["stages"][e["stage"]], (e["start_ns"] - tick["start_ns"]) / 1e6, e["duration_ns"] / 1e6)
+                       for e in same_tick],
+        })
+    return timelines
+
+
+def format_summary(summary: dict, histogram: bool = False) -> str:
+    budget_ms = 1000 / summary["fps"]
+    lines = [f"{summary['episodes']} épisode(s), {summary['ticks']} ticks à {summary['fps']} FPS, "
+             f"{summary['dropped_ticks']} au-delà de {budget_ms:.1f} ms ({summary['dropped_rate']:.1%})",
+             f"{'étape':<22}{'appels':>8}{'p50 ms':>9}{'p99 ms':>9}{'max ms':>9}"]
+    for stage, s in summary["stages"].items():
+        lines.append(f"{stage:<22}{s['count']:>8}{s['p50_ms']:>9.2f}{s['p99_ms']:>9.2f}{s['max_ms']:>9.1f}")
+    if histogram:
+        bounds = [f"<{edge:g}" for edge in HISTOGRAM_EDGES_MS] + [f">={HISTOGRAM_EDGES_MS[-1]:g}"]
+        lines += ["", f"{'histogramme (ms)':<22}" + "".join(f"{b:>8}" for b in bounds)]
+        for stage, s in summary["stages"].items():
+            lines.append(f"{stage:<22}" + "".join(f"{n:>8}" for n in s["histogram"]))
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Résume une trace de boucle de contrôle (loop_tracer).")
+    parser.add_argument("trace_dir", help="dossier de la trace")
+    parser.add_argument("--episode", help="ne garde que les épisodes dont le nom contient ce texte")
+    parser.add_argument("--histogram", action="store_true", help="affiche l'histogramme des latences par étape")
+    parser.add_argument("--slowest", type=int, default=0, help="détaille les N ticks les plus lents")
+    parser.add_argument("--json", action="store_true", help="écrit le résumé en JSON")
+    args = parser.parse_args()
+
+    meta, events = load_trace(args.trace_dir)
+    if args.episode:
+        selected = [i for i, label in enumerate(meta["episodes"]) if args.episode in label]
+        events = events[np.isin(events["episode"], selected)]
+    summary = summarize(meta, events)
+
+    if args.json:
+        json.dump(summary, sys.stdout, indent=1)
+        print()
+        return
+    print(format_summary(summary, args.histogram))
+    for timeline in slowest_ticks(meta, events, args.slowest):
+        print(f"\n{timeline['episode']} tick {timeline['tick']} : {timeline['duration_ms']:.1f} ms")
+        for stage, offset_ms, duration_ms in timeline["stages"]:
+            print(f"   +{offset_ms:7.2f} ms  {stage:<22}{duration_ms:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+import queue
+import threading
+import time
+from collections import deque
+
+import numpy as np
+import torch
+
+# Start computing the next chunk this many ticks before the measured forward time runs out
+DEFAULT_MARGIN_TICKS = 3
+
+
+class PipelinedPolicy:
+    """Runs an action-chunking policy (ACT) on a worker thread, ahead of the control loop.
+
+    ACTPolicy.select_action() runs a forward pass every `n_action_steps` ticks,
+    inside the control tick: on a CPU, that tick takes longer than a frame. This
+    wrapper asks a worker thread for the next chunk while the current one is
+    still being executed, as soon as the remaining actions cover the measured
+    forward time (plus a margin). When the chunk arrives, the actions for the
+    ticks that elapsed during the forward pass are dropped, so the new chunk
+    stays aligned with time.
+
+    The control loop only pops actions from a deque it alone owns; the worker
+    hands chunks over through a queue that is polled without blocking. A tick
+    that has to wait for the worker is counted as a deadline miss.
+
+    The wrapper is a drop-in replacement for the policy given to record_loop:
+    other attributes (config, ...) are those of the wrapped policy.
+
+    Example:
+        policy = PipelinedPolicy(ACTPolicy.from_pretrained(HF_MODEL_ID), fps=FPS)
+        record_loop(robot=robot, policy=policy, ...)
+        print(policy.format_stats())
+    """
+
+    def __init__(self, policy, fps: int = 30, margin_ticks: int = DEFAULT_MARGIN_TICKS):
+        """
+        Args:
+            policy: Policy with predict_action_chunk(batch), e.g. ACTPolicy.
+            fps: Control loop frequency, used to convert forward times into ticks.
+            margin_ticks: Extra ticks of advance when requesting the next chunk.
+        """
+        self.policy = policy
+        self.fps = fps
+        self.margin_ticks = margin_ticks
+        self.n_action_steps = policy.config.n_action_steps
+        self.pipelined = getattr(policy.config, "temporal_ensemble_coeff", None) is None
+        if not self.pipelined:
+            print("⚠️ Ensemble temporel actif : inférence exécutée dans la boucle de contrôle")
+
+        self._actions: deque = deque()
+        self._requests: queue.SimpleQueue = queue.SimpleQueue()
+        self._results: queue.SimpleQueue = queue.SimpleQueue()
+        self._generation = 0
+        self._in_flight = False
+        self._tick = 0
+        self._forward_times: list[float] = []
+        self.ticks = 0
+        self.misses = 0
+        self.wait_time = 0.0
+        self.dropped_actions = 0
+
+        self._worker = threading.Thread(target=self._run, name="policy-worker", daemon=True)
+        self._worker.start()
+
+    def __getattr__(self, name):
+        # Only called for attributes missing from the wrapper. Before __init__ has
+        # set self.policy (e.g. while unpickling), looking it up would recurse.
+        if name == "policy":
+            raise AttributeError(name)
+        return getattr(self.policy, name)
+
+    def _run(self) -> None:
+        while True:
+            request = self._requests.get()
+            if request is None:
+                return
+            generation, tick, batch = request
+            start = time.perf_counter()
+            try:
+                with torch.inference_mode():
+                    chunk = self.policy.predict_action_chunk(batch)[:, :self.n_action_steps]
+                result = chunk.transpose(0, 1)  # (n_action_steps, batch, action_dim)
+            except Exception as e:
+                result = e
+            self._results.put((generation, tick, result, time.perf_counter() - start))
+
+    def _forward_ticks(self) -> int:
+        """Measured forward time, in control ticks (median of the recent chunks)."""
+        if not self._forward_times:
+            return self.n_action_steps // 2
+        return int(np.ceil(np.median(self._forward_times[-20:]) * self.fps))
+
+    def _request(self, batch: dict) -> None:
+        self._requests.put((self._generation, self._tick, batch))
+        self._in_flight = True
+
+    def _receive(self, block: bool) -> None:
+        """Swap in the chunk computed by the worker, if there is one."""
+        while self._in_flight:
+            try:
+                generation, tick, result, seconds = self._results.get(block=block)
+            except queue.Empty:
+                return
+            if generation != self._generation:
+                continue  # requested before reset()
+            self._in_flight = False
+            if isinstance(result, Exception):
+                raise result
+            self._forward_times.append(seconds)
+            # Actions for the ticks elapsed since the observation are already past;
+            # if the forward pass outlasted the whole chunk, keep its last action
+            elapsed = min(self._tick - tick, len(result) - 1)
+            self.dropped_actions += elapsed
+            self._actions = deque(result[elapsed:])
+
+    @torch.no_grad()
+    def select_action(self, batch: dict) -> torch.Tensor:
+        """Return the action for this tick, requesting the next chunk ahead of time."""
+        if not self.pipelined:
+            return self.policy.select_action(batch)
+
+        self.ticks += 1
+        self._receive(block=False)
+        if not self._in_flight and len(self._actions) <= self._forward_ticks() + self.margin_ticks:
+            self._request(batch)
+        if not self._actions:
+            # Nothing left to execute: this tick waits for the worker
+            start = time.perf_counter()
+            if not self._in_flight:
+                self._request(batch)
+            self._receive(block=True)
+            self.wait_time += time.perf_counter() - start
+            if self._tick > 0:  # the first chunk of an episode is always awaited
+                self.misses += 1
+        self._tick += 1
+        return self._actions.popleft()
+
+    def reset(self) -> None:
+        """Forget the current chunk and any chunk being computed (called at each episode start)."""
+        self._generation += 1
+        self._in_flight = False
+        self._actions = deque()
+        self._tick = 0
+        self.policy.reset()
+
+    def stats(self) -> dict:
+        forward = np.array(self._forward_times) * 1000
+        return {
+            "ticks": self.ticks,
+            "chunks": len(self._forward_times),
+            "deadline_misses": self.misses,
+            "wait_s": self.wait_time,
+            "dropped_actions": self.dropped_actions,
+            "forward_ms_p50": float(np.percentile(forward, 50)) if len(forward) else None,
+            "forward_ms_max": float(forward.max()) if len(forward) else None,
+        }
+
+    def format_stats(self) -> str:
+        s = self.stats()
+        if not s["chunks"]:
+            return "Aucun chunk calculé"
+        return (f"{s['ticks']} ticks, {s['chunks']} chunks (forward médian {s['forward_ms_p50']:.0f} ms, "
+                f"max {s['forward_ms_max']:.0f} ms), {s['deadline_misses']} échéance(s) manquée(s), "
+                f"{s['wait_s']:.2f} s d'attente")
+
+    def close(self) -> None:
+        """Stop the worker thread."""
+        self._requests.put(None)
+        self._worker.join(timeout=5)
@@ -0,0 +1,220 @@
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import time
+from pathlib import Path
+
+# One directory per model repo under this root, e.g. ../policies/Heuzef/act_rectangle_v2
+SNAPSHOT_ROOT = "../policies"
+MANIFEST_FILE = "snapshot.json"
+# What PreTrainedPolicy.from_pretrained() reads from a model directory
+POLICY_PATTERNS = ["*.json", "*.safetensors"]
+HUB_TIMEOUT_S = 5.0
+
+
+def file_sha256(path: str | Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def snapshot_dir(repo_id: str, root: str | Path = SNAPSHOT_ROOT) -> Path:
+    return Path(root) / repo_id
+
+
+class PolicySnapshot:
+    """A local copy of a policy repo with a manifest of its files.
+
+    The manifest (snapshot.json) records the repo, the Hub revision it was
+    taken from and, for each file, its size, mtime and SHA-256. verify()
+    rehashes only the files whose size or mtime changed, so checking an intact
+    snapshot costs a few stat() calls; verify(full=True) rehashes everything.
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        with open(self.path / MANIFEST_FILE) as f:
+            self.manifest = json.load(f)
+
+    @property
+    def repo_id(self) -> str:
+        return self.manifest["repo_id"]
+
+    @property
+    def revision(self) -> str | None:
+        return self.manifest.get("revision")
+
+    @staticmethod
+    def exists(path: str | Path) -> bool:
+        return (Path(path) / MANIFEST_FILE).exists()
+
+    @classmethod
+    def write(cls, path: str | Path, repo_id: str, revision: str | None) -> "PolicySnapshot":
+        """Hash every file of a directory and write its manifest."""
+        path = Path(path)
+        files = {}
+        for file in sorted(p for p in path.rglob("*") if p.is_file() and p.name != MANIFEST_FILE):
+            stat = file.stat()
+            files[file.relative_to(path).as_posix()] = {
+                "size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": file_sha256(file)
+            }
+        manifest = {"repo_id": repo_id, "revision": revision, "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                    "files": files}
+        tmp_path = path / (MANIFEST_FILE + ".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(manifest, f, indent=1)
+        os.replace(tmp_path, path / MANIFEST_FILE)
+        return cls(path)
+
+    def verify(self, full: bool = False) -> list[str]:
+        """Check the files against the manifest.
+
+        Args:
+            full: Rehash every file, not only those whose size or mtime changed.
+
+        Returns:
+            The problems found (missing or modified files), empty if the snapshot is intact.
+        """
+        problems = []
+        refreshed = False
+        for name, entry in self.manifest["files"].items():
+            file = self.path / name
+            try:
+                stat = file.stat()
+            except FileNotFoundError:
+                problems.append(f"{name}: missing")
+                continue
+            if stat.st_size != entry["size"]:
+                problems.append(f"{name}: size {stat.st_size} != {entry['size']}")
+                continue
+            if not full and stat.st_mtime_ns == entry["mtime_ns"]:
+                continue
+            if file_sha256(file) != entry["sha256"]:
+                problems.append(f"{name}: sha256 mismatch")
+            elif stat.st_mtime_ns != entry["mtime_ns"]:
+                # Touched but identical (e.g. copied): remember the new mtime to skip the hash next time
+                entry["mtime_ns"] = stat.st_mtime_ns
+                refreshed = True
+        if refreshed and not problems:
+            tmp_path = self.path / (MANIFEST_FILE + ".tmp")
+            with open(tmp_path, "w") as f:
+                json.dump(self.manifest, f, indent=1)
+            os.replace(tmp_path, self.path / MANIFEST_FILE)
+        return problems
+
+
+def hub_revision(repo_id: str, revision: str | None = None, timeout: float = HUB_TIMEOUT_S) -> str | None:
+    """Commit of a model repo on the Hub, or None if the Hub cannot be reached."""
+    from huggingface_hub import HfApi
+    from huggingface_hub.constants import HF_HUB_OFFLINE
+
+    if HF_HUB_OFFLINE:
+        return None
+    try:
+        return HfApi().model_info(repo_id, revision=revision, timeout=timeout).sha
+    except Exception:
+        return None
+
+
+def download_snapshot(repo_id: str, root: str | Path = SNAPSHOT_ROOT, revision: str | None = None,
+                      local_files_only: bool = False) -> PolicySnapshot:
+    """Copy a policy repo (from the Hub, or only from the Hugging Face cache) into a new snapshot.
+
+    The files are fetched into a temporary directory that replaces the
+    previous snapshot only once complete and hashed.
+    """
+    from huggingface_hub import snapshot_download
+
+    target = snapshot_dir(repo_id, root)
+    tmp_dir = target.with_name(target.name + ".tmp")
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    cached = Path(snapshot_download(repo_id, revision=revision, allow_patterns=POLICY_PATTERNS,
+                                    local_files_only=local_files_only))
+    # The cache holds symlinks to blobs: copy the content so the snapshot stands on its own
+    shutil.copytree(cached, tmp_dir, symlinks=False, ignore=shutil.ignore_patterns(".*"))
+    # Hugging Face cache directories are named after the commit they hold
+    PolicySnapshot.write(tmp_dir, repo_id, cached.name)
+    old_dir = target.with_name(target.name + ".old")
+    if target.exists():
+        shutil.rmtree(old_dir, ignore_errors=True)
+        os.replace(target, old_dir)
+    os.replace(tmp_dir, target)
+    shutil.rmtree(old_dir, ignore_errors=True)
+    return PolicySnapshot(target)
+
+
+def resolve_policy(repo_id: str, root: str | Path = SNAPSHOT_ROOT, revision: str | None = None,
+                   refresh: bool = False) -> Path:
+    """Local directory of a policy, to give to from_pretrained(), with offline-first resolution.
+
+    In order: an intact local snapshot, used without any network access
+    (with refresh=True, replaced first if the Hub has a newer revision); a
+    download from the Hub; the Hugging Face cache. A local directory path is
+    returned as is.
+
+    Args:
+        repo_id: Model repo on the Hub (e.g. "Heuzef/act_rectangle_v2") or local directory.
+        root: Directory of the snapshots.
+        revision: Hub branch, tag or commit to snapshot (default: main).
+        refresh: Ask the Hub for its latest revision even if a local snapshot exists.
+
+    Raises:
+        FileNotFoundError: If no intact snapshot exists and the model cannot be downloaded.
+    """
+    if Path(repo_id).is_dir():
+        return Path(repo_id)
+
+    path = snapshot_dir(repo_id, root)
+    if PolicySnapshot.exists(path):
+        snapshot = PolicySnapshot(path)
+        problems = snapshot.verify()
+        if not problems and not refresh:
+            return path
+        if not problems:
+            latest = hub_revision(repo_id, revision)
+            if latest is None or latest == snapshot.revision:
+                return path
+            print(f"🔄 Nouvelle révision de {repo_id} : {snapshot.revision[:8]} → {latest[:8]}")
+        else:
+            print(f"⚠️ Copie locale de {repo_id} invalide ({'; '.join(problems)}), nouveau téléchargement")
+
+    try:
+        return download_snapshot(repo_id, root, revision).path
+    except Exception as e:
+        hub_error = e
+    try:
+        # Hub unreachable: fall back on a copy already in the Hugging Face cache
+        return download_snapshot(repo_id, root, revision, local_files_only=True).path
+    except Exception:
+        raise FileNotFoundError(f"Policy {repo_id} is neither in {path} nor downloadable: {hub_error}") from hub_error
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prépare ou vérifie la copie locale d'une politique.")
+    parser.add_argument("repo_id", help="dépôt du modèle, ex. Heuzef/act_rectangle_v2")
+    parser.add_argument("--root", default=SNAPSHOT_ROOT, help="dossier des copies locales")
+    parser.add_argument("--revision", help="branche, tag ou commit du dépôt")
+    parser.add_argument("--refresh", action="store_true", help="télécharge la dernière révision si elle a changé")
+    parser.add_argument("--verify", action="store_true", help="recalcule l'empreinte de tous les fichiers")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    path = resolve_policy(args.repo_id, args.root, args.revision, args.refresh)
+    print(f"📦 {args.repo_id} → {path} en {time.perf_counter() - start:.2f} s")
+    if args.verify and PolicySnapshot.exists(path):
+        snapshot = PolicySnapshot(path)
+        problems = snapshot.verify(full=True)
+        size = sum(entry["size"] for entry in snapshot.manifest["files"].values())
+        if problems:
+            print("❌ " + "\n❌ ".join(problems))
+        else:
+            print(f"✅ {len(snapshot.manifest['files'])} fichier(s), {size / 1e6:.1f} Mo, "
+                  f"révision {snapshot.revision}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,15 @@
+"""Makes the repository root importable from the scripts of training/.
+
+The scripts are run from training/ and import their siblings by bare name; the
+cameras/ package lives at the repository root. Import this module first, once,
+at the entry of a script:
+
+    import repo_path  # noqa: F401
+"""
+import sys
+from pathlib import Path
+
+REPO_ROOT = str(Path(__file__).resolve().parent.parent)
+
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
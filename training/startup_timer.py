@@ -0,0 +1,118 @@
+import os
+import threading
+import time
+from concurrent.futures import Future
+
+
+def _process_age() -> float:
+    """Seconds since the process was started (Linux), including the interpreter startup; 0 elsewhere."""
+    try:
+        with open("/proc/self/stat") as f:
+            # Fields after the command name, which may contain spaces; starttime is field 22
+            start_ticks = int(f.read().rsplit(")", 1)[1].split()[19])
+        with open("/proc/uptime") as f:
+            uptime = float(f.read().split()[0])
+        return max(0.0, uptime - start_ticks / os.sysconf("SC_CLK_TCK"))
+    except (OSError, ValueError, IndexError):
+        return 0.0
+
+
+class StartupTimer:
+    """Wall-clock duration of the startup phases of a script, up to the first action.
+
+    Phases are timed with phase() (a context manager), start()/end(), or
+    background(), which runs a phase on its own thread so that it overlaps the
+    following ones (e.g. loading the policy while the robot connects).
+    first_call() ends a phase on the first call of a method, such as the
+    robot's first send_action(). Times are relative to the process start, so
+    the interpreter startup and module imports before the timer are included.
+
+    Example:
+        startup = StartupTimer()
+        policy = startup.background("policy", load_policy)
+        with startup.phase("robot"):
+            robot.connect()
+        policy = policy.result()
+        print(startup.format())
+    """
+
+    def __init__(self):
+        self.origin = time.perf_counter() - _process_age()
+        # name -> [start, end or None, background]
+        self.phases: dict[str, list] = {}
+        self._lock = threading.Lock()
+        # Interpreter startup and the imports done before the timer was created
+        self.phases["python"] = [0.0, self.elapsed(), False]
+
+    def elapsed(self) -> float:
+        """Seconds since the process started."""
+        return time.perf_counter() - self.origin
+
+    def start(self, name: str, background: bool = False) -> None:
+        with self._lock:
+            self.phases[name] = [self.elapsed(), None, background]
+
+    def end(self, name: str) -> None:
+        with self._lock:
+            if name in self.phases and self.phases[name][1] is None:
+                self.phases[name][1] = self.elapsed()
+
+    def phase(self, name: str) -> "_Phase":
+        return _Phase(self, name)
+
+    def background(self, name: str, fn, *args, **kwargs) -> Future:
+        """Run fn(*args, **kwargs) on a daemon thread as a phase; the future holds its result."""
+        future = Future()
+
+        def run():
+            self.start(name, background=True)
+            try:
+                future.set_result(fn(*args, **kwargs))
+            except BaseException as e:
+                future.set_exception(e)
+            finally:
+                self.end(name)
+
+        threading.Thread(target=run, name=f"startup-{name}", daemon=True).start()
+        return future
+
+    def first_call(self, owner, method: str, name: str) -> None:
+        """End phase `name` on the first call of owner.method (started now if not already running)."""
+        if name not in self.phases:
+            self.start(name)
+        original = getattr(owner, method)
+        timer = self
+
+        def wrapper(*args, **kwargs):
+            result = original(*args, **kwargs)
+            timer.end(name)
+            return result
+
+        setattr(owner, method, wrapper)
+
+    def duration(self, name: str) -> float | None:
+        start, end, _ = self.phases[name]
+        return None if end is None else end - start
+
+    def format(self) -> str:
+        lines = []
+        for name, (start, end, background) in self.phases.items():
+            mark = " (arrière-plan)" if background else ""
+            if end is None:
+                lines.append(f"   {name:<20} en cours depuis {start:6.2f} s{mark}")
+            else:
+                lines.append(f"   {name:<20} {end - start:6.2f} s  ({start:6.2f} → {end:6.2f} s){mark}")
+        return "\n".join(lines)
+
+
+class _Phase:
+    def __init__(self, timer: StartupTimer, name: str):
+        self.timer = timer
+        self.name = name
+
+    def __enter__(self) -> "_Phase":
+        self.timer.start(self.name)
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.timer.end(self.name)
@@ -0,0 +1,253 @@
+import argparse
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import cv2
+import numpy as np
+import torch
+
+# Under <dataset root>/meta/, next to lerobot's own metadata (and pushed with it)
+STATIC_DIR = "static_features"
+INFO_FILE = "static_features.json"
+INDEX_FILE = "static_features.jsonl"
+
+
+def split_static_features(features: dict, static_keys: list[str]) -> tuple[dict, dict]:
+    """Split dataset features into those written by lerobot and the static ones.
+
+    Args:
+        features: Dataset features, e.g. from hw_to_dataset_features().
+        static_keys: Features whose value does not change within an episode,
+            e.g. ["observation.images.target"].
+
+    Returns:
+        The features to create the LeRobotDataset with, and the static features.
+    """
+    static = {key: features[key] for key in static_keys if key in features}
+    return {key: ft for key, ft in features.items() if key not in static}, static
+
+
+def frame_digest(frame: np.ndarray) -> str:
+    """Content hash of a frame, used as its file name: the same target is stored once."""
+    h = hashlib.sha256(str(frame.shape).encode())
+    h.update(np.ascontiguousarray(frame).data)
+    return h.hexdigest()[:16]
+
+
+def _meta_dir(root: str | Path) -> Path:
+    return Path(root) / "meta"
+
+
+def load_static_features(root: str | Path) -> tuple[dict, dict[int, dict[str, str]]]:
+    """Read the static features of a dataset.
+
+    Returns:
+        The info (features and stats), and for each episode index the digest
+        of its frame for each static feature.
+    """
+    meta_dir = _meta_dir(root)
+    with open(meta_dir / INFO_FILE) as f:
+        info = json.load(f)
+    index = {}
+    with open(meta_dir / INDEX_FILE) as f:
+        for line in f:
+            if line.strip():
+                entry = json.loads(line)
+                index[entry["episode_index"]] = entry["frames"]
+    return info, index
+
+
+class StaticFeatureWriter:
+    """Stores static camera features once per episode, beside a LeRobotDataset.
+
+    The target camera shows the same image for a whole episode: written by
+    lerobot as a video feature, it costs one PNG per frame for the image
+    writer threads, then a video encode, disk space and upload, to store a
+    single image. Create the dataset without these features (see
+    split_static_features) and call this writer's save_episode() instead of
+    dataset.save_episode(): the camera frame is stored as a lossless PNG under
+    meta/static_features/<key>/<digest>.png, once per distinct content, and
+    meta/static_features.jsonl maps each episode to its digests.
+    meta/static_features.json keeps the feature specs and the per-channel
+    stats that policies need for normalization.
+
+    Read the dataset back with StaticFeatureDataset, which puts the frames back
+    in every item.
+
+    Example:
+        dataset_features, static = split_static_features(features, ["observation.images.target"])
+        dataset = LeRobotDataset.create(..., features=dataset_features)
+        writer = StaticFeatureWriter(dataset, {"observation.images.target": target_camera}, static)
+        record_loop(robot=robot, dataset=dataset, ...)
+        writer.save_episode()
+    """
+
+    def __init__(self, dataset, cameras: dict, features: dict):
+        """
+        Args:
+            dataset: LeRobotDataset being recorded.
+            cameras: Camera to read for each static feature key.
+            features: Specs of the static features (dtype, shape, names).
+        """
+        self.dataset = dataset
+        self.cameras = cameras
+        self.meta_dir = _meta_dir(dataset.root)
+        self.info = {"features": features, "sums": {}, "stats": {}}
+        if (self.meta_dir / INFO_FILE).exists():
+            with open(self.meta_dir / INFO_FILE) as f:
+                self.info = json.load(f)
+        self.info["features"].update(features)
+        for key in cameras:
+            (self.meta_dir / STATIC_DIR / key).mkdir(parents=True, exist_ok=True)
+
+    def capture(self) -> dict[str, np.ndarray]:
+        """Read the static frames of the episode being recorded."""
+        return {key: camera.read() for key, camera in self.cameras.items()}
+
+    def save_episode(self) -> dict[str, str]:
+        """Save the episode with lerobot, then its static frames.
+
+        Returns:
+            The digest of the frame stored for each static feature.
+        """
+        episode_index = int(self.dataset.episode_buffer["episode_index"])
+        length = int(self.dataset.episode_buffer["size"])
+        frames = self.capture()
+        self.dataset.save_episode()
+        return self.write(episode_index, length, frames)
+
+    def write(self, episode_index: int, length: int, frames: dict[str, np.ndarray]) -> dict[str, str]:
+        """Store the static frames of an episode saved by lerobot (see capture).
+
+        Returns:
+            The digest of the frame stored for each static feature.
+        """
+        digests = {}
+        for key, frame in frames.items():
+            digest = frame_digest(frame)
+            path = self.meta_dir / STATIC_DIR / key / f"{digest}.png"
+            if not path.exists():
+                image = cv2.cvtColor(frame, cv2.COLOR_RGB2BGR) if frame.ndim == 3 else frame
+                tmp_path = path.with_suffix(".tmp.png")
+                cv2.imwrite(str(tmp_path), image)
+                os.replace(tmp_path, path)
+            self._update_stats(key, frame, length)
+            digests[key] = digest
+
+        with open(self.meta_dir / INDEX_FILE, "a") as f:
+            f.write(json.dumps({"episode_index": episode_index, "length": length, "frames": digests}) + "\n")
+        tmp_path = self.meta_dir / (INFO_FILE + ".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(self.info, f, indent=1)
+        os.replace(tmp_path, self.meta_dir / INFO_FILE)
+        return digests
+
+    def _update_stats(self, key: str, frame: np.ndarray, length: int) -> None:
+        """Accumulate per-channel stats in [0, 1], as if the frame had been stored `length` times."""
+        pixels = frame.reshape(-1, frame.shape[-1] if frame.ndim == 3 else 1).astype(np.float64) / 255
+        sums = self.info["sums"].setdefault(key, {"count": 0, "pixels": 0, "sum": 0, "sum_sq": 0,
+                                                  "min": np.inf, "max": -np.inf})
+        sums["count"] += length
+        sums["pixels"] += length * len(pixels)
+        sums["sum"] = (np.asarray(sums["sum"]) + length * pixels.sum(axis=0)).tolist()
+        sums["sum_sq"] = (np.asarray(sums["sum_sq"]) + length * (pixels ** 2).sum(axis=0)).tolist()
+        sums["min"] = np.minimum(sums["min"], pixels.min(axis=0)).tolist()
+        sums["max"] = np.maximum(sums["max"], pixels.max(axis=0)).tolist()
+
+        mean = np.asarray(sums["sum"]) / sums["pixels"]
+        std = np.sqrt(np.maximum(np.asarray(sums["sum_sq"]) / sums["pixels"] - mean ** 2, 0))
+        # Same layout as lerobot's image stats: one value per channel, shaped (C, 1, 1)
+        self.info["stats"][key] = {
+            "mean": mean[:, None, None].tolist(),
+            "std": std[:, None, None].tolist(),
+            "min": np.asarray(sums["min"])[:, None, None].tolist(),
+            "max": np.asarray(sums["max"])[:, None, None].tolist(),
+            "count": [sums["count"]],
+        }
+
+
+class StaticFeatureMeta:
+    """Dataset metadata with the static features added to features, camera_keys and stats."""
+
+    def __init__(self, meta, info: dict):
+        self._meta = meta
+        self.features = {**meta.features, **info["features"]}
+        self.camera_keys = [key for key, ft in self.features.items() if ft["dtype"] in ("video", "image")]
+        self.stats = {**(meta.stats or {}),
+                      **{key: {name: np.asarray(value, dtype=np.float32) for name, value in stats.items()}
+                         for key, stats in info["stats"].items()}}
+
+    def __getattr__(self, name):
+        return getattr(self._meta, name)
+
+
+class StaticFeatureDataset(torch.utils.data.Dataset):
+    """LeRobotDataset whose items get their static features back.
+
+    Each stored frame is decoded once, to a float32 CHW tensor in [0, 1] like
+    decoded video frames, and shared by all the items of its episodes. The
+    dataset's image_transforms, if any, are applied to it as to the other
+    cameras. `meta` includes the static features and their stats, so it can be
+    given to make_policy().
+
+    Example:
+        dataset = StaticFeatureDataset(LeRobotDataset("Heuzef/rectangle_v1"))
+        item = dataset[0]  # with "observation.images.target"
+    """
+
+    def __init__(self, dataset):
+        self.dataset = dataset
+        info, self.episode_frames = load_static_features(dataset.root)
+        self.meta = StaticFeatureMeta(dataset.meta, info)
+        self._frames: dict[tuple[str, str], torch.Tensor] = {}
+
+    def __getattr__(self, name):
+        return getattr(self.dataset, name)
+
+    def __len__(self) -> int:
+        return len(self.dataset)
+
+    def _frame(self, key: str, digest: str) -> torch.Tensor:
+        frame = self._frames.get((key, digest))
+        if frame is None:
+            path = _meta_dir(self.dataset.root) / STATIC_DIR / key / f"{digest}.png"
+            image = cv2.imread(str(path), cv2.IMREAD_UNCHANGED)
+            if image is None:
+                raise FileNotFoundError(f"Static frame not found: {path}")
+            if image.ndim == 3:
+                image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+            else:
+                image = image[:, :, None]
+            frame = torch.from_numpy(image).permute(2, 0, 1).float() / 255
+            self._frames[(key, digest)] = frame
+        return frame
+
+    def __getitem__(self, idx) -> dict:
+        item = self.dataset[idx]
+        transforms = getattr(self.dataset, "image_transforms", None)
+        for key, digest in self.episode_frames[int(item["episode_index"])].items():
+            frame = self._frame(key, digest)
+            item[key] = transforms(frame) if transforms is not None else frame
+        return item
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Affiche les caméras statiques stockées à part d'un dataset.")
+    parser.add_argument("root", help="dossier du dataset, ex. ~/.cache/huggingface/lerobot/Heuzef/rectangle_v1")
+    args = parser.parse_args()
+
+    root = Path(args.root).expanduser()
+    info, index = load_static_features(root)
+    for key, ft in info["features"].items():
+        digests = {frames[key] for frames in index.values() if key in frames}
+        files = list((_meta_dir(root) / STATIC_DIR / key).glob("*.png"))
+        size = sum(f.stat().st_size for f in files)
+        frames = info["sums"].get(key, {}).get("count", 0)
+        print(f"{key} {tuple(ft['shape'])} : {len(index)} épisode(s), {frames} frames, "
+              f"{len(digests)} image(s) distincte(s), {size / 1024:.0f} Ko sur disque")
+
+
+if __name__ == "__main__":
+    main()
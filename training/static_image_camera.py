@@ -6,6 +6,7 @@ from lerobot.cameras.camera import Camera
 from lerobot.cameras.configs import ColorMode
 from lerobot.cameras.opencv.configuration_opencv import OpenCVCameraConfig
 from static_image_camera_config import StaticImageCameraConfig
+from target_cache import build_frames, get_target_cache
 
 
 class StaticImageCamera(Camera):
@@ -13,41 +14,89 @@ class StaticImageCamera(Camera):
     
     This class simulates a camera by repeatedly returning the same static image.
     Useful for testing or when using pre-captured images as camera input.
+
+    All color mode variants are computed once when the image is loaded, and
+    read() hands out read-only views of them. Set `copy_frames=True` in the
+    config for callers that need to modify the returned frames.
+
+    Decoded images come from the process-wide target cache, so reconnecting
+    to an already seen (or prefetched) target does not touch the disk.
+
+    With a target atlas (see cameras/target_atlas.py), targets are selected by
+    index or name through `atlas_target` or select_target(), with no decoding.
+    Without an atlas, select_image() switches to another file while connected.
     """
 
-    def __init__(self, config: StaticImageCameraConfig):
+    def __init__(self, config: StaticImageCameraConfig, atlas=None):
         """Initialize the static image camera.
         
         Args:
             config: Camera configuration. The 'index_or_path' should contain 
                    the path to the image file.
+            atlas: Optional TargetAtlas to read targets from when
+                   `config.atlas_target` is set.
         """
         super().__init__(config)
         self.config = config
+        self.atlas = atlas
         self._connected = False
         self._image = None
+        self._frames = {}
 
     def _load_image(self, warmup: bool = True) -> None:
         """Load image from file and handle errors."""
         try:
+            if self.atlas is not None and self.config.atlas_target is not None:
+                self._load_atlas_target(self.config.atlas_target)
+                return
+
             path = Path(self.config.path)
-            if not path.exists():
-                raise FileNotFoundError(f"Image file not found: {path}")
-            
-            self._image = cv2.imread(str(path))
-            if self._image is None:
-                raise ValueError(f"Failed to load image: {path}")
-                
             # Resize if dimensions are specified in config
             if self.width is not None and self.height is not None:
-                self._image = cv2.resize(self._image, (self.width, self.height))
-                
+                self._frames = get_target_cache().get_frames(path, self.width, self.height)
+            else:
+                self._frames = get_target_cache().get_frames(path)
+            self._image = self._frames[ColorMode.BGR]
+
             print(f"Loaded static image: {path} (shape: {self._image.shape})")
             
         except Exception as e:
             print(f"Error loading static image: {e}")
             raise
 
+    def _load_atlas_target(self, target: int | str) -> None:
+        """Use a target of the atlas, resizing it only if the atlas has another resolution."""
+        image = self.atlas[target]
+        if self.width is not None and self.height is not None and image.shape[:2] != (self.height, self.width):
+            image = cv2.resize(image, (self.width, self.height))
+        self._frames = build_frames(image)
+        self._image = self._frames[ColorMode.BGR]
+
+    def select_target(self, target: int | str) -> None:
+        """Switch to another target of the atlas.
+
+        Args:
+            target: Index or name of the target, e.g. "circle/circle_001".
+
+        Raises:
+            RuntimeError: If the camera has no atlas.
+            KeyError: If the atlas has no target with that name.
+        """
+        if self.atlas is None:
+            raise RuntimeError("Static image camera has no target atlas")
+        self._load_atlas_target(target)
+        self.config.atlas_target = target
+
+    def select_image(self, path: str | Path) -> None:
+        """Switch to another image file, through the target cache.
+
+        Args:
+            path: Path to the new target image.
+        """
+        self.config.path = str(path)
+        self.config.atlas_target = None
+        self._load_image()
+
     @property
     def is_connected(self) -> bool:
         """Check if the static image is loaded and ready."""
@@ -81,25 +130,22 @@ class StaticImageCamera(Camera):
             color_mode: Desired color mode for the output frame.
             
         Returns:
-            np.ndarray: The static image as a numpy array.
+            np.ndarray: The static image as a read-only numpy array, or a
+            writable copy when `copy_frames` is enabled in the config.
             
         Raises:
             RuntimeError: If camera is not connected or image not loaded.
+            ValueError: If the color mode is not supported.
         """
         if not self.is_connected or self._image is None:
             raise RuntimeError("Static image camera not connected or image not loaded")
-        color_mode = self.config.color_mode if color_mode is None else color_mode
-        
-        frame = self._image.copy()
-        
-        # Handle color mode conversion if needed
-        if color_mode == ColorMode.RGB:
-            frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        elif color_mode == ColorMode.GRAYSCALE:
-            frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        # Add other color mode conversions as needed
-            
-        return frame
+        color_mode = self.config.color_mode if color_mode is None else ColorMode(color_mode)
+
+        frame = self._frames.get(color_mode)
+        if frame is None:
+            raise ValueError(f"Unsupported color mode: {color_mode}")
+
+        return frame.copy() if self.config.copy_frames else frame
 
     def async_read(self, timeout_ms: float = 1000.0) -> np.ndarray:
         """Asynchronously read the static image.
@@ -111,7 +157,7 @@ class StaticImageCamera(Camera):
             timeout_ms: Maximum time to wait (for interface compatibility).
             
         Returns:
-            np.ndarray: The static image as a numpy array.
+            np.ndarray: The static image as a read-only numpy array.
         """
         return self.read()
 
@@ -119,6 +165,7 @@ class StaticImageCamera(Camera):
         """Disconnect from the static image and release resources."""
         self._connected = False
         self._image = None
+        self._frames = {}
         print("Static image camera disconnected")
 
     def __del__(self):
@@ -9,6 +9,10 @@ class StaticImageCameraConfig(CameraConfig):
 
     path: Path
     color_mode: ColorMode = ColorMode.RGB
+    # Return writable copies from read() instead of shared read-only views.
+    copy_frames: bool = False
+    # Index or name of the target to read from the camera's atlas instead of `path`.
+    atlas_target: int | str | None = None
 
     def __post_init__(self):
         if self.color_mode not in (ColorMode.RGB, ColorMode.BGR):
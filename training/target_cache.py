@@ -0,0 +1,235 @@
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+
+import cv2
+import numpy as np
+from lerobot.cameras.configs import ColorMode
+
+# The calling script has put the repository root on sys.path (see repo_path.py)
+from cameras.static_camera import BGR_CONVERSIONS
+from cameras.target_atlas import TargetAtlas
+
+# Three 640x480 variants take ~2 MB, so this keeps roughly a hundred targets.
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+def _supported_modes() -> list[ColorMode]:
+    return [mode for mode in ColorMode if mode.value in BGR_CONVERSIONS]
+
+
+def build_frames(image: np.ndarray) -> dict[ColorMode, np.ndarray]:
+    """Convert a BGR image into a read-only frame for every supported color mode."""
+    frames = {}
+    for mode in _supported_modes():
+        code = BGR_CONVERSIONS[mode.value]
+        frame = image.view() if code is None else cv2.cvtColor(image, code)
+        frame.flags.writeable = False
+        frames[mode] = frame
+    return frames
+
+
+class TargetCache:
+    """Process-wide LRU cache of decoded target images.
+
+    Entries are keyed by (path, mtime, width, height, color mode) so that an
+    edited file is decoded again. Every cached frame is read-only and can be
+    shared between cameras. The cache is bounded by the total size of the
+    cached arrays, and the least recently used entries are evicted first.
+
+    Decoding can be started ahead of time with prefetch(), which runs on a
+    background worker thread: a later get_frames() for the same target waits
+    for that decode instead of starting a second one.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[tuple, np.ndarray] = OrderedDict()
+        self._nbytes = 0
+        self._pending: dict[tuple, Future] = {}
+        self._lock = threading.Lock()
+        self._executor: ThreadPoolExecutor | None = None
+
+    @staticmethod
+    def _target_key(path: str | Path, width: int | None, height: int | None) -> tuple:
+        """Build the mode-independent part of the cache key.
+
+        Raises:
+            FileNotFoundError: If the image file does not exist.
+        """
+        path = Path(path)
+        try:
+            mtime_ns = os.stat(path).st_mtime_ns
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Image file not found: {path}") from None
+        return (str(path.resolve()), mtime_ns, width, height)
+
+    def _lookup(self, target_key: tuple) -> dict[ColorMode, np.ndarray] | None:
+        """Return the cached frames of a target, refreshing their LRU position."""
+        frames = {}
+        for mode in _supported_modes():
+            key = (*target_key, mode.value)
+            if key not in self._entries:
+                return None
+            self._entries.move_to_end(key)
+            frames[mode] = self._entries[key]
+        return frames
+
+    def _store(self, target_key: tuple, frames: dict[ColorMode, np.ndarray]) -> None:
+        for mode, frame in frames.items():
+            key = (*target_key, mode.value)
+            if key in self._entries:
+                continue
+            self._entries[key] = frame
+            self._nbytes += frame.nbytes
+        while self._nbytes > self.max_bytes and len(self._entries) > len(frames):
+            _, evicted = self._entries.popitem(last=False)
+            self._nbytes -= evicted.nbytes
+
+    @staticmethod
+    def _decode(path: str, width: int | None, height: int | None) -> dict[ColorMode, np.ndarray]:
+        """Decode, resize and convert a target into read-only frames."""
+        image = cv2.imread(path)
+        if image is None:
+            raise ValueError(f"Failed to load image: {path}")
+        if width is not None and height is not None:
+            image = cv2.resize(image, (width, height))
+        return build_frames(image)
+
+    def _load(self, target_key: tuple) -> dict[ColorMode, np.ndarray]:
+        """Decode a target and publish it to the cache and to any waiters."""
+        path, _, width, height = target_key
+        try:
+            frames = self._decode(path, width, height)
+        except BaseException:
+            with self._lock:
+                self._pending.pop(target_key, None)
+            raise
+        with self._lock:
+            self._store(target_key, frames)
+            self._pending.pop(target_key, None)
+        return frames
+
+    def get_frames(
+        self, path: str | Path, width: int | None = None, height: int | None = None
+    ) -> dict[ColorMode, np.ndarray]:
+        """Return the read-only frames of a target for every color mode.
+
+        Args:
+            path: Path to the image file.
+            width: Target width in pixels, or None to keep the file resolution.
+            height: Target height in pixels, or None to keep the file resolution.
+
+        Raises:
+            FileNotFoundError: If the image file does not exist.
+            ValueError: If the image cannot be decoded.
+        """
+        target_key = self._target_key(path, width, height)
+        with self._lock:
+            frames = self._lookup(target_key)
+            if frames is not None:
+                self.hits += 1
+                return frames
+            self.misses += 1
+            pending = self._pending.get(target_key)
+            if pending is None:
+                pending = Future()
+                self._pending[target_key] = pending
+                owner = True
+            else:
+                owner = False
+
+        if not owner:
+            return pending.result()
+
+        try:
+            frames = self._load(target_key)
+        except BaseException as e:
+            pending.set_exception(e)
+            raise
+        pending.set_result(frames)
+        return frames
+
+    def get(
+        self,
+        path: str | Path,
+        width: int | None = None,
+        height: int | None = None,
+        color_mode: ColorMode = ColorMode.RGB,
+    ) -> np.ndarray:
+        """Return the read-only frame of a target in a single color mode."""
+        return self.get_frames(path, width, height)[ColorMode(color_mode)]
+
+    def prefetch(self, path: str | Path, width: int | None = None, height: int | None = None) -> Future | None:
+        """Decode a target on the background worker so a later get is a cache hit.
+
+        Missing or unreadable files are ignored here; the error is raised by the
+        get_frames() call that actually needs the target.
+
+        Returns:
+            A future resolving to the frames, or None if the file does not exist.
+        """
+        try:
+            target_key = self._target_key(path, width, height)
+        except FileNotFoundError:
+            return None
+        with self._lock:
+            frames = self._lookup(target_key)
+            if frames is not None:
+                done = Future()
+                done.set_result(frames)
+                return done
+            pending = self._pending.get(target_key)
+            if pending is not None:
+                return pending
+            pending = Future()
+            self._pending[target_key] = pending
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="target-prefetch")
+
+        def run():
+            try:
+                pending.set_result(self._load(target_key))
+            except BaseException as e:
+                pending.set_exception(e)
+
+        self._executor.submit(run)
+        return pending
+
+    def clear(self) -> None:
+        """Drop every cached frame."""
+        with self._lock:
+            self._entries.clear()
+            self._nbytes = 0
+
+    @property
+    def nbytes(self) -> int:
+        """Total size of the cached frames in bytes."""
+        return self._nbytes
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+_target_cache = TargetCache()
+
+
+def get_target_cache() -> TargetCache:
+    """Return the cache shared by every StaticImageCamera of the process."""
+    return _target_cache
+
+
+def prefetch_target(path: str | Path, width: int | None = None, height: int | None = None) -> Future | None:
+    """Start decoding a target in the background, e.g. the next episode's image."""
+    return _target_cache.prefetch(path, width, height)
+
+
+def open_target_atlas(path: str | Path | None):
+    """Open a target atlas built with cameras/target_atlas.py, or return None if path is None."""
+    if path is None:
+        return None
+    return TargetAtlas(path)
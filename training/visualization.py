@@ -0,0 +1,128 @@
+import threading
+import time
+from collections import deque
+
+import cv2
+import numpy as np
+import rerun as rr
+
+DEFAULT_IMAGE_FPS = 5
+DEFAULT_SCALE = 0.5
+# Frame sets waiting for the worker; the oldest is dropped when the worker falls behind
+DEFAULT_QUEUE_SIZE = 2
+
+
+class ThrottledRerunLogger:
+    """Drop-in replacement for lerobot's log_rerun_data that keeps images off the control loop.
+
+    record_loop(display_data=True) sends every full-resolution camera frame to
+    rerun from the control thread. This logger sends the scalars (joint
+    positions, actions) right away as before, but only hands the images over
+    at `image_fps`, to a worker thread that downscales them by `scale` and
+    logs them. The hand-off is a bounded queue that drops the oldest frame set,
+    so a slow viewer costs frames, never control ticks. A frame that is the
+    same array as the last one logged (the static target) is not sent again.
+
+    install() puts the logger in place of lerobot.record.log_rerun_data, used by
+    record_loop; close() puts the original back.
+
+    Example:
+        with ThrottledRerunLogger(image_fps=5, scale=0.5) as logger:
+            logger.install()
+            record_loop(robot=robot, display_data=True, ...)
+    """
+
+    def __init__(self, image_fps: float = DEFAULT_IMAGE_FPS, scale: float = DEFAULT_SCALE,
+                 queue_size: int = DEFAULT_QUEUE_SIZE):
+        """
+        Args:
+            image_fps: Maximum rate at which camera images are logged.
+            scale: Resize factor applied to the images before logging.
+            queue_size: Frame sets waiting for the worker before the oldest is dropped.
+        """
+        self.image_period = 1 / image_fps
+        self.scale = scale
+        self._queue: deque = deque(maxlen=queue_size)
+        self._ready = threading.Condition()
+        self._closed = False
+        self._next_image_time = 0.0
+        self._last_frames: dict[str, np.ndarray] = {}
+        self._installed = None
+        self.sent = 0
+        self.dropped = 0
+
+        self._worker = threading.Thread(target=self._run, name="rerun-images", daemon=True)
+        self._worker.start()
+
+    def __enter__(self) -> "ThrottledRerunLogger":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __call__(self, observation: dict, action: dict) -> None:
+        """Log one tick, with the signature of log_rerun_data(observation, action)."""
+        images = {}
+        for key, value in observation.items():
+            if isinstance(value, float):
+                rr.log(f"observation.{key}", rr.Scalar(value))
+            elif isinstance(value, np.ndarray):
+                if value.ndim == 1:
+                    for i, v in enumerate(value):
+                        rr.log(f"observation.{key}_{i}", rr.Scalar(float(v)))
+                else:
+                    images[key] = value
+        for key, value in action.items():
+            if isinstance(value, float):
+                rr.log(f"action.{key}", rr.Scalar(value))
+            elif isinstance(value, np.ndarray):
+                for i, v in enumerate(value):
+                    rr.log(f"action.{key}_{i}", rr.Scalar(float(v)))
+
+        now = time.perf_counter()
+        if images and now >= self._next_image_time:
+            self._next_image_time = now + self.image_period
+            self._submit(images)
+
+    def _submit(self, images: dict[str, np.ndarray]) -> None:
+        with self._ready:
+            if len(self._queue) == self._queue.maxlen:
+                self.dropped += 1
+            self._queue.append(images)
+            self._ready.notify()
+
+    def _run(self) -> None:
+        while True:
+            with self._ready:
+                while not self._queue and not self._closed:
+                    self._ready.wait()
+                if not self._queue:
+                    return
+                images = self._queue.popleft()
+            for key, frame in images.items():
+                if self._last_frames.get(key) is frame:
+                    continue
+                self._last_frames[key] = frame
+                if self.scale != 1:
+                    frame = cv2.resize(frame, None, fx=self.scale, fy=self.scale, interpolation=cv2.INTER_AREA)
+                rr.log(f"observation.{key}", rr.Image(frame), static=True)
+            self.sent += 1
+
+    def install(self) -> None:
+        """Replace lerobot.record.log_rerun_data with this logger until close()."""
+        from lerobot import record
+
+        if self._installed is None:
+            self._installed = (record, record.log_rerun_data)
+            record.log_rerun_data = self
+
+    def close(self) -> None:
+        """Restore log_rerun_data, log the frames still queued and stop the worker."""
+        if self._installed is not None:
+            record, original = self._installed
+            record.log_rerun_data = original
+            self._installed = None
+        with self._ready:
+            self._closed = True
+            self._ready.notify()
+        self._worker.join(timeout=5)